@@ -1,13 +1,26 @@
 # pomozen/cli.py
 import typer
+import asyncio
+import json
+import os
 import sys
+import time
 from typing_extensions import Annotated
-from typing import List
+from typing import List, Optional
+from pathlib import Path
 
-from .config import load_config, get_config_path, create_default_config, update_setting
+from .config import (
+    SETTABLE_KEYS,
+    load_config,
+    get_config_path,
+    create_default_config,
+    update_setting,
+)
 
 # Import SessionStatus along with Timer, SessionType
 from .timer import Timer, SessionType, SessionStatus
+from .schedule import get_day_plan, seconds_since_midnight
+from .ticks import TickPolicy
 from .display import (
     live_display,
     show_config,
@@ -16,10 +29,32 @@ from .display import (
     show_session_banner,
     show_completion_status,  # Use new status printer
     show_exit_message,
+    show_status,
+    show_dashboard_banner,
+    show_team_update,
+    SessionView,
+    show_report,
+    show_tasks,
+    show_memory_sample,
 )
-from .keyboard import KeyboardManager  # Import the context manager
+from .events import Batched, Completed
+from .notifications import notify_completed
+from .keyboard import KeyboardManager, get_keys_if_available
+from .dashboard import Dashboard, load_dashboard_timers
+from .team import DEFAULT_ADDRESS, TeamPublisher, subscribe
+from .headless import HeadlessRun, NdjsonWriter, parse_plan
+from .web import DEFAULT_HOST as WEB_HOST, DEFAULT_PORT as WEB_PORT, WebServer
+from .history import HistoryRecorder, get_history_path, scan
+from .compaction import Compactor, compact
+from .report import SHARD_MODES, build_report, report_to_dict
+from .tasks import TaskIndex, clean_task_name
+from .export import FORMATS, export_records
+from .importer import FORMATS as IMPORT_FORMATS, import_history
+from .completion import SHELLS, TASKS, describe_commands, shell_script, write_index
+from .memory import MemoryReport
+from .replay import TraceRecorder, format_report, load_trace, replay
 
-from rich.prompt import Confirm
+from rich.prompt import Confirm, Prompt
 
 app = typer.Typer(
     name="pomozen",
@@ -35,6 +70,45 @@ def _get_timer() -> Timer:
     return Timer(config)
 
 
+def _start_compactor(config: dict) -> Compactor:
+    """Compacts the history in the background while a timer runs."""
+    compactor = Compactor(
+        retention_months=config["settings"].get("history_retention_months", 0)
+    )
+    compactor.start()
+    return compactor
+
+
+def _ask_task(current: Optional[str]) -> Optional[str]:
+    """Asks what the next work session is for, with TAB completion of known tasks."""
+    tasks = TaskIndex()
+    try:
+        import readline
+    except ImportError:  # e.g. Windows without pyreadline
+        readline = None
+    if readline is not None:
+        matches: List[str] = []
+
+        def complete(text: str, state: int) -> Optional[str]:
+            if state == 0:
+                matches[:] = tasks.complete(readline.get_line_buffer(), limit=50)
+            return matches[state] if state < len(matches) else None
+
+        readline.set_completer(complete)
+        readline.set_completer_delims("")  # Task names may contain spaces
+        if "libedit" in (readline.__doc__ or ""):
+            readline.parse_and_bind("bind ^I rl_complete")  # macOS
+        else:
+            readline.parse_and_bind("tab: complete")
+    answer = Prompt.ask(
+        "[bold yellow]Task for this session[/] [dim](TAB completes, '-' for none)[/]",
+        default=current or "",
+        show_default=bool(current),
+    )
+    answer = clean_task_name(answer)
+    return None if answer in ("", "-") else answer
+
+
 # --- Typer Commands ---
 
 
@@ -48,19 +122,86 @@ def start(
             help="Automatically continue to the next session without prompting.",
         ),
     ] = False,
+    share: Annotated[
+        Optional[str],
+        typer.Option(
+            "--share",
+            help="Broadcast this timer to team subscribers at HOST:PORT (loopback only) or unix:PATH.",
+        ),
+    ] = None,
+    task: Annotated[
+        Optional[str],
+        typer.Option(
+            "--task",
+            "-t",
+            help="Label work sessions with a task or project name.",
+        ),
+    ] = None,
+    tick_stats: Annotated[
+        bool,
+        typer.Option(
+            "--tick-stats",
+            help="Print how often the timer woke up (wakeups/hour) after each session.",
+        ),
+    ] = False,
+    memory_report: Annotated[
+        bool,
+        typer.Option(
+            "--memory-report",
+            help="Print memory use and its biggest growth after each session.",
+        ),
+    ] = False,
+    record: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--record",
+            help="Record keys, timing and output to a trace for 'pomozen replay'.",
+            dir_okay=False,
+        ),
+    ] = None,
 ):
     """
     Starts the Pomodoro timer sequence with keyboard controls.
     """
     timer = _get_timer()
+    timer.task = clean_task_name(task) if task else None
+    view = SessionView()
+    timer.events.subscribe(view, *SessionView.EVENT_TYPES)
+    key_source, wait, trace = get_keys_if_available, None, None
+    if record:
+        try:
+            trace = TraceRecorder(record, timer, view, console)
+        except OSError as e:
+            console.print(f"[bold red]❌ Error: Could not record to '{record}': {e}[/]")
+            sys.exit(1)
+        timer.events.subscribe(trace, *TraceRecorder.EVENT_TYPES)
+        key_source, wait = trace.keys, trace.wait
+    # Shared so stats cover the whole run
+    policy = TickPolicy(visible=trace.visible if trace else None, clock=timer.clock)
+    # Disk writes and desktop notifications run off the timer loop
+    recorder = Batched(HistoryRecorder())  # Save completed/skipped sessions
+    notifier = Batched(notify_completed)
+    timer.events.subscribe(recorder, *HistoryRecorder.EVENT_TYPES)
+    timer.events.subscribe(notifier, Completed)
+    compactor = _start_compactor(timer.config)
+    memory = MemoryReport() if memory_report else None
+    publisher = None
+    if share:
+        publisher = TeamPublisher(share)
+        try:
+            publisher.start()
+        except (OSError, ValueError) as e:
+            console.print(f"[bold red]❌ Error: Could not share on '{share}': {e}[/]")
+            sys.exit(1)
+        publisher.attach(timer)
     show_welcome_banner_and_controls()  # Show banner and controls first
 
     # Use KeyboardManager to handle setup/restore of terminal
-    with KeyboardManager():
+    with KeyboardManager() as keyboard:
         try:
             while True:
                 # --- Show banner for the UPCOMING session ---
-                current_session_type = timer.current_session_type or SessionType.WORK
+                current_session_type = timer.current_session_type or timer.plan.cycle[0]
                 duration_minutes = timer.durations[current_session_type.name.lower()]
                 show_session_banner(current_session_type, duration_minutes)
 
@@ -69,39 +210,24 @@ def start(
                     SessionStatus.QUIT
                 )  # Default if loop exits unexpectedly
                 finished_session_type = (
-                    timer.current_session_type or SessionType.WORK
+                    timer.current_session_type or timer.plan.cycle[0]
                 )  # Store type before run
 
-                with live_display() as progress_live:
-                    # Define progress updater callback (exactly as before)
-                    def progress_updater(action: str, task_id=None, **kwargs):
-                        if action == "add_task":
-                            return progress_live.add_task(**kwargs)
-                        elif action == "update":
-                            if task_id is not None:
-                                progress_live.update(task_id, **kwargs)
-                        elif action == "remove_task":
-                            if task_id is not None:
-                                try:
-                                    progress_live.remove_task(task_id)
-                                except KeyError:
-                                    pass
-                                except Exception:
-                                    pass
-                        elif action == "is_finished":
-                            if task_id is not None:
-                                try:
-                                    return progress_live._tasks[task_id].finished
-                                except KeyError:
-                                    return True
-                            return True
-
-                    # Run the session, get the status back
-                    session_status = timer.run_session(progress_updater)
+                with live_display() as view.live:  # SessionView draws and refreshes
+                    session_status = timer.run_session(
+                        key_source=key_source, policy=policy, wait=wait
+                    )
 
                 # --- Handle session end based on status ---
                 # Show completion/skip status AFTER Live context exits
                 show_completion_status(finished_session_type, session_status)
+                if tick_stats:
+                    console.print(
+                        f"[dim]Wakeups: {policy.wakeups} "
+                        f"({policy.wakeups_per_hour():.0f}/hour)[/]"
+                    )
+                if memory is not None:
+                    show_memory_sample(memory.sample(), memory.growth_per_session())
 
                 if session_status == SessionStatus.QUIT:
                     # Exit initiated by 'q' or Ctrl+C within run_session
@@ -121,9 +247,19 @@ def start(
                     ).capitalize()
                     prompt_text = f"Continue to the next session ({next_session_name})?"
 
-                    if auto_continue or Confirm.ask(
-                        f"[bold yellow]{prompt_text}[/]", default=True
-                    ):
+                    proceed = auto_continue
+                    if not auto_continue:
+                        # Prompts need a normal (line-buffered) terminal
+                        with keyboard.suspended():
+                            proceed = Confirm.ask(
+                                f"[bold yellow]{prompt_text}[/]", default=True
+                            )
+                            if (
+                                proceed
+                                and timer.current_session_type == SessionType.WORK
+                            ):
+                                timer.task = _ask_task(timer.task)
+                    if proceed:
                         console.print("-" * console.width)  # Separator
                         continue  # Loop to the next session
                     else:
@@ -148,6 +284,438 @@ def start(
         finally:
             # KeyboardManager ensures restore_keyboard() is called on exit
             console.show_cursor(True)  # Belt-and-suspenders
+            if publisher is not None:
+                publisher.stop()
+            recorder.close()  # Flush pending history writes
+            notifier.close()
+            compactor.close()
+            if memory is not None:
+                memory.close()
+            if trace is not None:
+                trace.close()
+
+
+# --- dashboard command ---
+@app.command(name="dashboard")
+def dashboard_command(
+    timers_file: Annotated[
+        Path,
+        typer.Argument(
+            help="TOML file with one [[timer]] table per named timer.",
+            exists=True,
+            dir_okay=False,
+        ),
+    ],
+):
+    """Runs several named timers side by side in one display."""
+    try:
+        timers = load_dashboard_timers(timers_file)
+    except (OSError, ValueError) as e:
+        console.print(f"[bold red]❌ Error: {e}[/]")
+        sys.exit(1)
+
+    dashboard = Dashboard(timers)
+    notifier = Batched(notify_completed)  # One notification thread for all rows
+    for timer in timers:
+        timer.events.subscribe(notifier, Completed)
+    show_dashboard_banner(len(timers))
+    with KeyboardManager():
+        try:
+            with live_display(dashboard.progress) as dashboard.live:
+                dashboard.run()
+        except KeyboardInterrupt:
+            console.show_cursor(True)
+            print()
+            show_exit_message(quit_normally=False)
+            sys.exit(0)
+        finally:
+            console.show_cursor(True)
+            notifier.close()
+
+
+# --- run command ---
+@app.command(name="run")
+def run_command(
+    plan: Annotated[
+        Optional[str],
+        typer.Option(
+            "--plan",
+            help="Sessions to run, e.g. 'work:50,short_break,work' (minutes; "
+            "default: one configured cycle).",
+        ),
+    ] = None,
+    task: Annotated[
+        Optional[str],
+        typer.Option(
+            "--task", "-t", help="Label work sessions with a task or project name."
+        ),
+    ] = None,
+    every_second: Annotated[
+        bool,
+        typer.Option("--every-second", help="Emit a tick every second, not minute."),
+    ] = False,
+    no_history: Annotated[
+        bool,
+        typer.Option("--no-history", help="Don't record the sessions in history."),
+    ] = False,
+):
+    """Runs sessions without a UI, printing one JSON event per line (NDJSON).
+
+    Control it with lines on stdin (pause, resume, toggle, skip, quit) or
+    signals: SIGUSR1 toggles pause, SIGUSR2 skips.
+    """
+    # No Rich output here: stdout carries only the event stream
+    config = load_config()
+    try:
+        steps = (
+            parse_plan(plan)
+            if plan
+            else [(t, None) for t in get_day_plan(config).cycle]
+        )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+    timer = Timer(config)
+    timer.task = clean_task_name(task) if task else None
+    runner = HeadlessRun(timer, steps, NdjsonWriter(), every_second)
+    recorder = compactor = None
+    if not no_history:
+        recorder = Batched(HistoryRecorder())
+        timer.events.subscribe(recorder, *HistoryRecorder.EVENT_TYPES)
+        compactor = _start_compactor(config)
+    if sys.stdin is not None:
+        runner.read_commands(sys.stdin)
+    try:
+        status = runner.run()
+    except BrokenPipeError:
+        # The reader went away; don't let the exit flush complain again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        status = 1
+    finally:
+        if recorder is not None:
+            recorder.close()  # Flush pending history writes
+            compactor.close()
+    sys.exit(status)
+
+
+# --- serve command ---
+@app.command(name="serve")
+def serve_command(
+    port: Annotated[
+        int, typer.Option("--port", "-p", help="Port to listen on.")
+    ] = WEB_PORT,
+    host: Annotated[
+        str, typer.Option("--host", help="Loopback address to bind (127.0.0.1, ::1).")
+    ] = WEB_HOST,
+    task: Annotated[
+        Optional[str],
+        typer.Option(
+            "--task", "-t", help="Label work sessions with a task or project name."
+        ),
+    ] = None,
+):
+    """Runs the timer for browser tabs: a live page with pause/skip buttons."""
+    timer = _get_timer()
+    timer.task = clean_task_name(task) if task else None
+    try:
+        server = WebServer(timer, host, port)
+    except ValueError as e:
+        console.print(f"[bold red]❌ Error: {e}[/]")
+        sys.exit(1)
+    recorder = Batched(HistoryRecorder())
+    notifier = Batched(notify_completed)
+    timer.events.subscribe(recorder, *HistoryRecorder.EVENT_TYPES)
+    timer.events.subscribe(notifier, Completed)
+    compactor = _start_compactor(timer.config)
+
+    async def serve():
+        await server.start()
+        console.print(
+            f"[bold green]🌐 PomoZen is running at {server.url}[/] "
+            "[dim](Ctrl+C to stop)[/dim]"
+        )
+        await server.serve()
+
+    try:
+        asyncio.run(serve())
+    except OSError as e:
+        console.print(f"[bold red]❌ Error: Could not serve on port {port}: {e}[/]")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print()
+        show_exit_message(quit_normally=False)
+    finally:
+        recorder.close()  # Flush pending history writes
+        notifier.close()
+        compactor.close()
+
+
+# --- join command ---
+@app.command(name="join")
+def join_command(
+    address: Annotated[
+        str,
+        typer.Argument(
+            help="Address of a 'start --share' timer (HOST:PORT or unix:PATH)."
+        ),
+    ] = DEFAULT_ADDRESS,
+):
+    """Follows a shared team timer and prints its state changes."""
+    try:
+        for update in subscribe(address):
+            show_team_update(update)
+    except OSError as e:
+        console.print(f"[bold red]❌ Error: Could not join '{address}': {e}[/]")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
+    console.print("[dim]Shared timer disconnected.[/dim]")
+
+
+# --- export command ---
+def _parse_day(value: Optional[str], option: str) -> Optional[int]:
+    """Turns a YYYY-MM-DD option into a local-midnight Unix timestamp."""
+    if value is None:
+        return None
+    try:
+        return int(time.mktime(time.strptime(value, "%Y-%m-%d")))
+    except ValueError:
+        console.print(
+            f"[bold red]❌ Error: {option} must be YYYY-MM-DD, got '{value}'[/]"
+        )
+        sys.exit(1)
+
+
+@app.command(name="export")
+def export_command(
+    fmt: Annotated[
+        str,
+        typer.Option("--format", "-f", help=f"Output format: {', '.join(FORMATS)}."),
+    ] = "csv",
+    output: Annotated[
+        Optional[Path],
+        typer.Option("--output", "-o", help="File to write (default: stdout)."),
+    ] = None,
+    since: Annotated[
+        Optional[str],
+        typer.Option("--since", help="First day to include (YYYY-MM-DD)."),
+    ] = None,
+    until: Annotated[
+        Optional[str],
+        typer.Option("--until", help="Last day to include (YYYY-MM-DD)."),
+    ] = None,
+    session_type: Annotated[
+        Optional[List[str]],
+        typer.Option(
+            "--type",
+            "-t",
+            help="Only these session types (work, short_break, long_break). Repeatable.",
+        ),
+    ] = None,
+):
+    """Streams session history as CSV, JSON Lines or Parquet."""
+    if fmt not in FORMATS:
+        console.print(
+            f"[bold red]❌ Error: Unknown format '{fmt}'. Use one of: {', '.join(FORMATS)}[/]"
+        )
+        sys.exit(1)
+    types = None
+    if session_type:
+        try:
+            types = {SessionType[name.upper()] for name in session_type}
+        except KeyError as e:
+            console.print(f"[bold red]❌ Error: Unknown session type {e}[/]")
+            sys.exit(1)
+    start_ts = _parse_day(since, "--since")
+    end_ts = _parse_day(until, "--until")
+    if end_ts is not None:
+        end_ts += 86400  # --until is inclusive
+
+    records = scan(since=start_ts, until=end_ts, session_types=types)
+    task_name = TaskIndex().name
+    try:
+        if output is None:
+            export_records(records, fmt, sys.stdout.buffer, task_name)
+            sys.stdout.buffer.flush()
+        else:
+            with open(output, "wb") as out:
+                export_records(records, fmt, out, task_name)
+    except (OSError, ValueError, RuntimeError) as e:
+        console.print(f"[bold red]❌ Error: {e}[/]")
+        sys.exit(1)
+
+
+# --- import command ---
+@app.command(name="import")
+def import_command(
+    files: Annotated[
+        List[Path],
+        typer.Argument(
+            help="CSV, JSON Lines or JSON dumps from other trackers.",
+            exists=True,
+            dir_okay=False,
+        ),
+    ],
+    fmt: Annotated[
+        Optional[str],
+        typer.Option(
+            "--format",
+            "-f",
+            help=f"Input format: {', '.join(IMPORT_FORMATS)} (default: from extension).",
+        ),
+    ] = None,
+    workers: Annotated[
+        Optional[int],
+        typer.Option("--workers", "-w", help="Parser processes (default: CPU count)."),
+    ] = None,
+    dry_run: Annotated[
+        bool,
+        typer.Option("--dry-run", help="Parse and count without writing history."),
+    ] = False,
+):
+    """Imports session history exported from other Pomodoro/time trackers."""
+    if fmt is not None and fmt not in IMPORT_FORMATS:
+        console.print(
+            f"[bold red]❌ Error: Unknown format '{fmt}'. Use one of: {', '.join(IMPORT_FORMATS)}[/]"
+        )
+        sys.exit(1)
+    try:
+        summary = import_history(files, fmt=fmt, workers=workers, dry_run=dry_run)
+    except (OSError, ValueError) as e:
+        console.print(f"[bold red]❌ Error: {e}[/]")
+        sys.exit(1)
+    verb = "Would import" if dry_run else "Imported"
+    console.print(
+        f"[bold green]✔️ {verb} {summary.imported} sessions[/] "
+        f"[dim]({summary.parsed} parsed, {summary.duplicates} overlapping dropped, "
+        f"{summary.invalid} unusable rows)[/dim]"
+    )
+
+
+# --- report command ---
+@app.command(name="report")
+def report_command(
+    histories: Annotated[
+        Optional[List[Path]],
+        typer.Argument(
+            help="History files, one per user (default: your own history).",
+            exists=True,
+            dir_okay=False,
+        ),
+    ] = None,
+    by: Annotated[
+        str,
+        typer.Option("--by", help="Split work by 'month' (default) or by 'user'."),
+    ] = "month",
+    workers: Annotated[
+        Optional[int],
+        typer.Option("--workers", "-w", help="Worker processes (default: CPU count)."),
+    ] = None,
+    as_json: Annotated[
+        bool,
+        typer.Option("--json", help="Print the report as JSON."),
+    ] = False,
+):
+    """Summarizes focus time, completion and streaks per session type."""
+    paths = histories or [get_history_path()]
+    try:
+        users, team = build_report(paths, by=by, workers=workers)
+    except (OSError, ValueError) as e:
+        console.print(f"[bold red]❌ Error: {e}[/]")
+        sys.exit(1)
+    if as_json:
+        print(json.dumps(report_to_dict(users, team), indent=2))
+    else:
+        show_report(users, team)
+
+
+# --- compact command ---
+@app.command(name="compact")
+def compact_command(
+    retention_months: Annotated[
+        Optional[int],
+        typer.Option(
+            "--retention-months",
+            "-r",
+            min=0,
+            help="Delete history older than this many months (0 keeps all; "
+            "default: history_retention_months setting).",
+        ),
+    ] = None,
+):
+    """Splits the history into month shards and applies the retention policy.
+
+    Timers do this in the background; run it by hand after a big import.
+    """
+    if retention_months is None:
+        retention_months = load_config()["settings"]["history_retention_months"]
+    try:
+        result = compact(retention_months=retention_months)
+    except (OSError, ValueError) as e:
+        console.print(f"[bold red]❌ Error: {e}[/]")
+        sys.exit(1)
+    if result is None:
+        console.print(
+            "[bold yellow]⚠️ The history is busy (another compaction or an "
+            "import); try again shortly.[/]"
+        )
+        sys.exit(1)
+    console.print(
+        f"[bold green]✔️ History compacted into {result.shards} shards[/] "
+        f"[dim]({result.sealed} sessions sealed, {result.merged} small shards "
+        f"merged, {result.dropped} sessions past retention deleted)[/dim]"
+    )
+
+
+# --- replay command ---
+@app.command(name="replay")
+def replay_command(
+    trace_file: Annotated[
+        Path,
+        typer.Argument(
+            help="Trace recorded with 'start --record'.", exists=True, dir_okay=False
+        ),
+    ],
+    runs: Annotated[
+        int,
+        typer.Option("--runs", "-n", min=1, help="Replays to take the best time of."),
+    ] = 3,
+):
+    """Replays a recorded run at full speed and prints a performance report.
+
+    Exits with status 1 if the output differs from the recording. Reports
+    from two builds diff line by line.
+    """
+    try:
+        trace = load_trace(trace_file)
+    except ValueError as e:
+        console.print(f"[bold red]❌ Error: {e}[/]")
+        sys.exit(1)
+    results = [replay(trace) for _ in range(runs)]
+    best = min(results, key=lambda result: result.cpu)
+    print(format_report(best, runs))
+    if any(result.mismatch for result in results):
+        sys.exit(1)
+
+
+# --- tasks command ---
+@app.command(name="tasks")
+def tasks_command(
+    prefix: Annotated[
+        str, typer.Argument(help="Only tasks whose name starts with this.")
+    ] = "",
+    limit: Annotated[
+        int, typer.Option("--limit", "-n", help="Show at most this many tasks.")
+    ] = 20,
+):
+    """Lists task labels with their completed work sessions and focus time."""
+    tasks = TaskIndex()
+    try:
+        rows = [(name, *tasks.summary(name)) for name in tasks.complete(prefix, limit)]
+    except (OSError, ValueError) as e:
+        console.print(f"[bold red]❌ Error: {e}[/]")
+        sys.exit(1)
+    show_tasks(rows, len(tasks))
 
 
 # --- config command (Keep as before) ---
@@ -169,6 +737,14 @@ def config_command(
     show_config(config)
 
 
+# --- status command ---
+@app.command(name="status")
+def status_command():
+    """Shows what the day plan says right now: session, next break, end of day."""
+    plan = get_day_plan(load_config())
+    show_status(plan, seconds_since_midnight())
+
+
 # --- set command (Keep as before) ---
 @app.command(name="set")
 def set_command(
@@ -187,6 +763,45 @@ def set_command(
         sys.exit(1)
 
 
+# --- completion command ---
+def write_completion_index(path: Optional[Path] = None):
+    """Saves what completion.py needs to answer TAB without importing this module."""
+    session_types = [t.name.lower() for t in SessionType]
+    hints = {
+        "start": {"--task": TASKS, "-t": TASKS},
+        "run": {"--task": TASKS, "-t": TASKS},
+        "serve": {"--task": TASKS, "-t": TASKS},
+        "tasks": {"args": [TASKS]},
+        "set": {
+            "args": [list(SETTABLE_KEYS), {"sound_notification": ["true", "false"]}]
+        },
+        "export": {
+            "--format": FORMATS,
+            "-f": FORMATS,
+            "--type": session_types,
+            "-t": session_types,
+        },
+        "import": {"--format": IMPORT_FORMATS, "-f": IMPORT_FORMATS},
+        "report": {"--by": SHARD_MODES},
+        "completion": {"args": [list(SHELLS)]},
+    }
+    write_index(describe_commands(typer.main.get_command(app), hints), path)
+
+
+@app.command(name="completion")
+def completion_command(
+    shell: Annotated[str, typer.Argument(help=f"One of: {', '.join(SHELLS)}.")],
+):
+    """Prints a shell completion script, e.g. eval "$(pomozen completion bash)"."""
+    try:
+        script = shell_script(shell)
+        write_completion_index()
+    except (OSError, ValueError) as e:
+        console.print(f"[bold red]❌ Error: {e}[/]")
+        sys.exit(1)
+    print(script, end="")
+
+
 # --- Main execution hook (Keep as before) ---
 if __name__ == "__main__":
     app()
@@ -0,0 +1,422 @@
+# pomozen/compaction.py
+import calendar
+import heapq
+import itertools
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable, List, NamedTuple, Optional
+
+from .history import (
+    HistoryShard,
+    Manifest,
+    Row,
+    file_range,
+    get_history_path,
+    get_shards_dir,
+    history_lock,
+    load_manifest,
+    new_generation,
+    rewrite_file,
+    save_manifest,
+    scan_file,
+    write_file,
+)
+
+# --- Policy ---
+SEAL_GRACE = 7 * 86400  # A month is sealed a week after it ends (late sessions)
+MERGE_TARGET_RECORDS = 65536  # Merge neighbouring shards up to one scan chunk
+COMPACT_DELAY = 30.0  # Seconds after start-up before the background pass
+COMPACT_INTERVAL = 6 * 3600.0  # Then every few hours while the timer runs
+
+
+class CompactionResult(NamedTuple):
+    sealed: int  # Records moved from the active file into month shards
+    merged: int  # Small shards merged into bigger ones
+    dropped: int  # Records deleted by the retention policy
+    deleted: int  # Replaced shard files removed from disk
+    shards: int  # Shards afterwards
+
+
+class _Cancelled(Exception):
+    pass
+
+
+def month_start(timestamp: float) -> int:
+    """Start of the UTC month containing `timestamp`."""
+    year, month = time.gmtime(timestamp)[:2]
+    return calendar.timegm((year, month, 1, 0, 0, 0))
+
+
+def add_months(month: int, months: int) -> int:
+    """Start of the UTC month `months` after (or before) the one at `month`."""
+    year, number = time.gmtime(month)[:2]
+    index = year * 12 + number - 1 + months
+    return calendar.timegm((index // 12, index % 12 + 1, 1, 0, 0, 0))
+
+
+def _month_key() -> Callable[[Row], int]:
+    """groupby() key: the row's month, recomputed only when it changes."""
+    bounds = [0, 0]  # [start, end) of the last month seen
+
+    def key(row: Row) -> int:
+        if not bounds[0] <= row[0] < bounds[1]:
+            bounds[0] = month_start(row[0])
+            bounds[1] = add_months(bounds[0], 1)
+        return bounds[0]
+
+    return key
+
+
+# --- Shard files ---
+def _write_shard(rows: Iterable[Row], shards_dir: Path) -> Optional[HistoryShard]:
+    """Writes sorted rows to a new, uniquely named shard file.
+
+    Names are never reused, so a file listed in a manifest that readers may
+    still hold is never overwritten.
+    """
+    bounds: List[int] = []  # First and last start time
+
+    def tracked():
+        for row in rows:
+            if not bounds:
+                bounds.extend((row[0], row[0]))
+            bounds[1] = row[0]
+            yield row
+
+    temp_path = shards_dir / f"{os.urandom(4).hex()}.tmp"
+    count = write_file(tracked(), temp_path)
+    if not count:
+        temp_path.unlink()
+        return None
+    first_month, last_month = (time.strftime("%Y-%m", time.gmtime(t)) for t in bounds)
+    label = first_month if first_month == last_month else f"{first_month}_{last_month}"
+    name = f"{label}.{os.urandom(3).hex()}.bin"
+    os.replace(temp_path, shards_dir / name)
+    return HistoryShard(name, bounds[0], bounds[1], count)
+
+
+def _write_months(
+    rows: Iterable[Row], shards_dir: Path, stop: Optional[threading.Event]
+) -> List[HistoryShard]:
+    """One shard per UTC month of `rows`."""
+    shards = []
+    for _, month_rows in itertools.groupby(rows, _month_key()):
+        if stop is not None and stop.is_set():
+            raise _Cancelled
+        shard = _write_shard(month_rows, shards_dir)
+        if shard is not None:
+            shards.append(shard)
+    return shards
+
+
+# --- Compaction ---
+def compact(
+    path: Optional[Path] = None,
+    retention_months: int = 0,
+    now: Optional[float] = None,
+    stop: Optional[threading.Event] = None,
+) -> Optional[CompactionResult]:
+    """Seals finished months into shards, merges small shards and applies the
+    retention policy (keep the last `retention_months` months; 0 keeps all).
+
+    New shards are written while the history stays readable and appendable;
+    appends only wait for the commit at the end (a manifest replace and
+    trimming the active file). Returns None if another compaction is running,
+    `stop` was set, or the history changed underneath (try again later).
+    """
+    path = path or get_history_path()
+    now = time.time() if now is None else now
+    with history_lock(path, "compact", blocking=False) as acquired:
+        if not acquired:
+            return None
+        try:
+            return _compact(path, retention_months, now, stop)
+        except _Cancelled:
+            return None
+
+
+def _compact(
+    path: Path, retention_months: int, now: float, stop: Optional[threading.Event]
+) -> Optional[CompactionResult]:
+    original = load_manifest(path)
+    manifest = original
+    if manifest is None:
+        if not path.exists():
+            return CompactionResult(0, 0, 0, 0, 0)
+        manifest = Manifest(new_generation(), 0, [], [])
+    shards_dir = get_shards_dir(path)
+    shards_dir.mkdir(parents=True, exist_ok=True)
+
+    # Files retired by the previous run (and leftovers of an interrupted one)
+    listed = {shard.file for shard in manifest.shards}
+    deleted = 0
+    for name in os.listdir(shards_dir):
+        if name not in listed:
+            os.unlink(shards_dir / name)
+            deleted += name.endswith(".bin")
+
+    shards = list(manifest.shards)
+    generation = manifest.generation
+    retired: List[str] = []
+
+    def replace(old: List[HistoryShard], new: List[HistoryShard], at: int):
+        shards[at : at + len(old)] = new
+        retired.extend(shard.file for shard in old)
+
+    # 1. Seal whole months from the active file
+    sealed_from = manifest.sealed_until
+    sealed_until = max(sealed_from, month_start(now - SEAL_GRACE))
+    sealed = 0
+    if sealed_until > sealed_from:
+        counted = [0]
+
+        def counting(rows: Iterable[Row]):
+            for row in rows:
+                counted[0] += 1
+                yield row
+
+        rows = counting(scan_file(path, sealed_from or None, sealed_until))
+        first = next(rows, None)
+        if first is not None:
+            rows = itertools.chain([first], rows)
+            late = [i for i, shard in enumerate(shards) if shard.last > first[0]]
+            if late:
+                # Sessions recorded after their month was sealed: re-sort the
+                # shards they fall into (positions shift, so a new generation)
+                at = late[0]
+                old = shards[at:]
+                rows = heapq.merge(
+                    *(scan_file(shards_dir / shard.file) for shard in old), rows
+                )
+                replace(old, _write_months(rows, shards_dir, stop), at)
+                generation = new_generation()
+            else:
+                shards.extend(_write_months(rows, shards_dir, stop))
+        sealed = counted[0]
+
+    # 2. Retention: delete months before the last `retention_months`
+    dropped = 0
+    if retention_months > 0:
+        cutoff = add_months(month_start(now), -retention_months)
+        while shards and shards[0].first < cutoff:
+            shard = shards[0]
+            kept = None
+            if shard.last >= cutoff:  # Straddles the cutoff: keep the rest
+                kept = _write_shard(
+                    scan_file(shards_dir / shard.file, cutoff), shards_dir
+                )
+            replace([shard], [kept] if kept else [], 0)
+            dropped += shard.count - (kept.count if kept else 0)
+            if kept:
+                break
+        if dropped:
+            generation = new_generation()
+
+    # 3. Merge runs of small neighbouring shards
+    merged = 0
+    at = 0
+    while at < len(shards):
+        end, total = at, 0
+        while end < len(shards) and total + shards[end].count <= MERGE_TARGET_RECORDS:
+            total += shards[end].count
+            end += 1
+        if end - at > 1:
+            if stop is not None and stop.is_set():
+                raise _Cancelled
+            group = shards[at:end]
+            rows = itertools.chain.from_iterable(
+                scan_file(shards_dir / shard.file) for shard in group
+            )
+            replace(group, [_write_shard(rows, shards_dir)], at)
+            merged += len(group)
+        at += 1
+
+    if not (sealed or dropped or merged or retired or sealed_until > sealed_from):
+        return CompactionResult(0, 0, 0, deleted, len(shards))
+    if stop is not None and stop.is_set():
+        raise _Cancelled
+
+    # 4. Commit: appends wait only for this part
+    with history_lock(path):
+        if load_manifest(path) != original or sealed != (
+            file_range(path, sealed_until)[0] - file_range(path, sealed_from)[0]
+        ):
+            return None  # Imported or appended to meanwhile: next run retries
+        save_manifest(Manifest(generation, sealed_until, shards, retired), path)
+        if sealed:
+            rewrite_file(scan_file(path, sealed_until), path)
+    return CompactionResult(sealed, merged, dropped, deleted, len(shards))
+
+
+class Compactor:
+    """Runs compact() on a daemon thread: once shortly after start-up, then
+    every `interval` seconds. The timer never waits for it."""
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        retention_months: int = 0,
+        delay: float = COMPACT_DELAY,
+        interval: float = COMPACT_INTERVAL,
+    ):
+        self.path = path
+        self.retention_months = retention_months
+        self.delay = delay
+        self.interval = interval
+        self.last_result: Optional[CompactionResult] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="pomozen-compaction", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        delay = self.delay
+        while not self._stop.wait(delay):
+            try:
+                result = compact(self.path, self.retention_months, stop=self._stop)
+            except (OSError, ValueError) as e:
+                print(
+                    f"Warning: Could not compact session history: {e}", file=sys.stderr
+                )
+            else:
+                self.last_result = result or self.last_result
+            delay = self.interval
+
+    def close(self, timeout: float = 2.0):
+        """Stops the thread; an interrupted pass leaves the history as it was."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+# --- Benchmark: month queries with and without shard pruning ---
+if __name__ == "__main__":
+    import random
+    import shutil
+    import tempfile
+
+    from .history import append_rows, count_records, scan_rows, time_span
+
+    record_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    years = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    now = time.time()
+    first_month = add_months(month_start(now), -12 * years)
+    step = (now - first_month) / record_count
+
+    def best_of(function, rounds: int = 5) -> float:
+        times = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        single = Path(data_dir) / "single" / "history.bin"
+        sharded = Path(data_dir) / "sharded" / "history.bin"
+        single.parent.mkdir()
+        sharded.parent.mkdir()
+        append_rows(
+            (
+                (int(first_month + i * step), 1500, 1500, 1 + i % 3, 1, 0)
+                for i in range(record_count)
+            ),
+            single,
+        )
+        shutil.copy(single, sharded)
+        print(f"{record_count:,} records over {years} years")
+
+        # Timer wakeups (every 10 ms) while compaction runs in the background
+        def lateness(during: Callable[[], object]) -> List[float]:
+            samples: List[float] = []
+            done = threading.Event()
+
+            def ticker():
+                while not done.is_set():
+                    due = time.perf_counter() + 0.01
+                    time.sleep(0.01)
+                    samples.append(time.perf_counter() - due)
+
+            thread = threading.Thread(target=ticker)
+            thread.start()
+            during()
+            done.set()
+            thread.join()
+            return sorted(samples)
+
+        idle = lateness(lambda: time.sleep(1.0))
+        timing: List[float] = []
+
+        def run_compaction():
+            start = time.perf_counter()
+            result = compact(sharded, now=now)
+            timing.append(time.perf_counter() - start)
+            print(f"compaction: {result}")
+
+        busy = lateness(run_compaction)
+        for label, samples in (("idle", idle), ("during compaction", busy)):
+            print(
+                f"  timer lateness {label:<18} p50 {samples[len(samples) // 2] * 1e3:5.2f} ms,"
+                f" max {samples[-1] * 1e3:6.2f} ms"
+            )
+        print(f"  compaction took {timing[0]:.2f}s")
+        assert count_records(sharded) == count_records(single) == record_count
+        assert time_span(sharded) == time_span(single)
+
+        rng = random.Random(7)
+        months = [add_months(first_month, rng.randrange(12 * years)) for _ in range(20)]
+        manifest = load_manifest(sharded)
+        shards_dir = get_shards_dir(sharded)
+
+        def month_query(history: Path):
+            for month in months:
+                for _ in scan_rows(history, month, add_months(month, 1)):
+                    pass
+
+        def unpruned():
+            # Every shard is opened and searched, as if the manifest had no times
+            for month in months:
+                until = add_months(month, 1)
+                for shard in manifest.shards:
+                    for _ in scan_file(shards_dir / shard.file, month, until):
+                        pass
+
+        def full_scan():
+            for month in months[:2]:
+                until = add_months(month, 1)
+                for row in scan_rows(single):
+                    if month <= row[0] < until:
+                        pass
+
+        rows = [
+            ("sharded, pruned by manifest", best_of(lambda: month_query(sharded))),
+            ("sharded, every shard searched", best_of(unpruned)),
+            ("single file, binary search", best_of(lambda: month_query(single))),
+            ("single file, full scan", best_of(full_scan, 1) * len(months) / 2),
+        ]
+        print(f"One-month query ({len(manifest.shards)} shards), per query:")
+        for label, elapsed in rows:
+            print(f"  {label:<32} {elapsed / len(months) * 1e3:8.2f} ms")
+
+        def summary(history: Path):
+            for _ in range(100):
+                count_records(history)
+                time_span(history)
+
+        print("count_records + time_span, per call:")
+        for label, history in (("sharded", sharded), ("single file", single)):
+            print(f"  {label:<32} {best_of(lambda: summary(history)) * 10:8.3f} ms")
+
+        result = compact(sharded, retention_months=12, now=now)
+        print(
+            f"Retention (12 months): dropped {result.dropped:,} records; "
+            f"full scan now {best_of(lambda: sum(1 for _ in scan_rows(sharded)), 1):.2f}s "
+            f"vs {best_of(lambda: sum(1 for _ in scan_rows(single)), 1):.2f}s"
+        )
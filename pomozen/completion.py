@@ -0,0 +1,321 @@
+# pomozen/completion.py
+# Shell completion. Runs on every TAB press, so it only imports modules that
+# are built into the interpreter: commands, options and setting names come
+# from an index pre-generated by cli.py (Typer, Rich, plyer, config loading
+# take ~0.2-0.3 s to import), and the index is a marshal dump, which loads
+# without importing json.
+from __future__ import annotations
+
+import marshal
+import os
+import sys
+from bisect import bisect_left
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:  # typing alone costs a few ms per TAB
+    from typing import Dict, List, Optional
+
+INDEX_VERSION = 1
+TASKS = "@tasks"  # Value hint: complete known task names
+SHELLS = ("bash", "zsh", "fish")
+_CLI_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cli.py")
+# marshal's format changes between Python versions, so it's part of the key
+_STAMP = (INDEX_VERSION, marshal.version, sys.version_info[:2])
+
+
+# --- Index location ---
+def get_index_path() -> str:
+    """completion.idx, next to history.bin (see history.get_history_path).
+
+    Not imported from history.py: that pulls in the timer and its imports.
+    """
+    home = os.path.expanduser("~")
+    if sys.platform == "win32":
+        data_dir = os.environ.get("APPDATA", os.path.join(home, "AppData", "Roaming"))
+    elif sys.platform == "darwin":
+        data_dir = os.path.join(home, "Library", "Application Support")
+    else:  # Assume Linux/Unix-like
+        data_dir = os.environ.get(
+            "XDG_DATA_HOME", os.path.join(home, ".local", "share")
+        )
+    return os.path.join(data_dir, "pomozen", "completion.idx")
+
+
+# --- Building the index (runs with the full app loaded) ---
+def describe_commands(group, hints: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Options and arguments of each command of a Click group.
+
+    `hints` adds value suggestions per command: option name -> values, and
+    "args" -> one entry per positional argument. Values are a list, TASKS,
+    or a dict keyed by the previous positional argument.
+    """
+    commands = {}
+    for name, command in sorted(group.commands.items()):
+        command_hints = hints.get(name, {})
+        options: Dict[str, Optional[list]] = {}
+        args = []
+        for param in command.params:
+            choices = list(getattr(param.type, "choices", None) or [])
+            if param.param_type_name == "argument":
+                args.append(choices)
+                continue
+            takes_value = not (param.is_flag or param.count)
+            for flag in param.opts + param.secondary_opts:
+                value = command_hints.get(flag, choices)
+                options[flag] = value if takes_value else None
+        for position, value in enumerate(command_hints.get("args", ())):
+            if position < len(args):
+                args[position] = value
+        options["--help"] = options["-h"] = None
+        commands[name] = {"options": options, "args": args}
+    return commands
+
+
+def write_index(
+    commands: Dict[str, Dict],
+    path: Optional[str] = None,
+    tasks: Optional[List[str]] = None,
+    tasks_size: int = 0,
+):
+    """Atomically writes the index. `tasks` must be sorted by str.casefold."""
+    path = str(path or get_index_path())
+    tasks = tasks or []
+    index = {
+        "stamp": _STAMP,
+        "cli_mtime": os.stat(_CLI_PATH).st_mtime,
+        "commands": commands,
+        "tasks_size": tasks_size,  # Bytes of history.tasks already included
+        "tasks": tasks,
+        "task_keys": [name.casefold() for name in tasks],
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(marshal.dumps(index))
+    os.replace(temp_path, path)
+
+
+def load_index(path: Optional[str] = None) -> Optional[dict]:
+    """The index, or None if it's missing, unreadable or older than cli.py."""
+    try:
+        with open(path or get_index_path(), "rb") as f:
+            index = marshal.loads(f.read())  # ~10x faster than marshal.load(f)
+        if (
+            index.get("stamp") != _STAMP
+            or index.get("cli_mtime") != os.stat(_CLI_PATH).st_mtime
+        ):
+            return None  # Written by another pomozen or Python version
+    except (OSError, ValueError, EOFError, TypeError, AttributeError):
+        return None
+    return index
+
+
+def _regenerate(path: str) -> Optional[dict]:
+    """Slow path (first TAB, or after an upgrade): imports the app once."""
+    try:
+        from .cli import write_completion_index
+
+        write_completion_index(path)
+    except Exception as e:  # Completion must never print a traceback
+        print(f"Warning: Could not build completion index: {e}", file=sys.stderr)
+        return None
+    return load_index(path)
+
+
+# --- Task names ---
+def _refresh_tasks(index: dict, index_path: str):
+    """Picks up names appended to history.tasks since the index was written."""
+    names_path = os.path.join(os.path.dirname(index_path), "history.tasks")
+    try:
+        size = os.stat(names_path).st_size
+    except OSError:
+        return
+    known = index["tasks_size"]
+    if size == known:
+        return
+    if size < known:  # Replaced: start over
+        known = 0
+        index["tasks"], index["task_keys"] = [], []
+    with open(names_path, "rb") as f:
+        f.seek(known)
+        data = f.read()
+    end = data.rfind(b"\n") + 1  # Ignore a half-written last line
+    tasks, keys = index["tasks"], index["task_keys"]
+    for name in data[:end].decode("utf-8").splitlines():
+        key = name.casefold()
+        position = bisect_left(keys, key)
+        keys.insert(position, key)
+        tasks.insert(position, name)
+    try:
+        write_index(index["commands"], index_path, tasks, known + end)
+    except OSError:
+        pass  # Read-only data dir: still answer from memory
+
+
+def _complete_tasks(index: dict, prefix: str) -> List[str]:
+    key = prefix.casefold()
+    tasks, keys = index["tasks"], index["task_keys"]
+    matches = []
+    position = bisect_left(keys, key)
+    while position < len(keys) and keys[position].startswith(key):
+        matches.append(tasks[position])
+        position += 1
+    return matches
+
+
+# --- Completing ---
+def _unquote(word: str) -> str:
+    """Strips shell quoting from the word being typed (bash/zsh pass it raw)."""
+    if word[:1] in ("'", '"'):
+        return word[1:].rstrip(word[0])
+    return word.replace("\\", "")
+
+
+def complete(words: List[str], index: dict, index_path: Optional[str] = None):
+    """Candidates for the last of `words` (the command line after 'pomozen')."""
+    *before, current = words or [""]
+    current = _unquote(current)
+    commands = index["commands"]
+    name = next((w for w in before if not w.startswith("-")), None)
+    if name not in commands:
+        if name is not None:
+            return []
+        pool = ["--help", "-h"] if current.startswith("-") else sorted(commands)
+        return [word for word in pool if word.startswith(current)]
+
+    command = commands[name]
+    options = command["options"]
+    after = before[before.index(name) + 1 :]
+    values = None
+    if after and options.get(after[-1]) is not None:
+        values = options[after[-1]]  # Completing an option's value
+    elif current.startswith("-"):
+        return sorted(word for word in options if word.startswith(current))
+    else:
+        # Positional arguments so far, skipping options and their values
+        positional: List[str] = []
+        skip = False
+        for word in after:
+            if skip:
+                skip = False
+            elif word.startswith("-"):
+                skip = options.get(word) is not None
+            else:
+                positional.append(word)
+        args = command["args"]
+        if positional and len(args) == 1 and not args[0]:
+            return []  # e.g. several files: leave it to the shell
+        values = args[min(len(positional), len(args) - 1)] if args else []
+        if isinstance(values, dict):
+            values = values.get(positional[-1] if positional else "", [])
+    if values == TASKS:
+        _refresh_tasks(index, index_path or get_index_path())
+        return _complete_tasks(index, current)
+    return [value for value in values if value.startswith(current)]
+
+
+def main(words: List[str]) -> int:
+    index_path = get_index_path()
+    index = load_index(index_path) or _regenerate(index_path)
+    if index is None:
+        return 1
+    for candidate in complete(words, index, index_path):
+        print(candidate)
+    return 0
+
+
+# --- Shell scripts ---
+# `python -c` rather than `-m pomozen.completion`: runpy adds several ms
+ENTRY = "import sys; from pomozen.completion import main; sys.exit(main(sys.argv[1:]))"
+_BASH = """\
+_pomozen_complete() {
+    local IFS=$'\\n'
+    COMPREPLY=($(%(python)s -c "%(entry)s" "${COMP_WORDS[@]:1:COMP_CWORD}" 2>/dev/null))
+    compopt -o filenames 2>/dev/null  # Escape spaces in task names
+}
+complete -o default -F _pomozen_complete pomozen
+"""
+_ZSH = """\
+_pomozen() {
+    local -a candidates
+    candidates=("${(@f)$(%(python)s -c "%(entry)s" "${(@)words[2,CURRENT]}" 2>/dev/null)}")
+    if (( ${#candidates[@]} && ${#candidates[1]} )); then
+        compadd -a candidates
+    else
+        _files
+    fi
+}
+compdef _pomozen pomozen
+"""
+_FISH = """\
+complete -c pomozen -f -a '(%(python)s -c "%(entry)s" (commandline -opc)[2..-1] (commandline -ct) 2>/dev/null)'
+"""
+
+
+def shell_script(shell: str, python: Optional[str] = None) -> str:
+    """Completion script for `shell`, calling this module with `python`."""
+    scripts = {"bash": _BASH, "zsh": _ZSH, "fish": _FISH}
+    if shell not in scripts:
+        raise ValueError(f"Unknown shell '{shell}'. Use one of: {', '.join(SHELLS)}")
+    return scripts[shell] % {"python": python or sys.executable, "entry": ENTRY}
+
+
+# --- Benchmark: `python -m pomozen.completion --benchmark [runs] [tasks]` ---
+def _benchmark(runs: int, task_count: int):
+    """TAB latency (a fresh process each time) against importing the full app."""
+    import subprocess
+    import tempfile
+    import time
+
+    def measure(argv: List[str], env: dict) -> str:
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run(argv, env=env, stdout=subprocess.DEVNULL, check=True)
+            samples.append(time.perf_counter() - start)
+        samples.sort()
+        return (
+            f"p50 {samples[len(samples) // 2] * 1e3:6.1f} ms, "
+            f"p90 {samples[int(len(samples) * 0.9)] * 1e3:6.1f} ms"
+        )
+
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = dict(os.environ, XDG_DATA_HOME=data_dir)
+        env.pop("PYTHONDONTWRITEBYTECODE", None)  # Time it as installed: cached .pyc
+        env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [package_root, os.environ.get("PYTHONPATH")])
+        )
+        os.makedirs(os.path.join(data_dir, "pomozen"))
+        names_path = os.path.join(data_dir, "pomozen", "history.tasks")
+        with open(names_path, "w", encoding="utf-8") as f:
+            f.writelines(f"task {i}\n" for i in range(task_count))
+        complete_argv = [sys.executable, "-c", ENTRY]
+        # First TAB builds the index (imports the app once)
+        subprocess.run(
+            complete_argv + ["tasks", ""],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+        rows = [
+            ("python startup alone", [sys.executable, "-c", "pass"]),
+            ("TAB: command names", complete_argv + ["st"]),
+            ("TAB: set keys", complete_argv + ["set", "lo"]),
+            (
+                f"TAB: task names ({task_count:,})",
+                complete_argv + ["start", "-t", "task 1"],
+            ),
+            ("full app import (Typer)", [sys.executable, "-c", "import pomozen.cli"]),
+        ]
+        for label, argv in rows:
+            print(f"{label:<26} {measure(argv, env)}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--benchmark"]:
+        runs = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+        _benchmark(runs, int(sys.argv[3]) if len(sys.argv) > 3 else 1_000)
+    else:  # Try a completion by hand: python -m pomozen.completion -- set lo
+        words = sys.argv[1:]
+        sys.exit(main(words[1:] if words[:1] == ["--"] else words))
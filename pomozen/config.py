@@ -39,9 +39,25 @@ DEFAULT_CONFIG: Dict[str, Any] = {
     "settings": {
         "long_break_interval": 4,
         "sound_notification": False,
+        "history_retention_months": 0,  # Older history is deleted; 0 keeps all
+    },
+    "schedule": {
+        "day_start": "09:00",
+        "day_end": "17:00",
+        "lunch_start": "12:00",
+        "lunch_duration": 0,  # Minutes; 0 disables the lunch gap
     },
 }
 
+# Schedule keys holding 'HH:MM' clock times (validated separately from numbers)
+CLOCK_SETTINGS = ("day_start", "day_end", "lunch_start")
+# Keys `pomozen set` accepts (pattern is a list: edit the file for that)
+SETTABLE_KEYS = tuple(
+    key
+    for section in ("durations", "settings", "schedule")
+    for key in DEFAULT_CONFIG[section]
+)
+
 
 # --- Configuration Path --- (Keep as before)
 def get_config_path() -> Path:
@@ -82,37 +98,78 @@ def load_config() -> Dict[str, Any]:
                 file=sys.stderr,
             )
 
-    # --- Validation (Keep as before) ---
+    validate_config(config)
+
+    return config
+
+
+def validate_config(config: Dict[str, Any], strict: bool = False):
+    """Checks a merged config in place.
+
+    Invalid values are replaced by their defaults with a warning, or raise
+    ValueError when `strict` (e.g. per-timer overrides in a dashboard file).
+    """
+
+    def invalid(problem: str, fallback: str = "Using default."):
+        if strict:
+            raise ValueError(problem)
+        print(f"Warning: {problem} in config. {fallback}", file=sys.stderr)
+
     # durations
     for key, value in config.get("durations", {}).items():
         if not isinstance(value, int) or value <= 0:
-            print(
-                f"Warning: Invalid duration '{value}' for '{key}' in config. Using default.",
-                file=sys.stderr,
-            )
+            invalid(f"Invalid duration '{value}' for '{key}'")
             config["durations"][key] = DEFAULT_CONFIG["durations"].get(key, 1)
     # long_break_interval
     interval = config.get("settings", {}).get("long_break_interval", 4)
     if not isinstance(interval, int) or interval <= 0:
-        print(
-            f"Warning: Invalid long_break_interval '{interval}' in config. Using default.",
-            file=sys.stderr,
-        )
+        invalid(f"Invalid long_break_interval '{interval}'")
         config["settings"]["long_break_interval"] = DEFAULT_CONFIG["settings"][
             "long_break_interval"
         ]
     # sound_notification (ensure boolean)
     sound = config.get("settings", {}).get("sound_notification", False)
     if not isinstance(sound, bool):
-        print(
-            f"Warning: Invalid sound_notification '{sound}' in config (should be true/false). Using default.",
-            file=sys.stderr,
-        )
+        invalid(f"Invalid sound_notification '{sound}' (should be true/false)")
         config["settings"]["sound_notification"] = DEFAULT_CONFIG["settings"][
             "sound_notification"
         ]
-
-    return config
+    # history_retention_months (0 keeps everything)
+    retention = config["settings"].get("history_retention_months", 0)
+    if not isinstance(retention, int) or retention < 0:
+        invalid(f"Invalid history_retention_months '{retention}'")
+        config["settings"]["history_retention_months"] = DEFAULT_CONFIG["settings"][
+            "history_retention_months"
+        ]
+    # schedule clock times (HH:MM)
+    schedule = config.setdefault("schedule", {})
+    for key in CLOCK_SETTINGS:
+        value = schedule.get(key, DEFAULT_CONFIG["schedule"][key])
+        if not _is_valid_clock(value):
+            invalid(f"Invalid time '{value}' for '{key}' (use HH:MM)")
+            schedule[key] = DEFAULT_CONFIG["schedule"][key]
+    # lunch_duration (0 disables lunch)
+    lunch = schedule.get("lunch_duration", 0)
+    if not isinstance(lunch, int) or lunch < 0:
+        invalid(f"Invalid lunch_duration '{lunch}'")
+        schedule["lunch_duration"] = DEFAULT_CONFIG["schedule"]["lunch_duration"]
+    # pattern (optional list of session names, e.g. ["work", "short_break"])
+    pattern = schedule.get("pattern")
+    if pattern is not None and (
+        not isinstance(pattern, list)
+        or not pattern
+        or any(name not in DEFAULT_CONFIG["durations"] for name in pattern)
+    ):
+        invalid(f"Invalid schedule pattern '{pattern}'", "Using the default cycle.")
+        del schedule["pattern"]
+
+
+def _is_valid_clock(value: Any) -> bool:
+    """Checks that a value is an 'HH:MM' time of day."""
+    hours, sep, minutes = str(value).partition(":")
+    if not (sep and hours.isdigit() and minutes.isdigit()):
+        return False
+    return int(hours) * 60 + int(minutes) <= 1440 and int(minutes) < 60
 
 
 # --- Save Configuration --- (New Function)
@@ -144,6 +201,7 @@ def update_setting(setting_name: str, new_value_str: str) -> Tuple[bool, str]:
     target_section: Optional[Dict] = None
     target_key: Optional[str] = None
     is_boolean_setting = False
+    is_clock_setting = False
 
     # Find where the setting lives
     if setting_name in config_data.get("durations", {}):
@@ -155,9 +213,15 @@ def update_setting(setting_name: str, new_value_str: str) -> Tuple[bool, str]:
         # Check if this specific setting should be boolean
         if setting_name == "sound_notification":
             is_boolean_setting = True
+    elif setting_name in config_data.get("schedule", {}) and setting_name != "pattern":
+        target_section = config_data["schedule"]
+        target_key = setting_name
+        is_clock_setting = setting_name in CLOCK_SETTINGS
     else:
-        valid_keys = list(config_data.get("durations", {}).keys()) + list(
-            config_data.get("settings", {}).keys()
+        valid_keys = (
+            list(config_data.get("durations", {}).keys())
+            + list(config_data.get("settings", {}).keys())
+            + list(DEFAULT_CONFIG["schedule"].keys())
         )
         return (
             False,
@@ -177,10 +241,23 @@ def update_setting(setting_name: str, new_value_str: str) -> Tuple[bool, str]:
                 False,
                 f"Invalid boolean value '{new_value_str}'. Use true/false, yes/no, 1/0.",
             )
-    else:  # Assume integer for durations and interval
+    elif is_clock_setting:
+        if not _is_valid_clock(new_value_str):
+            return (
+                False,
+                f"Invalid time '{new_value_str}' for '{original_setting_name}'. Use HH:MM.",
+            )
+        new_value = new_value_str
+    else:  # Assume integer for durations, interval and lunch_duration
         try:
             new_value = int(new_value_str)
-            if new_value <= 0:
+            # lunch_duration and retention may be 0 (disabled); the rest must be positive
+            minimum = (
+                0
+                if setting_name in ("lunch_duration", "history_retention_months")
+                else 1
+            )
+            if new_value < minimum:
                 return (
                     False,
                     f"Value for '{original_setting_name}' must be a positive number.",
@@ -0,0 +1,239 @@
+# pomozen/dashboard.py
+import copy
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from rich.live import Live
+
+from .config import load_config, tomllib, validate_config
+from .display import make_progress
+from .keyboard import get_keys_if_available
+from .timer import SessionType, Timer
+
+# Sections a per-timer key may belong to (checked in this order)
+_SECTIONS = ("durations", "settings", "schedule")
+
+
+# --- Dashboard Config ---
+def load_dashboard_timers(
+    path: Path,
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable[[float], None] = time.sleep,
+) -> List[Timer]:
+    """Reads `[[timer]]` tables from a TOML file into named Timers.
+
+    Each table needs a `name`; any other key overrides the matching setting
+    from the user's config (e.g. `work = 50`, `long_break_interval = 3`).
+    Raises ValueError for unknown settings and invalid values.
+    """
+    with open(path, "rb") as f:
+        data = tomllib.load(f)
+
+    base = load_config()
+    timers: List[Timer] = []
+    for index, entry in enumerate(data.get("timer", []), start=1):
+        config = copy.deepcopy(base)
+        name = str(entry.get("name", f"Timer {index}"))
+        for key, value in entry.items():
+            if key == "name":
+                continue
+            section = next((s for s in _SECTIONS if key in config.get(s, {})), None)
+            if section is None and key != "pattern":
+                raise ValueError(f"Unknown setting '{key}' for timer '{name}'")
+            config[section or "schedule"][key] = value
+        try:
+            validate_config(config, strict=True)  # As load_config, but no fallback
+        except ValueError as e:
+            raise ValueError(f"Timer '{name}': {e}") from e
+        timers.append(Timer(config, name=name, clock=clock, sleep=sleep))
+
+    if not timers:
+        raise ValueError(f"No [[timer]] tables found in {path}")
+    return timers
+
+
+# --- Shared Loop ---
+class Dashboard:
+    """Runs many named Timers from one loop with one progress row each."""
+
+    def __init__(
+        self,
+        timers: List[Timer],
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.timers = timers
+        self.clock = clock
+        self.sleep = sleep
+        self.focus = 0
+        self.progress = make_progress()
+        self.live: Optional[Live] = None  # Redrawn once per tick while set
+        self._task_ids: List[Any] = []
+
+    # --- Rows ---
+    def _describe(self, index: int) -> str:
+        timer = self.timers[index]
+        color = (
+            "[bold red]"
+            if timer.current_session_type == SessionType.WORK
+            else "[bold blue]"
+        )
+        marker = "[bold yellow]▶[/]" if index == self.focus else " "
+        description = f"{marker} [bold]{timer.name}[/] {color}{timer.session_name}"
+        if timer.is_paused:
+            description += " [yellow](Paused)"
+        return description
+
+    def _add_rows(self):
+        for index, timer in enumerate(self.timers):
+            timer.start_session()
+            self._task_ids.append(
+                self.progress.add_task(
+                    description=self._describe(index),
+                    total=timer.duration,
+                    completed=0,
+                    remaining_text=f"{timer.duration // 60:02d}:00",
+                )
+            )
+
+    def _refresh_row(self, index: int):
+        timer = self.timers[index]
+        self.progress.update(
+            self._task_ids[index],
+            description=self._describe(index),
+            total=timer.duration,
+            completed=timer.elapsed,
+        )
+
+    # --- Input ---
+    def handle_key(self, key: str):
+        """Applies one key event to the dashboard (focus) or the focused timer."""
+        count = len(self.timers)
+        previous = self.focus
+        if key in ("tab", "down", "j"):
+            self.focus = (self.focus + 1) % count
+        elif key in ("shift_tab", "up", "k"):
+            self.focus = (self.focus - 1) % count
+        elif key.isdigit() and 1 <= int(key) <= count:
+            self.focus = int(key) - 1
+        elif key == "p":
+            self.timers[self.focus].toggle_pause()
+        elif key == "s":
+            timer = self.timers[self.focus]
+            timer.skip_session()
+            timer.start_session()
+        elif key == "q":
+            raise KeyboardInterrupt("Quit requested by user")
+        else:
+            return
+        if previous != self.focus:
+            self._refresh_row(previous)  # Drop the focus marker
+        self._refresh_row(self.focus)
+
+    # --- Loop ---
+    def tick(self) -> float:
+        """Advances every timer once; returns how long to sleep until the next tick."""
+        wakeup = 1.0
+        any_running = False
+        for index, timer in enumerate(self.timers):
+            if timer.update() and not timer.is_paused:
+                timer.complete_session()
+                timer.start_session()
+            self._refresh_row(index)
+            if not timer.is_paused:
+                any_running = True
+                # Wake on the soonest whole-second boundary or deadline
+                wakeup = min(wakeup, 1.0 - timer.elapsed % 1.0, timer.remaining)
+        return wakeup if any_running else 0.2
+
+    def run(
+        self,
+        key_source: Optional[Callable[[], List[str]]] = get_keys_if_available,
+        max_ticks: Optional[int] = None,
+    ):
+        """Runs until 'q'/Ctrl+C (raised as KeyboardInterrupt) or `max_ticks`."""
+        if not self._task_ids:
+            self._add_rows()
+        ticks = 0
+        while max_ticks is None or ticks < max_ticks:
+            if key_source is not None:
+                for key in key_source():
+                    self.handle_key(key)
+            wakeup = self.tick()
+            if self.live is not None:
+                self.live.refresh()
+            self.sleep(wakeup)
+            ticks += 1
+
+
+# --- Benchmark: one process with N timers vs N single-timer processes ---
+def _run_virtual(timer_count: int, ticks: int) -> Dict[str, float]:
+    """Runs `timer_count` timers for `ticks` loop iterations on a virtual clock."""
+    import io
+    import resource
+
+    from rich.console import Console
+
+    from .display import live_display
+
+    now = [0.0]
+
+    def clock() -> float:
+        return now[0]
+
+    def sleep(seconds: float):
+        now[0] += seconds
+
+    config = load_config()
+    timers = [
+        Timer(copy.deepcopy(config), name=f"T{i}", clock=clock, sleep=sleep)
+        for i in range(timer_count)
+    ]
+    dashboard = Dashboard(timers, clock=clock, sleep=sleep)
+    sink = Console(file=io.StringIO(), width=120, force_terminal=True)
+
+    cpu_start = time.process_time()
+    with live_display(dashboard.progress, live_console=sink) as dashboard.live:
+        dashboard.run(key_source=None, max_ticks=ticks)
+    cpu = time.process_time() - cpu_start
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"cpu": cpu, "rss_kb": float(rss_kb)}
+
+
+if __name__ == "__main__":
+    import json
+    import subprocess
+    import sys
+
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        # Child mode: report one measurement as JSON for the parent process
+        print(json.dumps(_run_virtual(int(sys.argv[2]), int(sys.argv[3]))))
+        sys.exit(0)
+
+    ticks = 600  # Ten minutes of virtual one-second ticks
+    command = [sys.executable, "-m", "pomozen.dashboard", "--child"]
+
+    def measure(timer_count: int) -> Dict[str, float]:
+        output = subprocess.run(
+            command + [str(timer_count), str(ticks)],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    single = measure(1)
+    print(
+        f"{'Timers':>6} | {'1 process CPU':>13} | {'1 process RSS':>13} | "
+        f"{'N processes CPU':>15} | {'N processes RSS':>15}"
+    )
+    for timer_count in (1, 10, 50, 100):
+        shared = measure(timer_count)
+        # N separate `start` processes cost at least N single-timer processes
+        print(
+            f"{timer_count:>6} | {shared['cpu']:>12.2f}s | "
+            f"{shared['rss_kb'] / 1024:>10.1f} MB | "
+            f"{single['cpu'] * timer_count:>14.2f}s | "
+            f"{single['rss_kb'] * timer_count / 1024:>12.1f} MB"
+        )
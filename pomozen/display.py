@@ -7,11 +7,13 @@ from rich.text import Text
 from rich.console import Console
 from rich.table import Table
 from rich.align import Align
+from rich.markup import escape
 from contextlib import contextmanager
 from typing import Generator, Optional
 
 # Import SessionType and SessionStatus if needed for type hints
 from .timer import SessionType, SessionStatus
+from .events import Completed, Paused, Resumed, SessionStarted, Tick
 
 console = Console()
 
@@ -29,6 +31,7 @@ TITLE_ART = """
 
 # --- Keyboard Controls Help Text ---
 CONTROLS_TEXT = "[bold yellow]Controls:[/]\n  [cyan]p[/] - Pause/Resume\n  [cyan]s[/] - Skip Session\n  [cyan]q[/] / [cyan]Ctrl+C[/] - Quit"
+DASHBOARD_CONTROLS_TEXT = "[bold yellow]Controls:[/]\n  [cyan]Tab[/] / [cyan]↑[/] [cyan]↓[/] / [cyan]1-9[/] - Focus timer\n  [cyan]p[/] - Pause/Resume focused\n  [cyan]s[/] - Skip focused session\n  [cyan]q[/] / [cyan]Ctrl+C[/] - Quit"
 
 
 # --- Progress Bar Setup --- (Keep TimeRemainingColumn, update Progress slightly)
@@ -43,23 +46,28 @@ class TimeRemainingColumn(TextColumn):
         )  # Style time directly
 
 
-progress = Progress(
-    SpinnerColumn(spinner_name="dots", style="progress.spinner"),
-    TextColumn(
-        "[progress.description]{task.description}"
-    ),  # Description set dynamically
-    BarColumn(
-        bar_width=None,
-        complete_style="green",
-        finished_style="bright_blue",
-        pulse_style="yellow",
-    ),
-    TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-    TimeRemainingColumn(
-        "Remaining: {task.fields[remaining_text]}"
-    ),  # Keep custom field name if needed by timer.py
-    expand=True,
-)
+def make_progress() -> Progress:
+    """Builds a Progress with PomoZen's columns (one row per session/timer)."""
+    return Progress(
+        SpinnerColumn(spinner_name="dots", style="progress.spinner"),
+        TextColumn(
+            "[progress.description]{task.description}"
+        ),  # Description set dynamically
+        BarColumn(
+            bar_width=None,
+            complete_style="green",
+            finished_style="bright_blue",
+            pulse_style="yellow",
+        ),
+        TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+        TimeRemainingColumn(
+            "Remaining: {task.fields[remaining_text]}"
+        ),  # Keep custom field name if needed by timer.py
+        expand=True,
+    )
+
+
+progress = make_progress()
 
 # --- Display Functions ---
 
@@ -155,6 +163,121 @@ def show_exit_message(quit_normally: bool = True):
     console.print(Panel(message, title=title, border_style=border, padding=(1, 2)))
 
 
+def show_dashboard_banner(timer_count: int):
+    """Displays the header and controls for the multi-timer dashboard."""
+    console.print(
+        Panel(
+            Align.center(
+                Text(f"Running {timer_count} timers side by side 🍅", style="bold")
+            ),
+            title="[bold magenta]PomoZen Dashboard[/]",
+            border_style="magenta",
+            padding=(1, 1),
+        )
+    )
+    console.print(
+        Panel(
+            DASHBOARD_CONTROLS_TEXT,
+            title="Controls",
+            border_style="yellow",
+            padding=(0, 1),
+        )
+    )
+    console.print()
+
+
+def show_team_update(update: dict):
+    """Prints one state change received from a shared team timer."""
+    session_name = update["session_type"].name.replace("_", " ").capitalize()
+    minutes, seconds = divmod(update["duration"] - update["elapsed"], 60)
+    remaining = f"{minutes:02d}:{seconds:02d} left"
+    labels = {
+        "snapshot": f"[cyan]Joined:[/] {session_name}",
+        "session": f"[bold]{session_name} started[/]",
+        "pause": f"[yellow]{session_name} paused[/]",
+        "resume": f"[green]{session_name} resumed[/]",
+        "skip": f"[yellow] » {session_name} skipped[/]",
+        "complete": f"[bold green] ✓ {session_name} completed![/]",
+        "tick": f"[dim]{session_name}[/]",
+    }
+    line = labels.get(update["kind"], session_name)
+    if update["kind"] not in ("skip", "complete"):
+        line += f" [dim]({remaining}{', paused' if update['paused'] else ''})[/]"
+    console.print(line)
+
+
+def show_report(users, team):
+    """Prints focus time, completion and best streak per user and session type."""
+    table = Table(
+        title="PomoZen Report",
+        show_header=True,
+        header_style="bold magenta",
+        border_style="blue",
+    )
+    table.add_column("User", style="bold")
+    table.add_column("Session")
+    table.add_column("Minutes", justify="right")
+    table.add_column("Sessions", justify="right")
+    table.add_column("Completed", justify="right")
+    table.add_column("Best streak", justify="right")
+
+    def add_rows(name, aggregate):
+        for session_type, stats in aggregate.types.items():
+            table.add_row(
+                name,
+                session_type.name.replace("_", " ").capitalize(),
+                f"{stats.seconds / 60:,.0f}",
+                f"{stats.sessions:,}",
+                f"{stats.completion_ratio:.0%}" if stats.sessions else "-",
+                str(stats.best),
+            )
+            name = ""  # Name only on the user's first row
+
+    for index, (name, aggregate) in enumerate(users):
+        if index:
+            table.add_section()
+        add_rows(name, aggregate)
+    if len(users) > 1:
+        table.add_section()
+        add_rows("[green]Team[/]", team)
+    console.print(table)
+
+
+def show_tasks(rows, known: int):
+    """Prints (task, completed work sessions, focus seconds) rows."""
+    if not rows:
+        console.print(
+            "[dim]No matching tasks. Label sessions with 'start --task'.[/dim]"
+        )
+        return
+    table = Table(
+        title="Tasks",
+        show_header=True,
+        header_style="bold magenta",
+        border_style="blue",
+    )
+    table.add_column("Task", style="bold")
+    table.add_column("Sessions", justify="right")
+    table.add_column("Focus", justify="right")
+    for name, completed, seconds in rows:
+        hours, minutes = divmod(seconds // 60, 60)
+        table.add_row(escape(name), str(completed), f"{hours}h {minutes:02d}m")
+    console.print(table)
+    if known > len(rows):
+        console.print(f"[dim]{len(rows)} of {known:,} known tasks shown.[/dim]")
+
+
+def show_memory_sample(sample, per_session: float):
+    """Prints a memory.MemorySample line plus the lines that grew the most."""
+    rss = f"RSS {sample.rss / 2**20:.1f} MB, " if sample.rss is not None else ""
+    console.print(
+        f"[dim]Memory after session {sample.session}: {rss}"
+        f"traced {sample.traced / 1024:.1f} KB ({per_session:+.0f} B/session)[/dim]"
+    )
+    for location, size in sample.growth:
+        console.print(f"[dim]  {size:+,} B  {escape(location)}[/dim]")
+
+
 # --- Config Display (Keep Table version as before) ---
 def show_config(config: dict):
     table = Table(
@@ -174,27 +297,142 @@ def show_config(config: dict):
     table.add_row("[green]Settings[/]", "")
     for key, value in config.get("settings", {}).items():
         table.add_row(f"  - {key.replace('_', ' ').capitalize()}", str(value))
+    # Schedule
+    table.add_section()
+    table.add_row("[green]Schedule[/]", "")
+    for key, value in config.get("schedule", {}).items():
+        suffix = " (min)" if key == "lunch_duration" else ""
+        table.add_row(f"  - {key.replace('_', ' ').capitalize()}{suffix}", str(value))
     console.print(table)
     from .config import get_config_path
 
     console.print(f"\n[dim]Config file location: {get_config_path()}[/dim]\n")
 
 
+# --- Status Display ---
+def show_status(plan, now: float):
+    """Prints the scheduled session at `now` plus time to the next break and day end."""
+    from .schedule import format_clock
+
+    session_type = plan.session_at(now)
+    if session_type is not None:
+        session_name = session_type.name.replace("_", " ").capitalize()
+        i = plan.slot_at(now)
+        current = f"[bold]{session_name}[/] (until {format_clock(plan.ends[i])})"
+    elif plan.is_gap(now):
+        current = "[bold]Lunch[/]"
+    else:
+        current = "[dim]Outside working hours[/]"
+
+    table = Table(show_header=False, border_style="blue", title="PomoZen Status")
+    table.add_column("Item", style="dim", width=25)
+    table.add_column("Value")
+    table.add_row("Now", f"{format_clock(now)} - {current}")
+    next_break = plan.time_until_next_break(now)
+    table.add_row("Next break in", f"{int(next_break) // 60} min")
+    table.add_row(
+        "End of day",
+        f"{format_clock(plan.end_of_day)} "
+        f"({int(plan.time_until_end_of_day(now)) // 60} min left)",
+    )
+    console.print(table)
+
+
 # --- Live Display Context --- (Update to use transient=True)
 @contextmanager
-def live_display() -> Generator[Progress, None, None]:
-    """Manages the Rich Live display context (progress bar is transient)."""
+def live_display(
+    target: Optional[Progress] = None, live_console: Optional[Console] = None
+) -> Generator[Live, None, None]:
+    """Manages the Rich Live display context (progress bar is transient).
+
+    There is no refresh thread: whoever updates `target` redraws through the
+    yielded Live (SessionView.live, Dashboard.live), so a paused or hidden
+    session doesn't wake up just to repaint an unchanged bar.
+    """
+    target = target or progress
     # Start Live with transient=True so the progress bar disappears on exit
     with Live(
-        progress,
-        console=console,
-        refresh_per_second=4,
+        target,
+        console=live_console or console,
+        auto_refresh=False,
         vertical_overflow="visible",
         transient=True,
     ) as live:
         try:
-            yield progress
+            yield live
         finally:
             # No need to explicitly stop or clear, transient handles the progress bar.
             # Ensure cursor is visible though, Live might hide it.
             console.show_cursor(True)
+
+
+# --- Event Subscriber: progress bar for `start` ---
+class SessionView:
+    """Draws a timer's events on a Progress, one row reused by every session.
+
+    The row is reset rather than re-added at each session, so a run of
+    thousands of sessions (`start --auto` for days) keeps one Rich task and
+    constant render cost. Descriptions are formatted once per session, so a
+    Tick is just one `completed=` update.
+    """
+
+    EVENT_TYPES = (SessionStarted, Tick, Paused, Resumed, Completed)
+
+    def __init__(self, target: Optional[Progress] = None):
+        self.progress = target or progress
+        self.live: Optional[Live] = None  # Redrawn after each event while set
+        self._task_id = None
+        self._description = ""
+        self._session_name = ""
+        self._finished_color = ""
+
+    @property
+    def row(self):
+        """The Rich task showing the current session (None before the first)."""
+        for task in self.progress.tasks:
+            if task.id == self._task_id:
+                return task
+        return None
+
+    def __call__(self, event):
+        kind = type(event)
+        if kind is Tick:
+            if self._task_id is not None:
+                self.progress.update(self._task_id, completed=event.elapsed)
+        elif kind is SessionStarted:
+            self._session_name = event.timer.session_name
+            if event.session_type == SessionType.WORK:
+                progress_color, self._finished_color = "[bold red]", "[bold bright_red]"
+            else:  # Breaks
+                progress_color = "[bold blue]"
+                self._finished_color = "[bold bright_blue]"
+            self._description = f"{progress_color}{self._session_name}"
+            if event.task:
+                self._description += f"[/] [dim]· {escape(event.task)}[/dim]"
+            fields = dict(
+                description=self._description,
+                total=event.duration,
+                completed=0,
+                remaining_text=f"{event.duration // 60:02d}:00",
+            )
+            if self._task_id in self.progress.task_ids:
+                self.progress.reset(self._task_id, **fields)  # Recycle the row
+            else:
+                self._task_id = self.progress.add_task(**fields)
+        elif self._task_id is None:
+            return  # Subscribed mid-session: nothing to draw on yet
+        elif kind is Paused:
+            self.progress.update(
+                self._task_id, description=f"{self._description} [yellow](Paused)"
+            )
+        elif kind is Resumed:
+            self.progress.update(self._task_id, description=self._description)
+        elif kind is Completed:
+            self.progress.update(
+                self._task_id,
+                completed=event.elapsed,
+                description=f"{self._finished_color}{self._session_name} Complete!",
+                remaining_text="Done!",
+            )
+        if self.live is not None:
+            self.live.refresh()
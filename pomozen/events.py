@@ -0,0 +1,306 @@
+# pomozen/events.py
+import sys
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Deque, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:  # Type hints only: timer.py imports this module
+    from .timer import SessionType, Timer
+
+
+# --- Events ---
+class Event:
+    """Base class: every event names the Timer it came from."""
+
+    __slots__ = ("timer",)
+
+    def __init__(self, timer: "Timer"):
+        self.timer = timer
+
+    def copy(self) -> "Event":
+        clone = object.__new__(type(self))
+        for cls in type(self).__mro__[:-1]:  # Skip `object`
+            for name in getattr(cls, "__slots__", ()):
+                setattr(clone, name, getattr(self, name))
+        return clone
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}"
+            for cls in reversed(type(self).__mro__[:-1])
+            for name in getattr(cls, "__slots__", ())
+            if name != "timer"
+        )
+        return f"{type(self).__name__}({fields})"
+
+
+class SessionStarted(Event):
+    __slots__ = ("session_type", "duration", "task", "started_at")
+
+    def __init__(
+        self,
+        timer: "Timer",
+        session_type: "SessionType",
+        duration: int,
+        task: Optional[str] = None,
+    ):
+        super().__init__(timer)
+        self.session_type = session_type
+        self.duration = duration
+        self.task = task  # Label of the work being done, if any
+        self.started_at = time.time()  # Wall clock, for history records
+
+
+class Tick(Event):
+    """Time advanced. Each Timer reuses one Tick; call copy() to keep it.
+
+    `new_minute` is True on the first tick of each whole elapsed minute, for
+    subscribers that only care about coarse progress.
+    """
+
+    __slots__ = ("elapsed", "remaining", "new_minute")
+
+    def __init__(self, timer: "Timer"):
+        super().__init__(timer)
+        self.elapsed = 0.0
+        self.remaining = 0.0
+        self.new_minute = False
+
+    def copy(self) -> "Tick":
+        clone = Tick(self.timer)
+        clone.elapsed = self.elapsed
+        clone.remaining = self.remaining
+        clone.new_minute = self.new_minute
+        return clone
+
+
+class _PauseChange(Event):
+    __slots__ = ("elapsed",)
+
+    def __init__(self, timer: "Timer", elapsed: float):
+        super().__init__(timer)
+        self.elapsed = elapsed
+
+
+class Paused(_PauseChange):
+    __slots__ = ()
+
+
+class Resumed(_PauseChange):
+    __slots__ = ()
+
+
+class _SessionEnd(Event):
+    """Carries the session's values, since the timer moves on right after."""
+
+    __slots__ = ("session_type", "planned", "elapsed", "task")
+
+    def __init__(
+        self,
+        timer: "Timer",
+        session_type: "SessionType",
+        planned: int,
+        elapsed: float,
+        task: Optional[str] = None,
+    ):
+        super().__init__(timer)
+        self.session_type = session_type
+        self.planned = planned
+        self.elapsed = elapsed
+        self.task = task
+
+
+class Completed(_SessionEnd):
+    __slots__ = ()
+
+
+class Skipped(_SessionEnd):
+    __slots__ = ()
+
+
+EVENT_TYPES = (SessionStarted, Tick, Paused, Resumed, Completed, Skipped)
+# Stable names for serialised events (web page, NDJSON stream)
+EVENT_NAMES = {
+    SessionStarted: "session_started",
+    Tick: "tick",
+    Paused: "paused",
+    Resumed: "resumed",
+    Completed: "completed",
+    Skipped: "skipped",
+}
+Handler = Callable[[Event], None]
+
+
+# --- Dispatch ---
+class EventBus:
+    """Routes each event type straight to a tuple of subscribers.
+
+    Lookup is one dict access on the exact event class, so publishing an
+    event nobody subscribed to costs next to nothing. Subscribers run
+    synchronously on the publishing thread; wrap slow ones in Batched.
+    """
+
+    __slots__ = ("_handlers",)
+
+    def __init__(self):
+        self._handlers: Dict[type, Tuple[Handler, ...]] = {}
+
+    def subscribe(self, handler: Handler, *event_types: type) -> Handler:
+        """Registers `handler(event)` for `event_types` (default: all of them)."""
+        for event_type in event_types or EVENT_TYPES:
+            self._handlers[event_type] = self._handlers.get(event_type, ()) + (handler,)
+        return handler
+
+    def unsubscribe(self, handler: Handler):
+        for event_type, handlers in list(self._handlers.items()):
+            remaining = tuple(h for h in handlers if h is not handler)
+            if remaining:
+                self._handlers[event_type] = remaining
+            else:
+                del self._handlers[event_type]
+
+    def handlers(self, event_type: type) -> Tuple[Handler, ...]:
+        """Subscribers for `event_type`; empty means the event needn't be built."""
+        return self._handlers.get(event_type, ())
+
+    def publish(self, event: Event):
+        for handler in self._handlers.get(type(event), ()):
+            handler(event)
+
+
+class Batched:
+    """Runs a slow subscriber on its own thread so it never stalls the timer.
+
+    Events queue up while the subscriber is busy and are delivered together:
+    to `handler.handle_batch(events)` when it has one, otherwise one call per
+    event. Consecutive ticks of the same timer collapse into the latest one,
+    and past `max_pending` the oldest events are dropped (and counted).
+    """
+
+    def __init__(self, handler: Callable, max_pending: int = 1024):
+        self.handler = handler
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._deliver = getattr(handler, "handle_batch", None)
+        self._pending: Deque[Event] = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def __call__(self, event: Event):
+        with self._condition:
+            if self._closed:
+                return
+            pending = self._pending
+            if type(event) is Tick:
+                last = pending[-1] if pending else None
+                if type(last) is Tick and last.timer is event.timer:
+                    # Still undelivered: refresh our copy in place
+                    last.elapsed = event.elapsed
+                    last.remaining = event.remaining
+                    last.new_minute = last.new_minute or event.new_minute
+                    return
+                event = event.copy()  # The timer reuses its Tick
+            pending.append(event)
+            if len(pending) > self.max_pending:
+                pending.popleft()
+                self.dropped += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="pomozen-events", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return  # Closed and drained
+                batch: List[Event] = list(self._pending)
+                self._pending.clear()
+            try:
+                if self._deliver is not None:
+                    self._deliver(batch)
+                else:
+                    for event in batch:
+                        self.handler(event)
+            except Exception as e:  # A broken subscriber must not kill delivery
+                print(f"Warning: Event subscriber failed: {e}", file=sys.stderr)
+
+    def close(self, timeout: float = 5.0):
+        """Delivers whatever is still queued, then stops the thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+# --- Benchmark: dispatch cost per tick ---
+if __name__ == "__main__":
+    import timeit
+
+    from .config import load_config
+    from .timer import Timer
+
+    # The timer publishes pomozen.events classes, not this __main__ copy
+    from .events import Batched, Tick
+
+    now = [0.0]
+    ticks = 100_000
+    config = load_config()
+
+    def bus_step(subscribers: int, batched: bool = False):
+        timer = Timer(config, clock=lambda: now[0])
+        for _ in range(subscribers):
+            handler = lambda event: None
+            timer.events.subscribe(Batched(handler) if batched else handler, Tick)
+        timer.start_session()
+        timer.duration = 10**9
+
+        def step():
+            now[0] += 1.0
+            timer.update()
+
+        return step
+
+    # Old API: each tick built a kwargs dict and a description string and
+    # went through an if/elif string dispatch
+    def old_updater(action, task_id=None, **kwargs):
+        if action == "add_task":
+            return 0
+        elif action == "update":
+            return None
+
+    old_timer = Timer(config, clock=lambda: now[0])
+    old_timer.start_session()
+    old_timer.duration = 10**9
+    desc_base = "[bold red]Work"
+
+    def old_step():
+        now[0] += 1.0
+        old_timer.update()
+        old_updater(
+            "update", 0, completed=old_timer.elapsed, description=f"{desc_base}"
+        )
+
+    steps = [
+        ("progress_updater (strings/kwargs)", old_step),
+        ("EventBus, 0 subscribers", bus_step(0)),
+        ("EventBus, 1 subscriber", bus_step(1)),
+        ("EventBus, 4 subscribers", bus_step(4)),
+        ("EventBus, 1 Batched subscriber", bus_step(1, True)),
+    ]
+    # CPU speed can drift between runs, so rounds are interleaved and the best kept
+    best = [float("inf")] * len(steps)
+    for _ in range(7):
+        for index, (_, step) in enumerate(steps):
+            best[index] = min(best[index], timeit.timeit(step, number=ticks) / ticks)
+    base = best[1]  # update() alone: nobody subscribed
+    print(f"{'':<34} {'per tick':>9} {'dispatch':>9}")
+    for (label, _), seconds in zip(steps, best):
+        print(f"{label:<34} {seconds * 1e9:6.0f} ns {(seconds - base) * 1e9:6.0f} ns")
@@ -0,0 +1,263 @@
+# pomozen/export.py
+import json
+import sys
+import time
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional
+
+from .history import SessionRecord
+from .timer import SessionStatus, SessionType
+
+# --- Optional columnar backend ---
+try:
+    import pyarrow
+    import pyarrow.parquet as pyarrow_parquet
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+FORMATS = ("csv", "jsonl", "parquet")
+COLUMNS = (
+    "started_at",
+    "session_type",
+    "status",
+    "planned_seconds",
+    "actual_seconds",
+    "task",
+)
+WRITE_CHUNK_BYTES = 1 << 20  # Flush text output in ~1 MB writes
+PARQUET_ROW_GROUP = 64 * 1024  # Records per Parquet row group
+
+# Enum .name is a descriptor call; look names up once per export instead
+_TYPE_NAMES = {t: t.name.lower() for t in SessionType}
+_STATUS_NAMES = {s: s.name.lower() for s in SessionStatus}
+
+
+# --- Row formatting ---
+# "MM:SSZ" for every second of an hour, so formatting is two lookups
+_HOURS = [f"{hour:02d}:" for hour in range(24)]
+_MINUTE_SECONDS = [f"{i // 60:02d}:{i % 60:02d}Z" for i in range(3600)]
+
+
+class _IsoClock:
+    """Formats sorted UTC timestamps as ISO 8601, formatting each day only once."""
+
+    def __init__(self):
+        self._day_start = -1
+        self._day_end = -1
+        self._prefix = ""
+
+    def __call__(self, timestamp: int) -> str:
+        if not self._day_start <= timestamp < self._day_end:
+            self._day_start = timestamp - timestamp % 86400
+            self._day_end = self._day_start + 86400
+            self._prefix = time.strftime("%Y-%m-%dT", time.gmtime(self._day_start))
+        seconds = timestamp - self._day_start
+        return self._prefix + _HOURS[seconds // 3600] + _MINUTE_SECONDS[seconds % 3600]
+
+
+TaskName = Callable[[int], Optional[str]]  # Task id -> label (see tasks.TaskIndex)
+
+
+def _no_task(task_id: int) -> Optional[str]:
+    return None
+
+
+def _task_labels(task_name: TaskName, render: Callable[[str], str], missing):
+    """Task id -> rendered label, rendering each task only once."""
+    labels = {0: missing}
+
+    def label(task_id: int):
+        text = labels.get(task_id)
+        if text is None:
+            name = task_name(task_id)
+            text = labels[task_id] = missing if name is None else render(name)
+        return text
+
+    return label
+
+
+def _csv_field(text: str) -> str:
+    if any(c in text for c in ',"'):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def _csv_lines(records: Iterable[SessionRecord], task_name: TaskName) -> Iterator[str]:
+    iso, type_names, status_names = _IsoClock(), _TYPE_NAMES, _STATUS_NAMES
+    task_label = _task_labels(task_name, _csv_field, "")
+    yield ",".join(COLUMNS) + "\n"
+    for started_at, planned, actual, session_type, status, task in records:
+        # Only task names can need quoting: the rest are numbers, ISO dates
+        # or fixed lower-case names
+        yield (
+            f"{iso(started_at)},{type_names[session_type]},"
+            f"{status_names[status]},{planned},{actual},{task_label(task)}\n"
+        )
+
+
+def _jsonl_lines(
+    records: Iterable[SessionRecord], task_name: TaskName
+) -> Iterator[str]:
+    iso, type_names, status_names = _IsoClock(), _TYPE_NAMES, _STATUS_NAMES
+    task_label = _task_labels(task_name, json.dumps, "null")
+    for started_at, planned, actual, session_type, status, task in records:
+        yield (
+            f'{{"started_at":"{iso(started_at)}",'
+            f'"session_type":"{type_names[session_type]}",'
+            f'"status":"{status_names[status]}",'
+            f'"planned_seconds":{planned},'
+            f'"actual_seconds":{actual},'
+            f'"task":{task_label(task)}}}\n'
+        )
+
+
+_TEXT_FORMATS: Dict[
+    str, Callable[[Iterable[SessionRecord], TaskName], Iterator[str]]
+] = {
+    "csv": _csv_lines,
+    "jsonl": _jsonl_lines,
+}
+
+
+# --- Writers ---
+def _write_text(lines: Iterator[str], out: BinaryIO) -> None:
+    """Joins lines into ~1 MB chunks so each write() moves a lot of data."""
+    pending: List[str] = []
+    size = 0
+    for line in lines:
+        pending.append(line)
+        size += len(line)
+        if size >= WRITE_CHUNK_BYTES:
+            out.write("".join(pending).encode("utf-8"))
+            pending.clear()
+            size = 0
+    if pending:
+        out.write("".join(pending).encode("utf-8"))
+
+
+def _write_parquet(
+    records: Iterable[SessionRecord], task_name: TaskName, out: BinaryIO
+) -> None:
+    """Writes fixed-size row groups so only one group is held in memory."""
+    schema = pyarrow.schema(
+        [
+            ("started_at", pyarrow.timestamp("s", tz="UTC")),
+            ("session_type", pyarrow.dictionary(pyarrow.int8(), pyarrow.string())),
+            ("status", pyarrow.dictionary(pyarrow.int8(), pyarrow.string())),
+            ("planned_seconds", pyarrow.uint32()),
+            ("actual_seconds", pyarrow.uint32()),
+            ("task", pyarrow.dictionary(pyarrow.int32(), pyarrow.string())),
+        ]
+    )
+    task_label = _task_labels(task_name, str, None)
+    columns: List[List] = [[] for _ in COLUMNS]
+
+    def flush(writer):
+        table = pyarrow.Table.from_arrays(
+            [
+                pyarrow.array(columns[0], type=pyarrow.timestamp("s", tz="UTC")),
+                pyarrow.array(columns[1]).dictionary_encode(),
+                pyarrow.array(columns[2]).dictionary_encode(),
+                pyarrow.array(columns[3], type=pyarrow.uint32()),
+                pyarrow.array(columns[4], type=pyarrow.uint32()),
+                pyarrow.array(columns[5], type=pyarrow.string()).dictionary_encode(),
+            ],
+            schema=schema,
+        )
+        writer.write_table(table)
+        for column in columns:
+            column.clear()
+
+    with pyarrow_parquet.ParquetWriter(out, schema) as writer:
+        starts, types, statuses, planned, actual, tasks = columns
+        for record in records:
+            starts.append(record[0])
+            planned.append(record[1])
+            actual.append(record[2])
+            types.append(_TYPE_NAMES[record[3]])
+            statuses.append(_STATUS_NAMES[record[4]])
+            tasks.append(task_label(record[5]))
+            if len(starts) >= PARQUET_ROW_GROUP:
+                flush(writer)
+        if columns[0]:
+            flush(writer)
+
+
+def export_records(
+    records: Iterable[SessionRecord],
+    fmt: str,
+    out: BinaryIO,
+    task_name: Optional[TaskName] = None,
+) -> None:
+    """Streams records to a binary file object in the given format.
+
+    `task_name` turns task ids into labels (e.g. TaskIndex.name); without it
+    the task column is left empty.
+    """
+    task_name = task_name or _no_task
+    if fmt == "parquet":
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError(
+                "Parquet export needs 'pyarrow'. Install it with: pip install pyarrow"
+            )
+        _write_parquet(records, task_name, out)
+    elif fmt in _TEXT_FORMATS:
+        _write_text(_TEXT_FORMATS[fmt](records, task_name), out)
+    else:
+        raise ValueError(f"Unknown format '{fmt}'. Use one of: {', '.join(FORMATS)}")
+
+
+# --- Benchmark: export 10M records with flat memory ---
+if __name__ == "__main__":
+    import os
+    import resource
+    import tempfile
+    from pathlib import Path
+
+    from .history import append_records, scan
+
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    history_path = Path(tempfile.gettempdir()) / f"pomozen-bench-{total}.bin"
+
+    if not history_path.exists():
+        print(f"Generating {total:,} records at {history_path}...")
+        kinds = (SessionType.WORK, SessionType.SHORT_BREAK)
+        batch = 100_000
+        for offset in range(0, total, batch):
+            append_records(
+                (
+                    SessionRecord(
+                        1_600_000_000 + i * 900,
+                        1500,
+                        1500 - i % 7,
+                        kinds[i % 2],
+                        SessionStatus.COMPLETED if i % 5 else SessionStatus.SKIPPED,
+                    )
+                    for i in range(offset, min(total, offset + batch))
+                ),
+                history_path,
+            )
+
+    formats = [f for f in FORMATS if f != "parquet" or PYARROW_AVAILABLE]
+    for fmt in formats:
+        start = time.perf_counter()
+        with open(os.devnull, "wb") as sink:
+            export_records(scan(history_path), fmt, sink)
+        elapsed = time.perf_counter() - start
+        rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(
+            f"{fmt:>8}: {total:,} records in {elapsed:.1f}s "
+            f"({total / elapsed / 1e6:.2f} M rec/s), peak RSS {rss_mb:.1f} MB"
+        )
+
+    # Pushdown: one month out of the whole history should not scan everything
+    since = 1_600_000_000 + (total // 2) * 900
+    start = time.perf_counter()
+    with open(os.devnull, "wb") as sink:
+        export_records(
+            scan(history_path, since=since, until=since + 30 * 86400), "csv", sink
+        )
+    print(
+        f"   range: one month exported in {(time.perf_counter() - start) * 1e3:.1f} ms"
+    )
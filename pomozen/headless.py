@@ -0,0 +1,353 @@
+# pomozen/headless.py
+import collections
+import json
+import select
+import signal
+import socket
+import sys
+import threading
+import time
+from typing import Callable, Deque, List, Optional, Tuple
+
+from .events import (
+    EVENT_NAMES,
+    EVENT_TYPES,
+    Completed,
+    Event,
+    SessionStarted,
+    Skipped,
+    Tick,
+)
+from .ticks import TickPolicy
+from .timer import SessionStatus, SessionType, Timer
+
+# --- Plans ---
+# Session names (and one-letter aliases) accepted by --plan
+PLAN_NAMES = {
+    "work": SessionType.WORK,
+    "w": SessionType.WORK,
+    "short_break": SessionType.SHORT_BREAK,
+    "s": SessionType.SHORT_BREAK,
+    "long_break": SessionType.LONG_BREAK,
+    "l": SessionType.LONG_BREAK,
+}
+Step = Tuple[SessionType, Optional[int]]  # Session type, seconds (None: config)
+
+
+def parse_plan(text: str) -> List[Step]:
+    """'work:50,short_break,w,l:20' -> steps. Lengths are minutes (may be
+    fractional); steps without one use the configured duration."""
+    steps: List[Step] = []
+    for item in text.split(","):
+        name, _, minutes = item.strip().lower().partition(":")
+        if name not in PLAN_NAMES:
+            raise ValueError(
+                f"Unknown session '{name}' in plan. Use work, short_break or "
+                "long_break (or w, s, l), optionally with :MINUTES"
+            )
+        seconds = None
+        if minutes:
+            try:
+                seconds = round(float(minutes) * 60)
+            except ValueError:
+                seconds = 0
+            if seconds <= 0:
+                raise ValueError(f"Invalid length '{minutes}' for '{name}' in plan")
+        steps.append((PLAN_NAMES[name], seconds))
+    return steps
+
+
+# --- Output ---
+class NdjsonWriter:
+    """Timer subscriber writing one JSON object per line.
+
+    Lines collect in memory and go out in a single write + flush at each
+    event boundary (flush()), so a consumer never sees half a line and a
+    burst of events (Completed, then the next SessionStarted) costs one
+    system call instead of one per event.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream if stream is not None else sys.stdout.buffer
+        self.step = 0  # Index into the plan, included in every line
+        self.events = 0
+        self.writes = 0
+        self._lines: List[bytes] = []
+
+    def __call__(self, event: Event):
+        kind = type(event)
+        timer = event.timer
+        record = {
+            "event": EVENT_NAMES[kind],
+            "time": round(time.time(), 3),
+            "step": self.step,
+        }
+        if kind is Tick:
+            record["session"] = timer.current_session_type.name.lower()
+            record["elapsed"] = round(event.elapsed, 1)
+            record["remaining"] = round(event.remaining, 1)
+        elif kind is SessionStarted:
+            record["session"] = event.session_type.name.lower()
+            record["duration"] = event.duration
+            record["task"] = event.task
+        elif kind is Completed or kind is Skipped:
+            record["session"] = event.session_type.name.lower()
+            record["planned"] = event.planned
+            record["elapsed"] = round(event.elapsed, 1)
+            record["task"] = event.task
+        else:  # Paused / Resumed
+            record["session"] = timer.current_session_type.name.lower()
+            record["elapsed"] = round(event.elapsed, 1)
+        self.emit(record)
+
+    def emit(self, record: dict):
+        self._lines.append(json.dumps(record, separators=(",", ":")).encode() + b"\n")
+        self.events += 1
+
+    def flush(self):
+        if self._lines:
+            self.stream.write(b"".join(self._lines))
+            self._lines.clear()
+            self.stream.flush()
+            self.writes += 1
+
+
+# --- Runner ---
+COMMANDS = ("pause", "resume", "toggle", "skip", "quit")
+_ALIASES = {"p": "toggle", "s": "skip", "q": "quit"}
+_SIGNAL_COMMANDS = {"SIGUSR1": "toggle", "SIGUSR2": "skip"}
+_QUIT_SIGNALS = ("SIGINT", "SIGTERM")
+
+
+class HeadlessRun:
+    """Runs a fixed plan of sessions without a terminal UI.
+
+    Control commands (pause, resume, toggle, skip, quit; p/s/q) arrive one
+    per line on `commands` or as signals: SIGUSR1 toggles pause, SIGUSR2
+    skips, SIGINT/SIGTERM quit after flushing. Each wakes the loop at once.
+    """
+
+    def __init__(
+        self,
+        timer: Timer,
+        plan: List[Step],
+        writer: NdjsonWriter,
+        every_second: bool = False,
+        wait: Optional[Callable[[float], object]] = None,
+    ):
+        self.timer = timer
+        self.plan = plan
+        self.writer = writer
+        # Ticks once a minute by default, every second on request
+        self.policy = TickPolicy(visible=lambda: every_second, clock=timer.clock)
+        self.completed = 0
+        self.skipped = 0
+        self.exit_status = 0
+        self._commands: Deque[str] = collections.deque()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._wait = wait or self._wait_for_command
+        timer.events.subscribe(writer, *EVENT_TYPES)
+
+    # --- Commands ---
+    def post(self, command: str):
+        """Queues a command (thread- and signal-safe) and wakes the loop."""
+        self._commands.append(command)
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            pass  # A wakeup is already pending
+
+    def read_commands(self, stream):
+        """Feeds commands from a text stream (stdin) on a daemon thread."""
+
+        def reader():
+            for line in stream:
+                command = line.strip().lower()
+                if command:
+                    self.post(_ALIASES.get(command, command))
+
+        threading.Thread(target=reader, name="pomozen-commands", daemon=True).start()
+
+    def _on_signal(self, signum: int, frame):
+        name = signal.Signals(signum).name
+        if name in _QUIT_SIGNALS:
+            self.exit_status = 128 + signum
+            self.post("quit")
+        else:
+            self.post(_SIGNAL_COMMANDS[name])
+
+    def _install_signals(self) -> Callable[[], None]:
+        """Routes our signals to commands; returns a function undoing it."""
+        if threading.current_thread() is not threading.main_thread():
+            return lambda: None  # Signals can only be handled there
+        previous = {}
+        for name in (*_SIGNAL_COMMANDS, *_QUIT_SIGNALS):
+            signum = getattr(signal, name, None)  # No SIGUSR1/2 on Windows
+            if signum is not None:
+                previous[signum] = signal.signal(signum, self._on_signal)
+        old_wakeup_fd = signal.set_wakeup_fd(self._wake_w.fileno())
+
+        def restore():
+            signal.set_wakeup_fd(old_wakeup_fd)
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+        return restore
+
+    def _wait_for_command(self, seconds: float):
+        if not self._commands:
+            select.select([self._wake_r], [], [], seconds)
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except OSError:
+            pass  # Drained
+
+    # --- Loop ---
+    def _run_step(self) -> SessionStatus:
+        timer = self.timer
+        while True:
+            while self._commands:
+                command = self._commands.popleft()
+                if command in ("pause", "resume", "toggle"):
+                    wanted = {"pause": True, "resume": False}.get(
+                        command, not timer.is_paused
+                    )
+                    if wanted != timer.is_paused:
+                        timer.toggle_pause()
+                elif command == "skip":
+                    return timer.skip_session()
+                elif command == "quit":
+                    return SessionStatus.QUIT
+                else:
+                    print(
+                        f"Warning: Unknown command '{command}' "
+                        f"(use {', '.join(COMMANDS)})",
+                        file=sys.stderr,
+                    )
+            if timer.update():  # Publishes a Tick when time advanced
+                return timer.complete_session()
+            self.writer.flush()
+            self._wait(
+                self.policy.next_delay(timer.elapsed, timer.remaining, timer.is_paused)
+            )
+
+    def run(self) -> int:
+        """Runs the plan; returns the exit status (128+N after signal N)."""
+        restore_signals = self._install_signals()
+        status = SessionStatus.COMPLETED
+        try:
+            for step, (session_type, seconds) in enumerate(self.plan):
+                self.writer.step = step
+                self.timer.current_session_type = session_type
+                self.timer.start_session(seconds)
+                status = self._run_step()
+                if status == SessionStatus.QUIT:
+                    break
+                if status == SessionStatus.COMPLETED:
+                    self.completed += 1
+                else:
+                    self.skipped += 1
+                self.writer.flush()
+            self.writer.emit(
+                {
+                    "event": "quit" if status == SessionStatus.QUIT else "finished",
+                    "time": round(time.time(), 3),
+                    "step": self.writer.step,
+                    "completed": self.completed,
+                    "skipped": self.skipped,
+                }
+            )
+            self.writer.flush()
+        finally:
+            restore_signals()
+            self._wake_r.close()
+            self._wake_w.close()
+        return self.exit_status
+
+
+# --- Benchmark: write calls and delivery delay per output strategy ---
+if __name__ == "__main__":
+    import io
+    import os
+
+    from .config import load_config
+
+    now = [0.0]  # Virtual clock shared by the timer and the sink
+
+    class Sink(io.RawIOBase):
+        """/dev/null that logs each write() (a system call) in virtual time."""
+
+        def __init__(self):
+            self.fd = os.open(os.devnull, os.O_WRONLY)
+            self.writes: List[Tuple[float, int]] = []  # (time, lines)
+
+        def writable(self):
+            return True
+
+        def write(self, data):
+            self.writes.append((now[0], bytes(data).count(b"\n")))
+            return os.write(self.fd, data)
+
+    class TimedWriter(NdjsonWriter):
+        def __init__(self, stream):
+            super().__init__(stream)
+            self.emitted: List[float] = []
+
+        def emit(self, record: dict):
+            super().emit(record)
+            self.emitted.append(now[0])
+
+    class PerEventWriter(TimedWriter):
+        """Write and flush every line on its own."""
+
+        def emit(self, record: dict):
+            super().emit(record)
+            self.flush()
+
+    class UnflushedWriter(TimedWriter):
+        """Like print() to a pipe: block-buffered, flushed only when full."""
+
+        def flush(self):
+            self.stream.write(b"".join(self._lines))
+            self._lines.clear()
+
+    hours = float(sys.argv[1]) if len(sys.argv) > 1 else 100.0
+    steps = parse_plan(",".join(["work", "short_break"] * int(hours * 2)))
+    strategies = [
+        ("flush per event", PerEventWriter),
+        ("flush per boundary", TimedWriter),
+        ("block-buffered, no flush", UnflushedWriter),
+    ]
+    print(f"{hours:.0f} hours of work/short break sessions, virtual time")
+    for every_second in (False, True):
+        print(f"Ticks every {'second' if every_second else 'minute'}:")
+        for label, writer_type in strategies:
+            now[0] = 0.0
+            timer = Timer(load_config(), clock=lambda: now[0])
+            sink = Sink()
+            writer = writer_type(io.BufferedWriter(sink, io.DEFAULT_BUFFER_SIZE))
+            runner = HeadlessRun(
+                timer,
+                steps,
+                writer,
+                every_second,
+                wait=lambda seconds: now.__setitem__(0, now[0] + seconds),
+            )
+            start = time.perf_counter()
+            runner.run()
+            elapsed = time.perf_counter() - start
+            writer.stream.flush()  # At exit
+            # How long each line waited in the buffer before reaching the pipe
+            delays, line = [], 0
+            for written_at, lines in sink.writes:
+                for emitted_at in writer.emitted[line : line + lines]:
+                    delays.append(written_at - emitted_at)
+                line += lines
+            print(
+                f"  {label:<26} {writer.events:>8,} events {len(sink.writes):>8,} "
+                f"writes, max delay {max(delays) / 60:6.1f} min, "
+                f"{writer.events / elapsed / 1e3:5.1f} k events/s"
+            )
@@ -0,0 +1,707 @@
+# pomozen/history.py
+import heapq
+import itertools
+import json
+import os
+import struct
+import threading
+from array import array
+from contextlib import contextmanager
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: threads in one process are still serialized
+    fcntl = None
+
+from .events import Completed, Event, SessionStarted, Skipped
+from .timer import SessionStatus, SessionType
+
+# --- Storage Format ---
+# history.bin = 16-byte header + fixed-width records, sorted by start time.
+# Fixed widths let scans binary-search a date range and read in big chunks.
+MAGIC = b"PZHIST02"
+# magic, generation: random, new whenever the file is (re)written from scratch
+HEADER = struct.Struct("<8sQ")
+# started_at, planned, actual, type, status, task id (0 = none, see tasks.py)
+RECORD = struct.Struct("<qIIBB2xI")
+SCAN_CHUNK_RECORDS = 65536  # Records per read() during scans (~1.5 MB)
+
+# --- Shards ---
+# Long-lived histories are split by month (see compaction.py):
+#   history.bin       the active file, where new sessions are appended
+#   history.shards/   sealed files of one or more whole months, same format
+#   history.manifest  JSON list of the sealed files, replaced atomically
+# Records in history.bin that start before the manifest's `sealed_until` are
+# already in a shard and are skipped, so each step of a compaction leaves a
+# valid history. Positions (0 = oldest) only shift when `generation` changes.
+MANIFEST_VERSION = 1
+
+
+class SessionRecord(NamedTuple):
+    started_at: int  # Unix timestamp (seconds)
+    planned: int  # Planned length in seconds
+    actual: int  # Seconds actually run before completing/skipping
+    session_type: SessionType
+    status: SessionStatus
+    task: int = 0  # Task label id (see tasks.TaskIndex), 0 = untagged
+
+
+class HistoryShard(NamedTuple):
+    file: str  # Name inside history.shards/
+    first: int  # Start time of the first and last record
+    last: int
+    count: int
+
+
+class Manifest(NamedTuple):
+    generation: int  # Changes whenever record positions shift
+    sealed_until: int  # Active-file records starting before this are in shards
+    shards: List[HistoryShard]  # Oldest first, never overlapping in time
+    retired: List[str]  # Replaced shard files, deleted by the next compaction
+
+
+class RecordBatch:
+    """Struct-of-arrays container for many records (~22 bytes each).
+
+    Each field lives in its own typed array, so large batches cost a few
+    bytes per record instead of one tuple plus boxed ints per record, and
+    column-wise work (sums, filters) never touches unrelated fields.
+    """
+
+    __slots__ = (
+        "started_at",
+        "planned",
+        "actual",
+        "session_types",
+        "statuses",
+        "tasks",
+    )
+
+    _TYPES = {t.value: t for t in SessionType}
+    _STATUSES = {s.value: s for s in SessionStatus}
+
+    def __init__(self):
+        self.started_at = array("q")
+        self.planned = array("I")
+        self.actual = array("I")
+        self.session_types = array("B")  # SessionType values
+        self.statuses = array("B")  # SessionStatus values
+        self.tasks = array("I")  # Task ids
+
+    @classmethod
+    def from_rows(cls, rows: Iterable["Row"]) -> "RecordBatch":
+        batch = cls()
+        for row in rows:
+            batch.append_row(row)
+        return batch
+
+    def append_row(self, row: "Row"):
+        started_at, planned, actual, kind, status, task = row
+        self.started_at.append(started_at)
+        self.planned.append(planned)
+        self.actual.append(actual)
+        self.session_types.append(kind)
+        self.statuses.append(status)
+        self.tasks.append(task)
+
+    def append(self, record: SessionRecord):
+        self.append_row(to_row(record))
+
+    def __len__(self) -> int:
+        return len(self.started_at)
+
+    def __getitem__(self, index: int) -> SessionRecord:
+        return SessionRecord(
+            self.started_at[index],
+            self.planned[index],
+            self.actual[index],
+            self._TYPES[self.session_types[index]],
+            self._STATUSES[self.statuses[index]],
+            self.tasks[index],
+        )
+
+    def __iter__(self) -> Iterator[SessionRecord]:
+        return (self[i] for i in range(len(self)))
+
+    def rows(self) -> Iterator["Row"]:
+        return zip(
+            self.started_at,
+            self.planned,
+            self.actual,
+            self.session_types,
+            self.statuses,
+            self.tasks,
+        )
+
+
+# --- History Path ---
+def get_history_path() -> Path:
+    """Determines the platform-specific history file path."""
+    if sys.platform == "win32":
+        data_dir = Path(os.environ.get("APPDATA", Path.home() / "AppData/Roaming"))
+    elif sys.platform == "darwin":
+        data_dir = Path.home() / "Library/Application Support"
+    else:  # Assume Linux/Unix-like
+        data_dir = Path(os.environ.get("XDG_DATA_HOME", Path.home() / ".local/share"))
+    return data_dir / "pomozen" / "history.bin"
+
+
+def get_manifest_path(path: Optional[Path] = None) -> Path:
+    return (path or get_history_path()).with_suffix(".manifest")
+
+
+def get_shards_dir(path: Optional[Path] = None) -> Path:
+    return (path or get_history_path()).with_suffix(".shards")
+
+
+# --- Manifest & Locking ---
+def load_manifest(path: Optional[Path] = None) -> Optional[Manifest]:
+    """The shard manifest, or None for a history that was never compacted."""
+    manifest_path = get_manifest_path(path)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data["version"] != MANIFEST_VERSION:
+            raise ValueError(f"unsupported version {data['version']}")
+        return Manifest(
+            data["generation"],
+            data["sealed_until"],
+            [HistoryShard(**shard) for shard in data["shards"]],
+            data["retired"],
+        )
+    except FileNotFoundError:
+        return None
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"{manifest_path} is not a PomoZen history manifest ({e})")
+
+
+def save_manifest(manifest: Manifest, path: Optional[Path] = None):
+    """Atomically replaces the manifest (hold history_lock())."""
+    manifest_path = get_manifest_path(path)
+    temp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+    data = {
+        "version": MANIFEST_VERSION,
+        "generation": manifest.generation,
+        "sealed_until": manifest.sealed_until,
+        "shards": [shard._asdict() for shard in manifest.shards],
+        "retired": manifest.retired,
+    }
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1)
+    os.replace(temp_path, manifest_path)
+
+
+def new_generation() -> int:
+    return int.from_bytes(os.urandom(6), "little")
+
+
+def history_generation(path: Optional[Path] = None) -> int:
+    """Token that changes whenever record positions shift (see TaskIndex)."""
+    path = path or get_history_path()
+    manifest = load_manifest(path)
+    if manifest is not None:
+        return manifest.generation
+    if not path.exists() or path.stat().st_size == 0:
+        return 0
+    with open(path, "rb") as f:
+        return _check_header(f, path)
+
+
+_thread_locks: Dict[str, threading.Lock] = {}
+
+
+@contextmanager
+def history_lock(
+    path: Optional[Path] = None, name: str = "lock", blocking: bool = True
+) -> Iterator[bool]:
+    """Exclusive lock on history.<name> against other threads and processes.
+
+    Appends and compaction commits hold "lock" briefly; a compaction run holds
+    "compact" throughout. Yields False (holding nothing) when `blocking` is
+    off and the lock is taken.
+    """
+    lock_path = (path or get_history_path()).with_suffix("." + name)
+    thread_lock = _thread_locks.setdefault(str(lock_path), threading.Lock())
+    if not thread_lock.acquire(blocking):
+        yield False
+        return
+    try:
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(lock_path, "ab") as f:  # Closing it releases the flock
+            if fcntl is not None:
+                try:
+                    fcntl.flock(
+                        f.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB)
+                    )
+                except BlockingIOError:
+                    yield False
+                    return
+            yield True
+    finally:
+        thread_lock.release()
+
+
+# --- Writing ---
+# "Rows" are the raw (started_at, planned, actual, type value, status value,
+# task id) tuples stored on disk; bulk paths use them to skip building
+# record objects.
+Row = Tuple[int, int, int, int, int, int]
+
+
+def to_row(record: SessionRecord) -> Row:
+    return (
+        record.started_at,
+        record.planned,
+        record.actual,
+        record.session_type.value,
+        record.status.value,
+        record.task,
+    )
+
+
+def _write_rows(rows: Iterable[Row], f) -> int:
+    """Packs rows into ~1.3 MB batches and writes each batch in one call."""
+    batch_bytes = SCAN_CHUNK_RECORDS * RECORD.size
+    batch = bytearray()
+    count = 0
+    for row in rows:
+        batch += RECORD.pack(*row)
+        count += 1
+        if len(batch) >= batch_bytes:
+            f.write(batch)
+            batch.clear()
+    f.write(batch)
+    return count
+
+
+def append_rows(rows: Iterable[Row], path: Optional[Path] = None) -> int:
+    """Appends rows (in start-time order) to the history.
+
+    Rows that start before the newest stored one are merged in instead,
+    which rewrites the active file and shifts later positions.
+    """
+    path = path or get_history_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return 0
+    rows = itertools.chain([first], rows)
+    with history_lock(path):
+        manifest = load_manifest(path)
+        sealed_until = manifest.sealed_until if manifest is not None else 0
+        last = last_record(path)
+        if first[0] < sealed_until or (last is not None and first[0] < last.started_at):
+            # Out of order: another process (`start`, `run`, `serve`) stored a
+            # session that started later but ended first, or this one was
+            # paused for days past a compaction. Merge it into the active
+            # file's unsealed records so the history stays sorted, and move
+            # any seal back so readers see it.
+            start, end = file_range(path, sealed_until)
+            unsealed = scan_file(path, sealed_until)
+            added = rewrite_file(heapq.merge(unsealed, rows), path) - (end - start)
+            if manifest is not None:
+                moved = manifest._replace(
+                    generation=new_generation(),
+                    sealed_until=min(sealed_until, first[0]),
+                )
+                save_manifest(moved, path)
+            return added
+        with open(path, "ab") as f:
+            if f.tell() == 0:
+                f.write(HEADER.pack(MAGIC, new_generation()))
+            return _write_rows(rows, f)
+
+
+def append_records(
+    records: Iterable[SessionRecord], path: Optional[Path] = None
+) -> int:
+    """Appends records (already in start-time order) in buffered batches."""
+    return append_rows((to_row(record) for record in records), path)
+
+
+def write_file(rows: Iterable[Row], path: Path) -> int:
+    """Writes one history-format file (header + rows) in place."""
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, new_generation()))
+        return _write_rows(rows, f)
+
+
+def rewrite_file(rows: Iterable[Row], path: Path) -> int:
+    """Writes a temporary file and renames it over `path`, so readers never
+    see a half-written file."""
+    # Unique name, as for shards: another rewrite may be writing its own
+    temp_path = path.with_name(f"{path.name}.{os.urandom(4).hex()}.tmp")
+    try:
+        count = write_file(rows, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return count
+
+
+def rewrite_rows(rows: Iterable[Row], path: Optional[Path] = None) -> int:
+    """Replaces the whole history with `rows` (sorted), atomically.
+
+    Rows are streamed to a temporary file in large batches, which is then
+    renamed over the active file. A sharded history becomes one file again
+    (the shards are retired); the next compaction splits it up.
+
+    The lock is held while `rows` is consumed: callers merging into the
+    current history stream it from scan_rows(), and a session appended
+    between that scan and the rename would otherwise be lost.
+    """
+    path = path or get_history_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with history_lock(path):
+        count = rewrite_file(rows, path)
+        manifest = load_manifest(path)
+        if manifest is not None:
+            retired = manifest.retired + [shard.file for shard in manifest.shards]
+            save_manifest(Manifest(new_generation(), 0, [], retired), path)
+    return count
+
+
+def rewrite_history(
+    records: Iterable[SessionRecord], path: Optional[Path] = None
+) -> int:
+    """Like rewrite_rows(), for record objects."""
+    return rewrite_rows((to_row(record) for record in records), path)
+
+
+def count_records(path: Optional[Path] = None) -> int:
+    """Number of records in the history, from the manifest and file sizes."""
+    path = path or get_history_path()
+    manifest = load_manifest(path)
+    if manifest is None:
+        return file_range(path)[1]
+    start, end = file_range(path, manifest.sealed_until)
+    return sum(shard.count for shard in manifest.shards) + end - start
+
+
+def last_record(path: Optional[Path] = None) -> Optional[SessionRecord]:
+    """Reads only the newest record (the history is sorted by start time)."""
+    path = path or get_history_path()
+    row = None
+    for part, since in reversed(_parts(path)):
+        start, end = file_range(part, since)
+        if end > start:
+            row = next(_rows_at_file(part, [end - 1]))
+            break
+    if row is None:
+        return None
+    started_at, planned, actual, kind, status, task = row
+    return SessionRecord(
+        started_at, planned, actual, SessionType(kind), SessionStatus(status), task
+    )
+
+
+def time_span(path: Optional[Path] = None) -> Optional[Tuple[int, int]]:
+    """First and last start times in the history (a few small reads), or None."""
+    path = path or get_history_path()
+    manifest = load_manifest(path)
+    start, end = file_range(path, manifest.sealed_until if manifest else None)
+    rows = list(_rows_at_file(path, sorted({start, end - 1}) if end > start else []))
+    active = (rows[0][0], rows[-1][0]) if rows else None
+    shards = manifest.shards if manifest else []
+    if not shards:
+        return active
+    return shards[0].first, active[1] if active else shards[-1].last
+
+
+class HistoryRecorder:
+    """Timer subscriber that stores every completed or skipped session.
+
+    Has handle_batch(), so under events.Batched all sessions that ended
+    while a write was in progress are appended in one go.
+    """
+
+    EVENT_TYPES = (SessionStarted, Completed, Skipped)
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self._started_at: Dict[int, int] = {}  # id(timer) -> wall-clock start
+        self._tasks = None  # TaskIndex, loaded at the first labelled session
+
+    def __call__(self, event: Event):
+        self.handle_batch([event])
+
+    def _task_id(self, name: Optional[str]) -> int:
+        if not name:
+            return 0
+        if self._tasks is None:
+            # Local import: tasks.py builds on this module
+            from .tasks import TaskIndex
+
+            self._tasks = TaskIndex(self.path)
+        return self._tasks.intern(name)
+
+    def handle_batch(self, events: List[Event]):
+        try:
+            self._store(events)
+        except OSError as e:
+            print(f"Warning: Could not save session history: {e}", file=sys.stderr)
+
+    def _store(self, events: List[Event]):
+        records = []
+        for event in events:
+            key = id(event.timer)
+            if type(event) is SessionStarted:
+                self._started_at[key] = int(event.started_at)
+            elif type(event) in (Completed, Skipped):
+                status = (
+                    SessionStatus.COMPLETED
+                    if type(event) is Completed
+                    else SessionStatus.SKIPPED
+                )
+                records.append(
+                    SessionRecord(
+                        self._started_at.get(key, int(time.time())),
+                        event.planned,
+                        int(event.elapsed),
+                        event.session_type,
+                        status,
+                        self._task_id(event.task),
+                    )
+                )
+        if records:
+            # Sessions end in a different order than they started (dashboard)
+            records.sort(key=lambda record: record.started_at)
+            append_records(records, self.path)
+
+
+# --- Reading ---
+def _check_header(f, path: Path) -> int:
+    """Reads the header and returns the file's generation."""
+    try:
+        magic, generation = HEADER.unpack(f.read(HEADER.size))
+    except struct.error:
+        magic = None
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a PomoZen history file")
+    return generation
+
+
+def _first_index_at_or_after(f, count: int, timestamp: int) -> int:
+    """Binary search over the sorted records for the first start >= timestamp."""
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        f.seek(HEADER.size + mid * RECORD.size)
+        if struct.unpack("<q", f.read(8))[0] < timestamp:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def file_range(path: Path, since: Optional[int] = None) -> Tuple[int, int]:
+    """(first, end) positions in one file of the records starting >= since."""
+    if not path.exists() or path.stat().st_size == 0:
+        return 0, 0
+    with open(path, "rb") as f:
+        _check_header(f, path)
+        count = max(0, os.fstat(f.fileno()).st_size - HEADER.size) // RECORD.size
+        if not since:
+            return 0, count
+        return _first_index_at_or_after(f, count, since), count
+
+
+def _parts(
+    path: Path, since: Optional[int] = None, until: Optional[int] = None
+) -> List[Tuple[Path, Optional[int]]]:
+    """Files that may hold records with since <= started_at < until, oldest
+    first, each with the start time its records are read from.
+
+    Shards outside the range are pruned using the manifest alone.
+    """
+    manifest = load_manifest(path)
+    if manifest is None:
+        return [(path, since)]
+    shards_dir = get_shards_dir(path)
+    parts: List[Tuple[Path, Optional[int]]] = [
+        (shards_dir / shard.file, since)
+        for shard in manifest.shards
+        if (since is None or shard.last >= since)
+        and (until is None or shard.first < until)
+    ]
+    sealed = manifest.sealed_until
+    if until is None or until > sealed:
+        parts.append(
+            (path, max(since, sealed) if since is not None else sealed or None)
+        )
+    return parts
+
+
+def scan_file(
+    path: Path, since: Optional[int] = None, until: Optional[int] = None
+) -> Iterator[Row]:
+    """Like scan_rows(), for one file (the active file or a shard)."""
+    if not path.exists():
+        return
+    with open(path, "rb") as f:
+        _check_header(f, path)
+        count = (os.fstat(f.fileno()).st_size - HEADER.size) // RECORD.size
+        index = 0
+        if since is not None:
+            index = _first_index_at_or_after(f, count, since)
+        f.seek(HEADER.size + index * RECORD.size)
+        while index < count:
+            chunk = f.read(min(SCAN_CHUNK_RECORDS, count - index) * RECORD.size)
+            if not chunk:
+                return
+            index += len(chunk) // RECORD.size
+            rows = RECORD.iter_unpack(chunk)
+            if until is None:
+                yield from rows
+                continue
+            for row in rows:
+                if row[0] >= until:
+                    return
+                yield row
+
+
+def scan_rows(
+    path: Optional[Path] = None,
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+) -> Iterator[Row]:
+    """Streams raw rows with since <= started_at < until.
+
+    The date range is pushed down into the files: shards outside it are
+    never opened, and each scan seeks straight to the first matching record
+    and stops at the first one past `until`. Memory use is bounded by one
+    read chunk regardless of history size.
+    """
+    for part, part_since in _parts(path or get_history_path(), since, until):
+        yield from scan_file(part, part_since, until)
+
+
+def _rows_at_file(path: Path, positions: List[int]) -> Iterator[Row]:
+    if not positions or not path.exists():
+        return
+    with open(path, "rb") as f:
+        _check_header(f, path)
+        count = (os.fstat(f.fileno()).st_size - HEADER.size) // RECORD.size
+        i = 0
+        while i < len(positions) and positions[i] < count:
+            start = end = positions[i]
+            while (
+                i + 1 < len(positions)
+                and positions[i + 1] == end + 1
+                and positions[i + 1] < count
+                and end + 1 - start < SCAN_CHUNK_RECORDS
+            ):
+                i += 1
+                end += 1
+            i += 1
+            f.seek(HEADER.size + start * RECORD.size)
+            yield from RECORD.iter_unpack(f.read((end - start + 1) * RECORD.size))
+
+
+def rows_at(path: Optional[Path], indices: Iterable[int]) -> Iterator[Row]:
+    """Reads rows by position (0 = oldest), in ascending index order.
+
+    Runs of consecutive positions are read together, so a contiguous range
+    costs one read per chunk rather than one seek per record.
+    """
+    path = path or get_history_path()
+    positions = sorted(indices)
+    manifest = load_manifest(path)
+    if manifest is None:
+        yield from _rows_at_file(path, positions)
+        return
+    shards_dir = get_shards_dir(path)
+    files = [(shards_dir / shard.file, 0, shard.count) for shard in manifest.shards]
+    files.append((path, *file_range(path, manifest.sealed_until)))
+    i = offset = 0
+    for part, start, end in files:
+        local = []
+        while i < len(positions) and positions[i] < offset + end - start:
+            local.append(positions[i] - offset + start)
+            i += 1
+        yield from _rows_at_file(part, local)
+        offset += end - start
+
+
+def scan_batches(
+    path: Optional[Path] = None,
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    batch_size: int = SCAN_CHUNK_RECORDS,
+) -> Iterator[RecordBatch]:
+    """Streams the history as RecordBatches of up to `batch_size` records."""
+    batch = RecordBatch()
+    for row in scan_rows(path, since, until):
+        batch.append_row(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = RecordBatch()
+    if len(batch):
+        yield batch
+
+
+def scan(
+    path: Optional[Path] = None,
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    session_types: Optional[Set[SessionType]] = None,
+) -> Iterator[SessionRecord]:
+    """Streams records with since <= started_at < until, optionally by type.
+
+    Type filtering happens on the raw rows, before any record objects are built.
+    """
+    type_codes = {t.value for t in session_types} if session_types else None
+    types = {t.value: t for t in SessionType}
+    statuses = {s.value: s for s in SessionStatus}
+    for started_at, planned, actual, kind, status, task in scan_rows(
+        path, since, until
+    ):
+        if type_codes is None or kind in type_codes:
+            yield SessionRecord(
+                started_at, planned, actual, types[kind], statuses[status], task
+            )
+
+
+# --- Benchmark: memory per record, tuples vs. struct-of-arrays ---
+if __name__ == "__main__":
+    import tracemalloc
+
+    count = 1_000_000
+    # Unpacking from bytes gives fresh int objects, just like a real scan
+    packed = b"".join(
+        RECORD.pack(
+            1_600_000_000 + i * 900, 1500, 1500 - i % 7, 1 + i % 3, 1 + i % 2, i % 97
+        )
+        for i in range(count)
+    )
+    types = RecordBatch._TYPES
+    statuses = RecordBatch._STATUSES
+
+    def measure(build) -> float:
+        tracemalloc.start()
+        result = build()
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del result
+        return size / count
+
+    per_tuple = measure(
+        lambda: [
+            SessionRecord(
+                started_at, planned, actual, types[kind], statuses[status], task
+            )
+            for started_at, planned, actual, kind, status, task in RECORD.iter_unpack(
+                packed
+            )
+        ]
+    )
+    per_batch = measure(lambda: RecordBatch.from_rows(RECORD.iter_unpack(packed)))
+    print(f"list[SessionRecord]: {per_tuple:6.1f} bytes/record")
+    print(f"RecordBatch:         {per_batch:6.1f} bytes/record")
+    print(f"On disk:             {RECORD.size:6d} bytes/record")
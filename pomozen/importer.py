@@ -0,0 +1,474 @@
+# pomozen/importer.py
+import csv
+import heapq
+import io
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .history import (
+    RECORD,
+    SCAN_CHUNK_RECORDS,
+    Row,
+    append_rows,
+    last_record,
+    rewrite_rows,
+    scan_rows,
+)
+from .timer import SessionStatus, SessionType
+
+CHUNK_BYTES = 64 * 1024 * 1024  # Input bytes handed to one worker at a time
+FORMATS = ("csv", "jsonl", "json")
+
+# --- Foreign field names ---
+# Lower-cased column/key names used by common trackers, in preference order.
+START_FIELDS = (
+    "started_at",
+    "start",
+    "start_time",
+    "start_date",
+    "begin",
+    "from",
+    "date",
+)
+END_FIELDS = ("ended_at", "end", "end_time", "stop", "to")
+DURATION_FIELDS = ("duration_seconds", "seconds", "duration", "minutes", "length")
+CATEGORY_FIELDS = (
+    "session_type",
+    "type",
+    "category",
+    "kind",
+    "mode",
+    "tags",
+    "activity",
+)
+STATUS_FIELDS = ("status", "state", "completed", "result")
+
+# --- Foreign categories ---
+# Substrings checked in order; anything unrecognised counts as focused work.
+_CATEGORY_HINTS: Tuple[Tuple[str, SessionType], ...] = (
+    ("long", SessionType.LONG_BREAK),
+    ("short", SessionType.SHORT_BREAK),
+    ("break", SessionType.SHORT_BREAK),
+    ("rest", SessionType.SHORT_BREAK),
+    ("pause", SessionType.SHORT_BREAK),
+)
+_SKIPPED_STATUSES = {
+    "skipped",
+    "skip",
+    "interrupted",
+    "abandoned",
+    "cancelled",
+    "canceled",
+    "aborted",
+    "incomplete",
+    "false",
+    "0",
+    "no",
+}
+
+
+class ImportSummary(NamedTuple):
+    parsed: int  # Rows turned into sessions
+    invalid: int  # Rows without a usable start time or duration
+    duplicates: int  # Sessions dropped because they overlap a kept one
+    imported: int  # Sessions written to the history
+
+
+class _Columns(NamedTuple):
+    start: Optional[str]
+    end: Optional[str]
+    duration: Optional[str]
+    category: Optional[str]
+    status: Optional[str]
+
+
+def _pick(names: Iterable[str], candidates: Tuple[str, ...]) -> Optional[str]:
+    by_lower = {name.strip().lower(): name for name in names}
+    return next((by_lower[c] for c in candidates if c in by_lower), None)
+
+
+def resolve_columns(names: Iterable[str]) -> _Columns:
+    """Finds which foreign fields hold the start, end, duration, category and status."""
+    names = list(names)
+    return _Columns(
+        _pick(names, START_FIELDS),
+        _pick(names, END_FIELDS),
+        _pick(names, DURATION_FIELDS),
+        _pick(names, CATEGORY_FIELDS),
+        _pick(names, STATUS_FIELDS),
+    )
+
+
+# --- Value mapping ---
+# Dumps repeat a handful of category/status spellings, so map each once
+_category_codes: Dict[object, int] = {}
+_status_codes: Dict[object, int] = {}
+
+
+def map_category(value: object) -> SessionType:
+    text = str(value or "").lower()
+    for hint, session_type in _CATEGORY_HINTS:
+        if hint in text:
+            return session_type
+    return SessionType.WORK
+
+
+def map_status(value: object) -> SessionStatus:
+    if str(value).strip().lower() in _SKIPPED_STATUSES:
+        return SessionStatus.SKIPPED
+    return SessionStatus.COMPLETED
+
+
+def _parse_time(value: object) -> Optional[int]:
+    """Accepts Unix seconds/milliseconds or ISO 8601 (naive means local time)."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        number = float(value)
+    else:
+        text = str(value).strip()
+        if "-" in text[1:]:  # Looks like a date; epochs never contain '-'
+            if text.endswith("Z"):
+                text = text[:-1] + "+00:00"
+            try:
+                return int(datetime.fromisoformat(text).timestamp())
+            except ValueError:
+                return None
+        try:
+            number = float(text)
+        except ValueError:
+            return None
+    return int(number / 1000 if number > 1e11 else number)  # ms vs s
+
+
+def _parse_duration(value: object, field: str) -> Optional[int]:
+    """Accepts seconds, minutes (for a 'minutes' field) or H:MM:SS."""
+    if value is None or value == "":
+        return None
+    text = str(value).strip()
+    if ":" in text:
+        seconds = 0
+        for part in text.split(":"):
+            if not part.isdigit():
+                return None
+            seconds = seconds * 60 + int(part)
+        return seconds
+    try:
+        number = float(text)
+    except ValueError:
+        return None
+    return int(number * 60 if field.strip().lower() == "minutes" else number)
+
+
+def _to_record(get, columns: _Columns) -> Optional[Row]:
+    """Builds one packed-ready tuple from a row accessor, or None if unusable."""
+    started_at = _parse_time(get(columns.start)) if columns.start else None
+    if started_at is None:
+        return None
+    seconds = None
+    if columns.duration:
+        seconds = _parse_duration(get(columns.duration), columns.duration)
+    if seconds is None and columns.end:
+        ended_at = _parse_time(get(columns.end))
+        seconds = ended_at - started_at if ended_at is not None else None
+    if seconds is None or seconds <= 0:
+        return None
+    category = get(columns.category) if columns.category else None
+    if isinstance(category, (list, dict)):  # JSON, e.g. "tags": ["focus", "deep"]
+        category = json.dumps(category)
+    kind = _category_codes.get(category)
+    if kind is None:
+        kind = _category_codes[category] = map_category(category).value
+    status = get(columns.status) if columns.status else ""
+    if isinstance(status, (list, dict)):
+        status = json.dumps(status)
+    status_code = _status_codes.get(status)
+    if status_code is None:
+        status_code = _status_codes[status] = map_status(status).value
+    # Foreign trackers don't know the planned length; use what actually ran
+    return (started_at, seconds, seconds, kind, status_code, 0)  # No task label
+
+
+# --- Worker side ---
+def _parse_chunk(
+    path: str, start: int, end: int, fmt: str, header: List[str], out_dir: str
+) -> Tuple[str, int, int]:
+    """Parses bytes [start, end) of `path`, sorts the sessions and spills them.
+
+    Runs in a worker process. The sorted records are written to a temporary
+    run file (packed like the history itself) so the parent only merges.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    text = data.decode("utf-8", errors="replace")
+    columns = resolve_columns(header)
+    records = []
+    invalid = 0
+
+    if fmt == "csv":
+        index = {name: i for i, name in enumerate(header)}
+        for row in csv.reader(io.StringIO(text)):
+            if not row or row == header:
+                continue
+            record = _to_record(
+                lambda name: row[index[name]] if index[name] < len(row) else None,
+                columns,
+            )
+            if record is None:
+                invalid += 1
+            else:
+                records.append(record)
+    else:  # jsonl: the columns come from each object's own keys
+        layouts: Dict[Tuple[str, ...], _Columns] = {}
+        for line in text.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                invalid += 1
+                continue
+            if not isinstance(item, dict):
+                invalid += 1
+                continue
+            keys = tuple(item)
+            if keys not in layouts:  # Dumps repeat a handful of key layouts
+                layouts[keys] = resolve_columns(keys)
+            record = _to_record(item.get, layouts[keys])
+            if record is None:
+                invalid += 1
+            else:
+                records.append(record)
+
+    records.sort()
+    run_file = tempfile.NamedTemporaryFile(dir=out_dir, suffix=".run", delete=False)
+    with run_file:
+        run_file.write(b"".join(RECORD.pack(*record) for record in records))
+    return run_file.name, len(records), invalid
+
+
+# --- Parent side ---
+def _chunk_offsets(
+    path: Path, data_start: int, quoted: bool = False
+) -> List[Tuple[int, int]]:
+    """Splits the file into ~CHUNK_BYTES ranges that end on line boundaries.
+
+    With `quoted` (CSV) a range only ends where the double quotes seen so far
+    are balanced, so a quoted field with a newline in it isn't cut in two.
+    """
+    size = path.stat().st_size
+    offsets = []
+    with open(path, "rb") as f:
+        start = data_start
+        while start < size:
+            if quoted:
+                f.seek(start)
+                odd = f.read(CHUNK_BYTES).count(b'"') % 2
+            else:
+                f.seek(min(size, start + CHUNK_BYTES))
+                odd = 0
+            line = f.readline()  # Move to the end of the current line
+            odd = (odd + line.count(b'"')) % 2
+            while odd and line:  # Inside a quoted field: end at its record
+                line = f.readline()
+                odd = (odd + line.count(b'"')) % 2
+            end = min(size, f.tell())
+            if end <= start:
+                end = size
+            offsets.append((start, end))
+            start = end
+    return offsets
+
+
+def _read_header(path: Path) -> Tuple[List[str], int]:
+    with open(path, "rb") as f:
+        first_line = f.readline()
+    header = next(csv.reader([first_line.decode("utf-8-sig")]), [])
+    return header, len(first_line)
+
+
+def _read_run(run_path: str) -> Iterator[Row]:
+    with open(run_path, "rb") as f:
+        while True:
+            chunk = f.read(SCAN_CHUNK_RECORDS * RECORD.size)
+            if not chunk:
+                return
+            yield from RECORD.iter_unpack(chunk)
+
+
+def _json_array_run(path: Path, out_dir: str) -> Tuple[str, int, int]:
+    """Plain JSON arrays can't be split safely, so they're parsed in-process."""
+    with open(path, "rb") as f:
+        items = json.load(f)
+    if isinstance(items, dict):  # e.g. {"sessions": [...]}
+        items = next((v for v in items.values() if isinstance(v, list)), [])
+    lines = "\n".join(json.dumps(item) for item in items if isinstance(item, dict))
+    temp = tempfile.NamedTemporaryFile(
+        "w", dir=out_dir, suffix=".jsonl", delete=False, encoding="utf-8"
+    )
+    with temp:
+        temp.write(lines)
+    try:
+        return _parse_chunk(
+            temp.name, 0, len(lines.encode("utf-8")), "jsonl", [], out_dir
+        )
+    finally:
+        os.unlink(temp.name)
+
+
+def _dedupe(
+    rows: Iterable[Row], counter: List[int], existing: Iterable[Row] = ()
+) -> Iterator[Row]:
+    """Sorted-merge pass over imported `rows` and the `existing` history.
+
+    Existing sessions are always kept. An imported session is dropped when
+    it overlaps a kept one: the last kept before it, or the next existing.
+    """
+    existing = iter(existing)
+    upcoming = next(existing, None)
+    kept_end = None
+    for row in rows:
+        while upcoming is not None and upcoming <= row:
+            yield upcoming
+            end = upcoming[0] + upcoming[2]
+            kept_end = end if kept_end is None else max(kept_end, end)
+            upcoming = next(existing, None)
+        end = row[0] + row[2]
+        if (kept_end is not None and row[0] < kept_end) or (
+            upcoming is not None and upcoming[0] < end
+        ):
+            counter[0] += 1
+            continue
+        kept_end = end
+        yield row
+    if upcoming is not None:
+        yield upcoming
+        yield from existing
+
+
+def detect_format(path: Path) -> str:
+    suffix = path.suffix.lower().lstrip(".")
+    if suffix in ("jsonl", "ndjson"):
+        return "jsonl"
+    if suffix == "json":
+        return "json"
+    return "csv"
+
+
+def import_history(
+    paths: List[Path],
+    history_path: Optional[Path] = None,
+    fmt: Optional[str] = None,
+    workers: Optional[int] = None,
+    dry_run: bool = False,
+) -> ImportSummary:
+    """Imports foreign session dumps into the history file.
+
+    Inputs are split into line-aligned chunks parsed across a process pool.
+    Each worker spills a sorted run; the runs (plus the existing history when
+    they overlap it) are k-way merged, de-duplicated and written in batches.
+    """
+    with tempfile.TemporaryDirectory(prefix="pomozen-import-") as out_dir:
+        runs: List[str] = []
+        parsed = invalid = 0
+
+        jobs = []
+        for path in paths:
+            path_fmt = fmt or detect_format(path)
+            if path_fmt == "json":
+                run, count, bad = _json_array_run(path, out_dir)
+                runs.append(run)
+                parsed, invalid = parsed + count, invalid + bad
+                continue
+            header, data_start = _read_header(path) if path_fmt == "csv" else ([], 0)
+            for start, end in _chunk_offsets(path, data_start, path_fmt == "csv"):
+                jobs.append((str(path), start, end, path_fmt, header, out_dir))
+
+        if jobs:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for run, count, bad in pool.map(_parse_chunk, *zip(*jobs)):
+                    runs.append(run)
+                    parsed, invalid = parsed + count, invalid + bad
+
+        merged = heapq.merge(*(_read_run(run) for run in runs))
+        duplicates = [0]
+        newest = last_record(history_path)
+        heads = (next(_read_run(run), None) for run in runs)
+        earliest = min((head[0] for head in heads if head), default=None)
+        if newest is None or (
+            earliest is not None and earliest >= newest.started_at + newest.actual
+        ):
+            # Everything is newer than the history: one batched append
+            rows = _dedupe(merged, duplicates)
+            if dry_run:
+                imported = sum(1 for _ in rows)
+            else:
+                imported = append_rows(rows, history_path)
+        else:
+            # Overlaps existing history: merge both and rewrite it in one pass.
+            # The history is read lazily, under rewrite_rows()'s lock, so
+            # count what it held as it streams past
+            before = [0]
+
+            def stored() -> Iterator[Row]:
+                for row in scan_rows(history_path):
+                    before[0] += 1
+                    yield row
+
+            rows = _dedupe(merged, duplicates, stored())
+            if dry_run:
+                imported = sum(1 for _ in rows) - before[0]
+            else:
+                imported = rewrite_rows(rows, history_path) - before[0]
+
+    return ImportSummary(parsed, invalid, duplicates[0], imported)
+
+
+# --- Benchmark: import throughput on a large generated CSV ---
+if __name__ == "__main__":
+    import sys
+    import time
+
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 2048
+    worker_counts = [int(n) for n in sys.argv[2:]] or sorted({1, os.cpu_count() or 1})
+    source = Path(tempfile.gettempdir()) / f"pomozen-import-bench-{size_mb}mb.csv"
+
+    if not source.exists():
+        print(f"Generating ~{size_mb} MB of foreign CSV at {source}...")
+        categories = ("Focus", "Short Break", "Focus", "Long break")
+        with open(source, "w", encoding="utf-8") as f:
+            f.write("Start,Duration,Category,Status\n")
+            written, i, lines = 0, 0, []
+            while written < size_mb * 1024 * 1024:
+                line = (
+                    f"{datetime.fromtimestamp(1_500_000_000 + i * 1800).isoformat()},"
+                    f"{1500 - i % 60},{categories[i % 4]},"
+                    f"{'interrupted' if i % 9 == 0 else 'done'}\n"
+                )
+                lines.append(line)
+                written += len(line)
+                i += 1
+                if len(lines) >= 100_000:
+                    f.write("".join(lines))
+                    lines.clear()
+            f.write("".join(lines))
+
+    size = source.stat().st_size
+    for count in worker_counts:
+        with tempfile.TemporaryDirectory() as history_dir:
+            history = Path(history_dir) / "history.bin"
+            start = time.perf_counter()
+            summary = import_history([source], history, workers=count)
+            elapsed = time.perf_counter() - start
+        print(
+            f"{count} worker(s): {size / 1e6:,.0f} MB, {summary.imported:,} sessions "
+            f"in {elapsed:.1f}s ({size / 1e6 / elapsed:.1f} MB/s, "
+            f"{summary.imported / elapsed / 1e3:.0f}k sessions/s)"
+        )
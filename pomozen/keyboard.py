@@ -1,6 +1,12 @@
 # pomozen/keyboard.py
+import codecs
+import os
+import queue
 import sys
+import threading
 import time
+from contextlib import contextmanager
+from typing import List, Optional
 
 # --- Platform-specific non-blocking key detection ---
 
@@ -29,14 +35,25 @@ else:
         readchar = None
 
 
+_BRACKETED_PASTE_ON = "\x1b[?2004h"
+_BRACKETED_PASTE_OFF = "\x1b[?2004l"
+
+
 def setup_keyboard():
-    """Set up terminal for non-blocking input (Unix/macOS)."""
+    """Set up terminal for non-blocking input (Unix/macOS) or start the reader thread."""
+    if not _IS_WINDOWS and not _IS_LINUX_OR_MAC:
+        _READER_ACTIVE.set()
+        _start_reader_thread()
     if _IS_LINUX_OR_MAC:
         global _ORIGINAL_TTY_SETTINGS
         try:
             _ORIGINAL_TTY_SETTINGS = termios.tcgetattr(sys.stdin)
             # Set terminal to raw mode allows reading byte by byte
             tty.setraw(sys.stdin.fileno())
+            # Ask the terminal to bracket pastes so they arrive as one event
+            if sys.stdout.isatty():
+                sys.stdout.write(_BRACKETED_PASTE_ON)
+                sys.stdout.flush()
         except termios.error as e:
             print(
                 f"Warning: Could not set terminal to raw mode: {e}. Key controls might not work.",
@@ -52,9 +69,13 @@ def setup_keyboard():
 
 
 def restore_keyboard():
-    """Restore original terminal settings (Unix/macOS)."""
+    """Restore original terminal settings (Unix/macOS) or pause the reader thread."""
+    _READER_ACTIVE.clear()  # Leave stdin to whoever reads it next (e.g. a prompt)
     if _IS_LINUX_OR_MAC and _ORIGINAL_TTY_SETTINGS:
         try:
+            if sys.stdout.isatty():
+                sys.stdout.write(_BRACKETED_PASTE_OFF)
+                sys.stdout.flush()
             termios.tcsetattr(sys.stdin, termios.TCSADRAIN, _ORIGINAL_TTY_SETTINGS)
         except termios.error as e:
             print(f"Warning: Could not restore terminal settings: {e}", file=sys.stderr)
@@ -62,55 +83,295 @@ def restore_keyboard():
             print(f"Warning: Error restoring keyboard settings: {e}", file=sys.stderr)
 
 
-def get_key_if_available() -> str | None:
-    """Checks for and returns a key press without blocking. Returns None if no key is pressed."""
-    key = None
+# --- Escape-sequence decoding ---
+
+# Final bytes of CSI (ESC [ ...) and SS3 (ESC O ...) sequences
+_CSI_FINAL_KEYS = {
+    "A": "up",
+    "B": "down",
+    "C": "right",
+    "D": "left",
+    "H": "home",
+    "F": "end",
+    "Z": "shift_tab",
+    "P": "f1",
+    "Q": "f2",
+    "R": "f3",
+    "S": "f4",
+}
+# Numeric parameters of CSI sequences terminated by '~'
+_CSI_TILDE_KEYS = {
+    "1": "home",
+    "2": "insert",
+    "3": "delete",
+    "4": "end",
+    "5": "page_up",
+    "6": "page_down",
+    "7": "home",
+    "8": "end",
+    "15": "f5",
+    "17": "f6",
+    "18": "f7",
+    "19": "f8",
+    "20": "f9",
+    "21": "f10",
+    "23": "f11",
+    "24": "f12",
+}
+# Single control characters with readable names
+_CONTROL_KEYS = {
+    "\r": "enter",
+    "\n": "enter",
+    "\t": "tab",
+    "\x7f": "backspace",
+    "\x08": "backspace",
+}
+# Windows reports special keys as a '\x00'/'\xe0' prefix plus a scan code
+_WINDOWS_SCAN_KEYS = {
+    "H": "up",
+    "P": "down",
+    "K": "left",
+    "M": "right",
+    "G": "home",
+    "O": "end",
+    "R": "insert",
+    "S": "delete",
+    "I": "page_up",
+    "Q": "page_down",
+}
+
+PASTE_PREFIX = "paste:"  # Bracketed paste is delivered as one "paste:<text>" event
+
+_GROUND, _ESCAPE, _CSI, _SS3, _PASTE = range(5)
+
+
+class KeyDecoder:
+    """Incremental state machine turning raw terminal input into key events.
+
+    Printable keys come out as single (lower-cased) characters, special keys as
+    names such as 'up' or 'f5', and bracketed pastes as one PASTE_PREFIX event,
+    so multi-byte sequences never leak through as stray 'p'/'s'/'q' commands.
+    State is kept between feeds, so sequences split across reads still decode.
+    """
+
+    def __init__(self):
+        self._bytes = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._state = _GROUND
+        self._params = ""
+        self._paste: List[str] = []
+
+    def feed(self, data: bytes) -> List[str]:
+        """Decodes a chunk of raw bytes and returns the completed key events."""
+        return self.feed_text(self._bytes.decode(data))
+
+    def feed_text(self, text: str) -> List[str]:
+        """Like feed(), for input that is already decoded (readchar, Windows)."""
+        events: List[str] = []
+        for char in text:
+            self._step(char, events)
+        return events
+
+    def flush(self) -> List[str]:
+        """Resolves a dangling lone ESC once no more input is pending."""
+        if self._state == _ESCAPE:
+            self._state = _GROUND
+            return ["escape"]
+        return []
+
+    @property
+    def pending(self) -> bool:
+        return self._state == _ESCAPE
+
+    def _step(self, char: str, events: List[str]):
+        state = self._state
+        if state == _GROUND:
+            if char == "\x1b":
+                self._state = _ESCAPE
+            elif char in _CONTROL_KEYS:
+                events.append(_CONTROL_KEYS[char])
+            else:
+                events.append(char.lower())
+        elif state == _ESCAPE:
+            if char == "[":
+                self._state, self._params = _CSI, ""
+            elif char == "O":
+                self._state = _SS3
+            elif char == "\x1b":
+                events.append("escape")  # ESC ESC: first one was a lone escape
+            else:
+                self._state = _GROUND
+                events.append("alt+" + char.lower())
+        elif state == _CSI:
+            if " " <= char <= "?":  # Parameter / intermediate bytes
+                self._params += char
+                return
+            self._state = _GROUND
+            if char == "~":
+                if self._params == "200":
+                    self._state, self._paste = _PASTE, []
+                    return
+                name = _CSI_TILDE_KEYS.get(self._params.split(";")[0])
+            else:
+                name = _CSI_FINAL_KEYS.get(char)
+            if name:
+                events.append(name)
+            # Unknown sequences (mouse reports, focus events...) are dropped whole
+        elif state == _SS3:
+            self._state = _GROUND
+            name = _CSI_FINAL_KEYS.get(char)
+            if name:
+                events.append(name)
+        else:  # _PASTE: collect text until ESC [ 201 ~
+            self._paste.append(char)
+            if char == "~" and "".join(self._paste[-6:]) == "\x1b[201~":
+                self._state = _GROUND
+                events.append(PASTE_PREFIX + "".join(self._paste[:-6]))
+
+
+# --- Shared key queue ---
+# Every platform backend pushes decoded events here; consumers drain it.
+_KEY_QUEUE: "queue.SimpleQueue[str]" = queue.SimpleQueue()
+_DECODER = KeyDecoder()
+_READ_CHUNK = 4096
+_reader_thread: Optional[threading.Thread] = None
+_KEY_ARRIVED = threading.Event()  # Set by the reader thread for wait_for_input()
+_READER_ACTIVE = threading.Event()  # Cleared while the terminal is restored
+_READER_ACTIVE.set()
+_input_closed = False  # stdin hit EOF; nothing to wait on any more
+
+
+def _readchar_reader():
+    """Background thread for platforms without non-blocking reads."""
+    decoder = KeyDecoder()
+    while True:
+        _READER_ACTIVE.wait()
+        try:
+            key = readchar.readkey()
+        except Exception:
+            return  # stdin closed or unusable; stop quietly
+        if not _READER_ACTIVE.is_set():
+            # This read was already waiting when a prompt took over stdin;
+            # the key was meant for the prompt, not the timer
+            continue
+        for event in decoder.feed_text(key) + decoder.flush():
+            _KEY_QUEUE.put(event)
+        _KEY_ARRIVED.set()
+
+
+def _start_reader_thread():
+    global _reader_thread
+    if readchar and _reader_thread is None:
+        _reader_thread = threading.Thread(
+            target=_readchar_reader, name="pomozen-keyboard", daemon=True
+        )
+        _reader_thread.start()
+
+
+def _poll_windows():
+    """Drains all pending console key presses on Windows, in arrival order."""
+    events, pending = [], []
+    while msvcrt.kbhit():
+        char = msvcrt.getwch()
+        if char in ("\x00", "\xe0"):  # Special key: scan code follows
+            name = _WINDOWS_SCAN_KEYS.get(msvcrt.getwch())
+            # Characters typed before it go first
+            events += _DECODER.feed_text("".join(pending)) + _DECODER.flush()
+            pending.clear()
+            if name:
+                events.append(name)
+            continue
+        pending.append(char)
+    events += _DECODER.feed_text("".join(pending)) + _DECODER.flush()
+    for event in events:
+        _KEY_QUEUE.put(event)
+
+
+def _poll_unix():
+    """Drains every byte available on stdin with one non-blocking read."""
+    global _input_closed
+    if _input_closed:
+        return
+    try:
+        fd = sys.stdin.fileno()
+        rlist, _, _ = select.select([fd], [], [], 0)
+    except (OSError, ValueError):
+        return  # stdin closed or not a real file
+    if rlist:
+        try:
+            data = os.read(fd, _READ_CHUNK)
+        except OSError:
+            return
+        if not data:  # EOF (e.g. stdin is /dev/null): stop selecting on it
+            _input_closed = True
+            return
+        events = _DECODER.feed(data)
+    else:
+        # Nothing new arrived, so a dangling ESC really was the Escape key
+        events = _DECODER.flush()
+    for event in events:
+        _KEY_QUEUE.put(event)
+
+
+def wait_for_input(timeout: float) -> bool:
+    """Blocks until a key is pending or `timeout` seconds pass. True if input arrived.
+
+    Lets idle loops sleep for long stretches while staying instantly
+    responsive to key presses, instead of waking up to poll.
+    """
+    if not _KEY_QUEUE.empty() or _DECODER.pending:
+        return True
+    if _IS_LINUX_OR_MAC and not _input_closed:
+        try:
+            rlist, _, _ = select.select([sys.stdin.fileno()], [], [], timeout)
+            return bool(rlist)
+        except (OSError, ValueError):
+            pass  # Fall back to a plain sleep below
+    elif _IS_WINDOWS:
+        # Console input isn't select()-able; poll at the old paused rate
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if msvcrt.kbhit():
+                return True
+            time.sleep(min(0.2, max(0.0, deadline - time.monotonic())))
+        return False
+    elif _reader_thread is not None:
+        arrived = _KEY_ARRIVED.wait(timeout)
+        _KEY_ARRIVED.clear()
+        return arrived
+    time.sleep(timeout)
+    return False
+
+
+def get_keys_if_available() -> List[str]:
+    """Returns every key event received since the last call, without blocking."""
     if _IS_WINDOWS:
-        if msvcrt.kbhit():
-            try:
-                # Read the byte, decode assuming common encodings or handle potential errors
-                key_byte = msvcrt.getch()
-                try:
-                    key = key_byte.decode("utf-8")
-                except UnicodeDecodeError:
-                    # Handle potential non-utf8 keys or special keys if needed
-                    # For simplicity, we might ignore them or represent them differently
-                    # print(f"Debug: Non-UTF8 key byte: {key_byte}")
-                    key = None  # Or some placeholder if needed
-            except Exception as e:
-                # print(f"Debug: Error reading key on Windows: {e}")
-                key = None  # Ignore errors for now
+        _poll_windows()
     elif _IS_LINUX_OR_MAC:
-        # Check if stdin has data ready to be read with a timeout of 0
-        rlist, _, _ = select.select([sys.stdin], [], [], 0)
-        if rlist:
-            try:
-                # Read a single byte in raw mode
-                key_byte = sys.stdin.read(1)
-                key = key_byte  # In raw mode, it's already a string
-                # Handle potential escape sequences for special keys if needed (more complex)
-                # e.g., arrow keys might send multiple bytes like '\x1b[A'
-                # For basic controls (p, s, q), single bytes are usually sufficient.
-                if key == "\x03":  # Handle Ctrl+C explicitly in raw mode
-                    raise KeyboardInterrupt
-            except Exception as e:
-                # print(f"Debug: Error reading key on Unix/Mac: {e}")
-                key = None  # Ignore errors
+        _poll_unix()
     else:
-        # Basic fallback using readchar if available (likely blocks)
-        # This path is less ideal for responsive UI
-        if readchar:
-            # readchar doesn't easily support non-blocking checks across platforms
-            # This part remains a limitation without more complex threading
-            pass  # Cannot reliably check non-blockingly here with readchar easily
-
-    # Normalize common quit keys
-    if key is not None:
-        key = key.lower()
-        if key == "\x03":  # Ctrl+C might be read differently
+        _start_reader_thread()
+
+    keys: List[str] = []
+    while True:
+        try:
+            key = _KEY_QUEUE.get_nowait()
+        except queue.Empty:
+            break
+        if key == "\x03":  # Ctrl+C arrives as a plain byte in raw mode
             raise KeyboardInterrupt
+        keys.append(key)
+    return keys
 
-    return key
+
+def get_key_if_available() -> Optional[str]:
+    """Checks for and returns a key press without blocking. Returns None if no key is pressed."""
+    keys = get_keys_if_available()
+    if not keys:
+        return None
+    # Hand back the first key and requeue the rest so none are lost
+    for key in keys[1:]:
+        _KEY_QUEUE.put(key)
+    return keys[0]
 
 
 # Context manager for setup/restore
@@ -122,6 +383,15 @@ class KeyboardManager:
     def __exit__(self, exc_type, exc_val, exc_tb):
         restore_keyboard()
 
+    @contextmanager
+    def suspended(self):
+        """Restores the normal terminal for a line-based prompt, then re-enters raw mode."""
+        restore_keyboard()
+        try:
+            yield
+        finally:
+            setup_keyboard()
+
 
 # --- Example Usage (for testing this module directly) ---
 if __name__ == "__main__":
@@ -129,13 +399,13 @@ if __name__ == "__main__":
     with KeyboardManager():  # Ensure cleanup
         start_time = time.time()
         while time.time() - start_time < 10:
-            key = get_key_if_available()
-            if key:
-                if key == "q":
+            keys = get_keys_if_available()
+            if keys:
+                if "q" in keys:
                     print("\n'q' pressed. Exiting.")
                     break
                 # Use carriage return `\r` to overwrite the line
-                print(f"Key pressed: '{repr(key)}'   ", end="\r")
+                print(f"Keys pressed: {keys!r}   ", end="\r")
             else:
                 # Optionally print dots to show it's running
                 print(f"Waiting... {time.time() - start_time:.1f}s ", end="\r")
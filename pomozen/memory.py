@@ -0,0 +1,235 @@
+# pomozen/memory.py
+import os
+import sys
+import tracemalloc
+from typing import List, NamedTuple, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Allocations made by the measuring itself, not by PomoZen
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def rss_bytes() -> Optional[int]:
+    """Resident set size now (Linux), else the peak so far, else None."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # bytes vs KiB
+
+
+class MemorySample(NamedTuple):
+    session: int  # 1-based
+    rss: Optional[int]  # Bytes (see rss_bytes)
+    traced: int  # Bytes held by Python objects (tracemalloc)
+    growth: List[Tuple[str, int]]  # ("file:line", bytes) grown most since session 1
+
+
+class MemoryReport:
+    """Memory use after each session, for spotting slow leaks in long runs.
+
+    Session 1's tracemalloc snapshot is the baseline; later samples list the
+    source lines whose allocations grew the most since then. Only the
+    baseline and the latest sample are kept, so the report itself stays
+    constant in size. Tracing slows allocation down, hence opt-in.
+    """
+
+    def __init__(self, top: int = 3):
+        self.top = top
+        self.first: Optional[MemorySample] = None
+        self.last: Optional[MemorySample] = None
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._owns_tracing = not tracemalloc.is_tracing()
+        if self._owns_tracing:
+            tracemalloc.start()
+
+    def sample(self, session: Optional[int] = None) -> MemorySample:
+        """Measures now; `session` defaults to one more than the last sample."""
+        snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+        growth: List[Tuple[str, int]] = []
+        if self._baseline is None:
+            self._baseline = snapshot
+        else:
+            for stat in snapshot.compare_to(self._baseline, "lineno")[: self.top]:
+                if stat.size_diff > 0:
+                    frame = stat.traceback[0]
+                    growth.append((f"{frame.filename}:{frame.lineno}", stat.size_diff))
+        if session is None:
+            session = self.last.session + 1 if self.last else 1
+        # Summed from the filtered snapshot: get_traced_memory() would also
+        # count the snapshots, and the baseline is kept for the whole run
+        traced = sum(trace.size for trace in snapshot.traces)
+        sample = MemorySample(session, rss_bytes(), traced, growth)
+        self.first = self.first or sample
+        self.last = sample
+        return sample
+
+    def growth_per_session(self) -> float:
+        """Average traced bytes gained per session since the baseline."""
+        if self.first is None or self.last is self.first:
+            return 0.0
+        sessions = self.last.session - self.first.session
+        return (self.last.traced - self.first.traced) / sessions
+
+    def close(self):
+        self._baseline = None
+        if self._owns_tracing:
+            tracemalloc.stop()
+
+
+# --- Soak test: thousands of virtual-time sessions must not grow memory ---
+if __name__ == "__main__":
+    import copy
+    import gc
+    import tempfile
+    import time
+    from pathlib import Path
+
+    from rich.console import Console
+
+    from . import display
+    from .config import load_config
+    from .events import Batched, SessionStarted
+    from .history import HistoryRecorder
+    from .ticks import TickPolicy
+    from .timer import SessionStatus, SessionType, Timer
+
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    WARMUP = 800  # Sessions until Rich's bounded render caches stop filling
+    # Sessions the growth check averages over: a whole number of the script's
+    # 35-session cycle (pause every 5th, skip every 7th), so the recycled row
+    # holds the same speed samples at both ends of the window
+    WINDOW = 210
+    now = [0.0]
+
+    def clock() -> float:
+        return now[0]
+
+    def sleep(seconds: float):
+        now[0] += seconds
+
+    config = copy.deepcopy(load_config())
+    config["durations"] = {"work": 1, "short_break": 1, "long_break": 1}
+    config["schedule"].pop("pattern", None)
+    null = open(os.devnull, "w")
+    display.console.file = null  # Banners and status lines go nowhere
+    sink = Console(file=null, width=100, force_terminal=True)
+
+    class LeakyView(display.SessionView):
+        """The old behaviour: a new Progress task every session."""
+
+        def __call__(self, event):
+            if type(event) is SessionStarted:
+                self._task_id = None
+            super().__call__(event)
+
+    def soak(view, count: int, history: Path, window: int) -> MemoryReport:
+        """`start --auto`, minus the terminal: the same display calls per session,
+        with a pause in every 5th session and a skip in every 7th. The report's
+        baseline is taken `window` sessions before the end."""
+        timer = Timer(config, clock=clock, sleep=sleep)
+        timer.events.subscribe(view, *view.EVENT_TYPES)
+        recorder = Batched(HistoryRecorder(history))
+        timer.events.subscribe(recorder, *HistoryRecorder.EVENT_TYPES)
+        policy = TickPolicy(visible=lambda: True, clock=clock)
+        report = None
+        step = max(1, window // 5)
+        for session in range(count):
+            script = {10: ["p"], 11: ["p"]} if session % 5 == 0 else {}
+            if session % 7 == 3:
+                script[30] = ["s"]
+
+            def keys() -> List[str]:
+                return script.pop(int(timer.elapsed), [])
+
+            session_type = timer.current_session_type or timer.plan.cycle[0]
+            display.show_session_banner(session_type, 1)
+            # No view.live: the Live draws as it opens and closes, the same
+            # render path as `start` without 60 draws per virtual minute
+            with display.live_display(view.progress, live_console=sink):
+                status = timer.run_session(key_source=keys, policy=policy, wait=sleep)
+            display.show_completion_status(session_type, status)
+            if status == SessionStatus.SKIPPED and session_type != SessionType.WORK:
+                timer.current_session_type = timer._get_next_session_type()
+            done = session + 1
+            if done % step and done != count - window:
+                continue
+            # Collect on one cadence from the first session: starting only at
+            # the baseline changes what gc leaves alive, which reads as growth
+            gc.collect()
+            if done == count - window:  # Warmed up: the window starts here
+                report = MemoryReport()
+                report.sample(done)
+            elif report is not None:
+                sample = report.sample(done)
+                print(
+                    f"  session {done:>6,}: RSS {sample.rss / 2**20:6.1f} MB, "
+                    f"traced {sample.traced / 1024:8.1f} KB, "
+                    f"{len(view.progress.tasks)} progress task(s)"
+                )
+        if report.last.session != count:
+            gc.collect()
+            report.sample(count)
+        recorder.close()
+        return report
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        leaky_count = min(sessions, 100)
+        print(f"Before: a new progress task per session ({leaky_count} sessions)")
+        start = time.perf_counter()
+        leaky = soak(
+            LeakyView(display.make_progress()),
+            leaky_count,
+            Path(data_dir) / "leaky.bin",
+            leaky_count // 2,
+        )
+        print(
+            f"  {leaky.growth_per_session():+.0f} B/session, "
+            f"{(time.perf_counter() - start) / leaky_count * 1e3:.1f} ms/session"
+        )
+        leaky.close()
+
+        # However many sessions were asked for, warm up then measure the same
+        # window, so the per-session figure doesn't depend on the count
+        sessions = max(sessions, WARMUP + WINDOW)
+        print(f"After: one recycled task, shared Progress ({sessions:,} sessions)")
+        # Trace from the first session: objects allocated before tracing starts
+        # are invisible, so cache entries replaced later would look like growth
+        tracemalloc.start()
+        start = time.perf_counter()
+        report = soak(
+            display.SessionView(),  # The module-global progress `start` uses
+            sessions,
+            Path(data_dir) / "history.bin",
+            WINDOW,
+        )
+        elapsed = time.perf_counter() - start
+        per_session = report.growth_per_session()
+        rss_growth = (report.last.rss or 0) - (report.first.rss or 0)
+        print(
+            f"  {per_session:+.1f} B/session traced, RSS {rss_growth / 2**20:+.2f} MB "
+            f"over {report.last.session - report.first.session:,} sessions, "
+            f"{elapsed / sessions * 1e3:.1f} ms/session"
+        )
+        for location, size in report.last.growth:
+            print(f"    {size:>+8,} B  {location}")
+        report.close()
+        tracemalloc.stop()
+        # Flat: Rich's bounded caches fill early on, a leak keeps growing
+        assert len(display.progress.tasks) == 1, "Progress tasks accumulate"
+        assert per_session < 16, f"Memory grows {per_session:.0f} B per session"
+        assert rss_growth < 2 * 2**20, f"RSS grew {rss_growth / 2**20:.1f} MB"
+        print("Memory stays flat.")
@@ -2,6 +2,7 @@
 import sys
 from typing import Optional
 from .config import APP_CONFIG  # Use loaded config
+from .events import Completed
 
 # --- Conditional import for Plyer ---
 try:
@@ -87,6 +88,22 @@ def play_sound_alert(session_type: str):
     #     print(f"Error playing sound: {e}", file=sys.stderr)
 
 
+# --- Event Subscriber ---
+def notify_completed(event: Completed):
+    """Completed-event subscriber: desktop notification plus optional sound.
+
+    Notification backends can block for a while, so subscribe it wrapped in
+    events.Batched to keep the timer loop responsive.
+    """
+    session_name = event.session_type.name.replace("_", " ").capitalize()
+    name = event.timer.name
+    prefix = "PomoZen" if name == "PomoZen" else f"PomoZen [{name}]"
+    send_desktop_notification(
+        f"{prefix}: {session_name} Finished!", "Time for the next session!"
+    )
+    play_sound_alert(session_name)
+
+
 if __name__ == "__main__":
     print("Testing Notifications...")
     print(f"Plyer Available: {PLYER_AVAILABLE}")
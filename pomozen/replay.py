@@ -0,0 +1,389 @@
+# pomozen/replay.py
+# Record a real `start` run, then replay it against any build at full speed
+# on a virtual clock: the output must match, and the cost (CPU, wakeups,
+# rendering) comes out as a report that diffs cleanly between builds.
+import copy
+import gzip
+import json
+import os
+import time
+from collections import deque
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+from rich.console import Console
+
+from .display import SessionView, make_progress
+from .events import Completed, Paused, Resumed, SessionStarted, Skipped, Tick
+from .keyboard import get_keys_if_available, wait_for_input
+from .ticks import TickPolicy, output_is_visible
+from .timer import SessionStatus, SessionType, Timer
+
+TRACE_VERSION = 1
+STALL = 1.0  # Seconds a wait may overrun before it's recorded (suspend, load)
+
+Frame = Tuple[str, int, int]  # (description, seconds shown, total seconds)
+
+
+# --- Output: what the progress row showed ---
+class OutputLog:
+    """Turns a SessionView's row into frames, one per change of its text.
+
+    Frames hold whole seconds, like the display, so they don't depend on how
+    late each wakeup ran. A skip adds ("skipped", elapsed, planned).
+    """
+
+    EVENT_TYPES = (SessionStarted, Tick, Paused, Resumed, Completed, Skipped)
+
+    def __init__(self, view: SessionView, on_frame: Callable[[Frame], None]):
+        self.view = view
+        self.on_frame = on_frame
+        self._last: Optional[Frame] = None
+
+    def __call__(self, event):
+        if type(event) is Skipped:
+            frame = ("skipped", int(event.elapsed), event.planned)
+        else:
+            row = self.view.row
+            if row is None:
+                return
+            frame = (row.description, int(row.completed), int(row.total))
+        if frame != self._last:
+            self._last = frame
+            self.on_frame(frame)
+
+
+# --- Recording ---
+class TraceRecorder:
+    """Writes a `start` run to a gzipped NDJSON trace for `pomozen replay`.
+
+    Inputs are stored with their time since recording began: key batches
+    (Ctrl+C as 'q'), changes in output visibility, waits that overran by more
+    than STALL seconds, and each session start with its task and terminal
+    size. The row's frames are stored as the expected output. Pass keys(),
+    visible() and wait() to the session loop in place of the real ones and
+    subscribe the recorder to the timer's events after the view.
+    """
+
+    EVENT_TYPES = OutputLog.EVENT_TYPES
+
+    def __init__(
+        self,
+        path,
+        timer: Timer,
+        view: SessionView,
+        console: Console,
+        key_source: Callable[[], List[str]] = get_keys_if_available,
+        visible_check: Callable[[], bool] = output_is_visible,
+        wait: Callable[[float], object] = wait_for_input,
+    ):
+        self.timer = timer
+        self.console = console
+        self._key_source = key_source
+        self._visible_check = visible_check
+        self._wait = wait
+        self._visible: Optional[bool] = None
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._started_at = timer.clock()
+        self._output = OutputLog(view, lambda frame: self._write({"out": frame}))
+        self._write({"trace": TRACE_VERSION, "config": timer.config})
+
+    def _now(self) -> float:
+        # Unrounded: a key and a tick a few microseconds apart must replay
+        # in the recorded order
+        return self.timer.clock() - self._started_at
+
+    def _write(self, record: dict):
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def keys(self) -> List[str]:
+        try:
+            keys = self._key_source()
+        except KeyboardInterrupt:  # Ctrl+C in raw mode
+            self._write({"t": self._now(), "keys": ["q"]})
+            raise
+        if keys:
+            self._write({"t": self._now(), "keys": keys})
+        return keys
+
+    def visible(self) -> bool:
+        visible = self._visible_check()
+        if visible != self._visible:
+            self._visible = visible
+            self._write({"t": self._now(), "visible": visible})
+        return visible
+
+    def wait(self, seconds: float):
+        deadline = self.timer.clock() + seconds
+        try:
+            return self._wait(seconds)
+        except KeyboardInterrupt:  # SIGINT outside raw mode
+            self._write({"t": self._now(), "keys": ["q"]})
+            raise
+        finally:
+            late = self.timer.clock() - deadline
+            if late > STALL:
+                self._write({"t": self._now(), "late": late})
+
+    def __call__(self, event):
+        if type(event) is SessionStarted:
+            width, height = self.console.size
+            self._write(
+                {
+                    "t": self._now(),
+                    "session": event.session_type.name.lower(),
+                    "task": event.task,
+                    "width": width,
+                    "height": height,
+                }
+            )
+        self._output(event)
+
+    def close(self):
+        self._file.close()
+
+
+# --- Loading ---
+class Trace(NamedTuple):
+    config: dict
+    sessions: List[dict]  # Session start records, in order
+    keys: List[Tuple[float, List[str]]]  # (time, key batch)
+    visible: List[Tuple[float, bool]]  # (time, visible from then on)
+    stalls: List[Tuple[float, float]]  # (time woken, seconds late)
+    frames: List[Tuple[int, Frame]]  # (session index, frame)
+
+
+def load_trace(path) -> Trace:
+    """Reads a trace written by TraceRecorder. Raises ValueError if invalid."""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("trace") != TRACE_VERSION:
+                raise ValueError(f"Unsupported trace version {header.get('trace')}")
+            trace = Trace(header["config"], [], [], [], [], [])
+            for line in f:
+                record = json.loads(line)
+                if "out" in record:
+                    frame = tuple(record["out"])
+                    trace.frames.append((len(trace.sessions) - 1, frame))
+                elif "keys" in record:
+                    trace.keys.append((record["t"], record["keys"]))
+                elif "visible" in record:
+                    trace.visible.append((record["t"], record["visible"]))
+                elif "late" in record:
+                    trace.stalls.append((record["t"], record["late"]))
+                elif "session" in record:
+                    trace.sessions.append(record)
+    except (OSError, EOFError, KeyError, AttributeError) as e:
+        raise ValueError(f"Could not read trace '{path}': {e}") from e
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Could not read trace '{path}': line {e.lineno}") from e
+    return trace
+
+
+# --- Replaying ---
+class ReplayResult(NamedTuple):
+    sessions: int
+    seconds: float  # Virtual time covered
+    wakeups: int
+    ticks: int
+    frames: int
+    mismatch: Optional[str]  # First difference from the recorded output
+    cpu: float  # Process CPU seconds for the whole replay
+    render: float  # CPU seconds of the above spent rendering frames
+
+
+def replay(trace: Trace) -> ReplayResult:
+    """Runs the recorded sessions through Timer.run_session on a virtual clock.
+
+    Each session starts at its recorded time, type and task. Keys arrive at
+    their recorded times and cut waits short, as they do in wait_for_input;
+    stalls make the matching wait return late. Every new frame is rendered
+    to /dev/null at the recorded terminal size.
+    """
+    now = [0.0]
+    keys = deque(trace.keys)
+    visible = deque(trace.visible)
+    stalls = deque(trace.stalls)
+    # The first check is the initial state, even if it ran a little late
+    shown = [trace.visible[0][1] if trace.visible else True]
+
+    def clock() -> float:
+        return now[0]
+
+    def sleep(seconds: float):
+        now[0] += seconds
+
+    def key_source() -> List[str]:
+        batch: List[str] = []
+        while keys and keys[0][0] <= now[0]:
+            batch.extend(keys.popleft()[1])
+        return batch
+
+    def visible_check() -> bool:
+        while visible and visible[0][0] <= now[0]:
+            shown[0] = visible.popleft()[1]
+        return shown[0]
+
+    def wait(seconds: float):
+        deadline = now[0] + seconds
+        key_at = keys[0][0] if keys else float("inf")
+        if stalls and stalls[0][0] - stalls[0][1] <= min(deadline, key_at) + STALL / 2:
+            now[0] = max(now[0], stalls.popleft()[0])
+        else:
+            now[0] = max(now[0], min(deadline, key_at))
+
+    timer = Timer(copy.deepcopy(trace.config), clock=clock, sleep=sleep)
+    view = SessionView(make_progress())
+    timer.events.subscribe(view, *view.EVENT_TYPES)
+    ticks = [0]
+    timer.events.subscribe(lambda event: ticks.__setitem__(0, ticks[0] + 1), Tick)
+    null = open(os.devnull, "w")
+    sink = Console(file=null, force_terminal=True, color_system="truecolor")
+    frames: List[Frame] = []
+    render = [0.0]
+
+    def on_frame(frame: Frame):
+        frames.append(frame)
+        start = time.process_time()
+        sink.print(view.progress)
+        render[0] += time.process_time() - start
+
+    timer.events.subscribe(OutputLog(view, on_frame), *OutputLog.EVENT_TYPES)
+    policy = TickPolicy(visible=visible_check, clock=clock)
+    sessions = 0
+    start = time.process_time()
+    try:
+        for record in trace.sessions:
+            # As recorded, whatever the time spent at the prompt in between
+            now[0] = record["t"]
+            timer.current_session_type = SessionType[record["session"].upper()]
+            timer.task = record["task"]
+            sink.size = (record["width"], record["height"])
+            status = timer.run_session(key_source=key_source, policy=policy, wait=wait)
+            sessions += 1
+            if status == SessionStatus.QUIT:
+                break
+        cpu = time.process_time() - start
+    finally:
+        null.close()
+    return ReplayResult(
+        sessions,
+        now[0],
+        policy.wakeups,
+        ticks[0],
+        len(frames),
+        _compare(trace.frames, frames),
+        cpu,
+        render[0],
+    )
+
+
+def _compare(recorded: List[Tuple[int, Frame]], replayed: List[Frame]) -> Optional[str]:
+    for i, ((session, expected), frame) in enumerate(zip(recorded, replayed)):
+        if expected != frame:
+            return (
+                f"frame {i + 1} (session {session + 1}): "
+                f"recorded {list(expected)}, replayed {list(frame)}"
+            )
+    if len(recorded) != len(replayed):
+        return f"{len(recorded)} frames recorded, {len(replayed)} replayed"
+    return None
+
+
+def format_report(result: ReplayResult, runs: int = 1) -> str:
+    """One `name: value` per line in a fixed order, so two reports diff
+    line by line. Counts are exact; times are the best of `runs`."""
+    hours = max(result.seconds, 1e-9) / 3600
+    lines = [
+        f"sessions: {result.sessions}",
+        f"virtual_minutes: {result.seconds / 60:.1f}",
+        f"wakeups: {result.wakeups}",
+        f"wakeups_per_hour: {result.wakeups / hours:.1f}",
+        f"ticks: {result.ticks}",
+        f"frames: {result.frames}",
+        f"output: {'differs, ' + result.mismatch if result.mismatch else 'identical'}",
+        f"runs: {runs}",
+        f"cpu_ms: {result.cpu * 1e3:.1f}",
+        f"cpu_us_per_wakeup: {result.cpu / max(result.wakeups, 1) * 1e6:.1f}",
+        f"render_ms: {result.render * 1e3:.1f}",
+        f"render_us_per_frame: {result.render / max(result.frames, 1) * 1e6:.1f}",
+    ]
+    return "\n".join(lines)
+
+
+# --- Benchmark: record a scripted run on a virtual clock, replay it ---
+if __name__ == "__main__":
+    import sys
+    import tempfile
+
+    from .config import load_config
+
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    now = [0.0]
+    config = copy.deepcopy(load_config())
+    config["durations"] = {"work": 5, "short_break": 1, "long_break": 2}
+    timer = Timer(
+        config, clock=lambda: now[0], sleep=lambda s: now.__setitem__(0, now[0] + s)
+    )
+    view = SessionView(make_progress())
+    timer.events.subscribe(view, *view.EVENT_TYPES)
+    # Pause 10 s into every 3rd session, skip 40 s into every 4th, hide the
+    # output for minutes 2-3 of each, and one 90 s stall (suspend) mid-run
+    script: dict = {}  # Seconds since the session started -> keys
+    started = [0.0]
+
+    def keys() -> List[str]:
+        due = sorted(at for at in script if started[0] + at <= now[0])
+        return [key for at in due for key in script.pop(at)]
+
+    def visible() -> bool:
+        return not 120 <= timer.elapsed < 180
+
+    def wait(seconds: float):
+        """Like wait_for_input: a key press cuts the wait short."""
+        if session == sessions // 2 and 200 <= timer.elapsed < 201:
+            now[0] += seconds + 90.0
+        else:
+            now[0] = min([now[0] + seconds, *(started[0] + at for at in script)])
+
+    null = open(os.devnull, "w")
+    with tempfile.TemporaryDirectory() as data_dir:
+        path = os.path.join(data_dir, "run.trace.gz")
+        recorder = TraceRecorder(
+            path,
+            timer,
+            view,
+            Console(file=null, width=100, height=30),
+            keys,
+            visible,
+            wait,
+        )
+        timer.events.subscribe(recorder, *recorder.EVENT_TYPES)
+        policy = TickPolicy(visible=recorder.visible, clock=timer.clock)
+        for session in range(sessions):
+            script.clear()
+            if session % 3 == 0:
+                script.update({10.25: ["p"], 25.5: ["p"]})
+            if session % 4 == 3:
+                script[40.75] = ["s"]
+            now[0] += 7.5  # At the prompt
+            started[0] = now[0]
+            session_type = timer.current_session_type or timer.plan.cycle[0]
+            status = timer.run_session(recorder.keys, policy, recorder.wait)
+            if status == SessionStatus.SKIPPED and session_type != SessionType.WORK:
+                timer.current_session_type = timer._get_next_session_type()
+        recorder.close()
+        size = os.path.getsize(path)
+        trace = load_trace(path)
+        print(
+            f"Recorded {sessions} sessions ({now[0] / 60:.0f} virtual minutes, "
+            f"{policy.wakeups:,} wakeups): {len(trace.frames):,} frames, "
+            f"{size:,} bytes"
+        )
+        results = [replay(trace) for _ in range(3)]
+        best = min(results, key=lambda result: result.cpu)
+        print(format_report(best, len(results)))
+        assert best.mismatch is None, best.mismatch
+        assert (
+            best.wakeups == policy.wakeups
+        ), "Replay woke up a different number of times"
@@ -0,0 +1,281 @@
+# pomozen/report.py
+import calendar
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .history import scan_batches, time_span
+from .timer import SessionStatus, SessionType
+
+SHARD_MODES = ("month", "user")
+_COMPLETED = SessionStatus.COMPLETED.value
+
+
+# --- Mergeable aggregates ---
+class TypeStats:
+    """Totals and completion streaks for one session type.
+
+    Streaks are kept as (prefix, suffix, best, unbroken) so the stats of two
+    consecutive time ranges merge exactly: a streak running across the
+    boundary is suffix + prefix.
+    """
+
+    __slots__ = ("sessions", "completed", "seconds", "prefix", "suffix", "best")
+
+    def __init__(self):
+        self.sessions = 0
+        self.completed = 0
+        self.seconds = 0  # Time actually run, completed or not
+        self.prefix = 0  # Completed sessions before the first non-completed one
+        self.suffix = 0  # Completed sessions after the last non-completed one
+        self.best = 0  # Longest run of completed sessions
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    @property
+    def unbroken(self) -> bool:
+        return self.completed == self.sessions
+
+    @property
+    def completion_ratio(self) -> float:
+        return self.completed / self.sessions if self.sessions else 0.0
+
+    def merge(self, later: "TypeStats") -> "TypeStats":
+        """Folds in the stats of the time range right after this one."""
+        self.best = max(self.best, later.best, self.suffix + later.prefix)
+        if self.unbroken:
+            self.prefix += later.prefix
+        self.suffix = self.suffix + later.suffix if later.unbroken else later.suffix
+        self.sessions += later.sessions
+        self.completed += later.completed
+        self.seconds += later.seconds
+        return self
+
+    def combine(self, other: "TypeStats") -> "TypeStats":
+        """Folds in an unrelated history (another user): streaks don't join."""
+        self.best = max(self.best, other.best)
+        self.prefix = self.suffix = 0
+        self.sessions += other.sessions
+        self.completed += other.completed
+        self.seconds += other.seconds
+        return self
+
+
+class Aggregate:
+    """Per-session-type stats for one shard, one user or the whole team."""
+
+    __slots__ = ("types",)
+
+    def __init__(self):
+        self.types: Dict[SessionType, TypeStats] = {t: TypeStats() for t in SessionType}
+
+    @property
+    def sessions(self) -> int:
+        return sum(stats.sessions for stats in self.types.values())
+
+    def merge(self, later: "Aggregate") -> "Aggregate":
+        for session_type, stats in self.types.items():
+            stats.merge(later.types[session_type])
+        return self
+
+    def combine(self, other: "Aggregate") -> "Aggregate":
+        for session_type, stats in self.types.items():
+            stats.combine(other.types[session_type])
+        return self
+
+
+def aggregate_history(
+    path: Path, since: Optional[int] = None, until: Optional[int] = None
+) -> Aggregate:
+    """Aggregates one history file's records with since <= started_at < until."""
+    aggregate = Aggregate()
+    # Plain lists indexed by type value keep the per-record loop cheap
+    size = max(t.value for t in SessionType) + 1
+    sessions, completed, seconds = [0] * size, [0] * size, [0] * size
+    run, prefix, best = [0] * size, [None] * size, [0] * size
+    for batch in scan_batches(path, since, until):
+        for kind, status, actual in zip(
+            batch.session_types, batch.statuses, batch.actual
+        ):
+            sessions[kind] += 1
+            seconds[kind] += actual
+            if status == _COMPLETED:
+                completed[kind] += 1
+                run[kind] += 1
+            else:
+                if prefix[kind] is None:
+                    prefix[kind] = run[kind]
+                if run[kind] > best[kind]:
+                    best[kind] = run[kind]
+                run[kind] = 0
+    for session_type, stats in aggregate.types.items():
+        kind = session_type.value
+        stats.sessions = sessions[kind]
+        stats.completed = completed[kind]
+        stats.seconds = seconds[kind]
+        stats.prefix = run[kind] if prefix[kind] is None else prefix[kind]
+        stats.suffix = run[kind]
+        stats.best = max(best[kind], run[kind])
+    return aggregate
+
+
+# --- Sharding ---
+class Shard(NamedTuple):
+    user: int  # Index into the report's users
+    path: str
+    since: Optional[int]
+    until: Optional[int]
+
+
+def user_name(path: Path) -> str:
+    """'alice/history.bin' -> 'alice', 'alice.bin' -> 'alice'."""
+    return path.parent.name if path.name == "history.bin" else path.stem
+
+
+def _month_starts(first: int, last: int) -> Iterator[int]:
+    """UTC month boundaries from the month of `first` up to just past `last`."""
+    year, month = time.gmtime(first)[:2]
+    while True:
+        start = calendar.timegm((year, month, 1, 0, 0, 0))
+        yield start
+        if start > last:
+            return
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def plan_shards(paths: List[Path], by: str = "month") -> List[Shard]:
+    """Work units in (user, time) order: whole files, or one per user-month."""
+    if by not in SHARD_MODES:
+        raise ValueError(f"Unknown shard mode '{by}'. Use one of: month, user")
+    shards: List[Shard] = []
+    for user, path in enumerate(paths):
+        span = time_span(path)
+        if span is None:
+            continue
+        if by == "user":
+            shards.append(Shard(user, str(path), None, None))
+            continue
+        starts = list(_month_starts(*span))
+        for since, until in zip(starts, starts[1:]):
+            shards.append(Shard(user, str(path), since, until))
+    return shards
+
+
+def _aggregate_shard(path: str, since: Optional[int], until: Optional[int]):
+    return aggregate_history(Path(path), since, until)
+
+
+# --- Report ---
+def build_report(
+    paths: List[Path], by: str = "month", workers: Optional[int] = None
+) -> Tuple[List[Tuple[str, Aggregate]], Aggregate]:
+    """Per-user aggregates (in input order) plus the team total.
+
+    Shards run across a process pool; their partial aggregates come back in
+    time order and are merged per user, then combined into the team total.
+    """
+    shards = plan_shards(paths, by)
+    users = [Aggregate() for _ in paths]
+    if shards:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Several small shards per task keep pickling overhead low
+            chunksize = max(1, len(shards) // ((workers or os.cpu_count() or 1) * 8))
+            results = pool.map(
+                _aggregate_shard,
+                [s.path for s in shards],
+                [s.since for s in shards],
+                [s.until for s in shards],
+                chunksize=chunksize,
+            )
+            for shard, partial in zip(shards, results):
+                users[shard.user].merge(partial)
+    team = Aggregate()
+    for aggregate in users:
+        team.combine(aggregate)
+    return [(user_name(path), agg) for path, agg in zip(paths, users)], team
+
+
+def report_to_dict(users: List[Tuple[str, Aggregate]], team: Aggregate) -> dict:
+    def describe(aggregate: Aggregate) -> dict:
+        return {
+            session_type.name.lower(): {
+                "sessions": stats.sessions,
+                "completed": stats.completed,
+                "completion_ratio": round(stats.completion_ratio, 4),
+                "minutes": round(stats.seconds / 60, 1),
+                "best_streak": stats.best,
+            }
+            for session_type, stats in aggregate.types.items()
+        }
+
+    return {
+        "users": {name: describe(aggregate) for name, aggregate in users},
+        "team": describe(team),
+    }
+
+
+# --- Benchmark: scaling with 1, 2, 4 and 8 workers ---
+if __name__ == "__main__":
+    import sys
+    import tempfile
+
+    from .history import append_rows
+
+    user_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    per_user = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000  # ~2 years each
+    worker_counts = [int(n) for n in sys.argv[3:]] or [1, 2, 4, 8]
+    data_dir = Path(tempfile.gettempdir()) / f"pomozen-report-{user_count}x{per_user}"
+
+    paths = [data_dir / f"user{u:04d}" / "history.bin" for u in range(user_count)]
+    if not paths[-1].exists():
+        print(f"Generating {user_count} users x {per_user:,} records in {data_dir}...")
+        kinds = (1, 2, 1, 2, 1, 2, 1, 3)  # Work/short break pattern, long break
+        for u, path in enumerate(paths):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            base = 1_600_000_000 + u * 60
+            append_rows(
+                (
+                    (
+                        base + i * 3000,
+                        1500,
+                        1500 - (i * 7 + u) % 90,
+                        kinds[i % 8],
+                        1 if (i * 13 + u) % 11 else 2,
+                        0,  # No task label
+                    )
+                    for i in range(per_user)
+                ),
+                path,
+            )
+
+    total = user_count * per_user
+    print(f"{total:,} records, {os.cpu_count()} CPU(s) available")
+    baseline = None
+    reference = None
+    for count in worker_counts:
+        start = time.perf_counter()
+        users, team = build_report(paths, "month", workers=count)
+        elapsed = time.perf_counter() - start
+        result = report_to_dict(users, team)
+        if reference is None:
+            reference = result
+        assert result == reference, "Worker count changed the report"
+        baseline = baseline or elapsed
+        print(
+            f"{count} worker(s): {elapsed:6.2f}s "
+            f"({total / elapsed / 1e6:.2f} M rec/s, speedup {baseline / elapsed:.2f}x)"
+        )
+    # Sharding must not change results (streaks included): one pass per user
+    sequential = [(user_name(path), aggregate_history(path)) for path in paths]
+    team = Aggregate()
+    for _, aggregate in sequential:
+        team.combine(aggregate)
+    assert report_to_dict(sequential, team) == reference
+    print("Month-sharded results match a sequential pass per user.")
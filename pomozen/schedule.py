@@ -0,0 +1,246 @@
+# pomozen/schedule.py
+import time
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from .timer import SessionType
+
+# --- Plan Encoding ---
+# Slots are stored as parallel arrays (seconds since local midnight).
+# A kind of GAP marks a scheduled pause such as lunch; every other kind is
+# the `.value` of a SessionType.
+GAP = 0
+_BREAK_KINDS = (SessionType.SHORT_BREAK.value, SessionType.LONG_BREAK.value)
+
+_PATTERN_NAMES = {
+    "work": SessionType.WORK,
+    "short_break": SessionType.SHORT_BREAK,
+    "long_break": SessionType.LONG_BREAK,
+}
+
+
+def parse_clock(value: str) -> int:
+    """Parses an 'HH:MM' string into seconds since midnight. Raises ValueError."""
+    hours_str, sep, minutes_str = str(value).partition(":")
+    if not sep:
+        raise ValueError(f"Expected HH:MM, got '{value}'")
+    hours, minutes = int(hours_str), int(minutes_str)
+    if not (0 <= hours <= 24 and 0 <= minutes < 60) or hours * 60 + minutes > 1440:
+        raise ValueError(f"Time '{value}' is out of range")
+    return hours * 3600 + minutes * 60
+
+
+def format_clock(seconds: float) -> str:
+    """Formats seconds since midnight as 'HH:MM'."""
+    minutes = int(seconds) // 60
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def seconds_since_midnight(timestamp: Optional[float] = None) -> float:
+    """Returns the local time of day in seconds for `timestamp` (default: now)."""
+    now = time.time() if timestamp is None else timestamp
+    local = time.localtime(now)
+    return local.tm_hour * 3600 + local.tm_min * 60 + local.tm_sec + (now % 1)
+
+
+def default_pattern(long_break_interval: int) -> Tuple[SessionType, ...]:
+    """Builds the classic work/short/.../work/long cycle."""
+    pattern: List[SessionType] = []
+    for _ in range(long_break_interval - 1):
+        pattern += [SessionType.WORK, SessionType.SHORT_BREAK]
+    pattern += [SessionType.WORK, SessionType.LONG_BREAK]
+    return tuple(pattern)
+
+
+class DayPlan:
+    """A compiled, read-only day schedule backed by compact arrays."""
+
+    __slots__ = (
+        "cycle",
+        "durations",
+        "day_start",
+        "day_end",
+        "starts",
+        "ends",
+        "kinds",
+        "_next_break",
+    )
+
+    def __init__(
+        self,
+        cycle: Tuple[SessionType, ...],
+        durations: Mapping[SessionType, int],
+        day_start: int,
+        day_end: int,
+        starts: array,
+        ends: array,
+        kinds: array,
+    ):
+        self.cycle = cycle
+        # Seconds per session type; read-only since cached plans are shared
+        self.durations = MappingProxyType(dict(durations))
+        self.day_start = day_start
+        self.day_end = day_end
+        self.starts = starts
+        self.ends = ends
+        self.kinds = kinds
+
+        # Backward pass: for every slot, where the next break (or gap) begins.
+        # Break slots point at themselves so lookups are a single index.
+        next_break = array("l", bytes(len(kinds) * array("l").itemsize))
+        upcoming = ends[-1] if len(ends) else day_end
+        for i in range(len(kinds) - 1, -1, -1):
+            if kinds[i] == GAP or kinds[i] in _BREAK_KINDS:
+                upcoming = starts[i]
+            next_break[i] = upcoming
+        self._next_break = next_break
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    # --- Lookups ---
+    def slot_at(self, t: float) -> Optional[int]:
+        """Returns the index of the slot covering `t`, or None outside the plan."""
+        i = bisect_right(self.starts, t) - 1
+        if i < 0 or t >= self.ends[i]:
+            return None
+        return i
+
+    def session_at(self, t: float) -> Optional[SessionType]:
+        """Returns the session type scheduled at `t` (None for gaps / off hours)."""
+        i = self.slot_at(t)
+        if i is None or self.kinds[i] == GAP:
+            return None
+        return SessionType(self.kinds[i])
+
+    def is_gap(self, t: float) -> bool:
+        """True if `t` falls inside a scheduled gap such as lunch."""
+        i = self.slot_at(t)
+        return i is not None and self.kinds[i] == GAP
+
+    def time_until_next_break(self, t: float) -> float:
+        """Seconds from `t` until the next break starts (0 while on a break)."""
+        i = self.slot_at(t)
+        if i is None:
+            # Before the day starts, the first break is the answer.
+            if len(self) and t < self.starts[0]:
+                return self._next_break[0] - t
+            return 0.0
+        return max(0.0, self._next_break[i] - t)
+
+    def time_until_end_of_day(self, t: float) -> float:
+        """Seconds from `t` until the last scheduled slot ends."""
+        return max(0.0, self.end_of_day - t)
+
+    @property
+    def end_of_day(self) -> int:
+        return self.ends[-1] if len(self.ends) else self.day_end
+
+    def next_in_cycle(self, position: int) -> Tuple[int, SessionType]:
+        """Returns the cycle position after `position` and its session type."""
+        position = (position + 1) % len(self.cycle)
+        return position, self.cycle[position]
+
+
+# --- Compiler ---
+def _config_key(config: Dict[str, Any]) -> Tuple:
+    """Extracts the hashable subset of the config that shapes a plan."""
+    durations = config["durations"]
+    settings = config["settings"]
+    schedule = config.get("schedule", {})
+    pattern = schedule.get("pattern") or ()
+    return (
+        int(durations["work"] * 60),
+        int(durations["short_break"] * 60),
+        int(durations["long_break"] * 60),
+        settings["long_break_interval"],
+        tuple(str(name).lower() for name in pattern),
+        schedule.get("day_start", "09:00"),
+        schedule.get("day_end", "17:00"),
+        schedule.get("lunch_start", "12:00"),
+        schedule.get("lunch_duration", 0),
+    )
+
+
+@lru_cache(maxsize=8)
+def _compile(key: Tuple) -> DayPlan:
+    (
+        work,
+        short_break,
+        long_break,
+        interval,
+        pattern_names,
+        day_start_str,
+        day_end_str,
+        lunch_start_str,
+        lunch_minutes,
+    ) = key
+
+    durations = {
+        SessionType.WORK: work,
+        SessionType.SHORT_BREAK: short_break,
+        SessionType.LONG_BREAK: long_break,
+    }
+    if pattern_names:
+        cycle = tuple(_PATTERN_NAMES[name] for name in pattern_names)
+    else:
+        cycle = default_pattern(interval)
+
+    day_start = parse_clock(day_start_str)
+    day_end = parse_clock(day_end_str)
+    lunch_start = parse_clock(lunch_start_str) if lunch_minutes else day_end
+    # Clamped to the working day: a gap starting before day_start would move
+    # t backwards and leave `starts` unsorted for the bisect lookups
+    lunch_start = max(day_start, min(lunch_start, day_end))
+    lunch_end = min(day_end, lunch_start + lunch_minutes * 60)
+
+    starts, ends, kinds = array("l"), array("l"), array("b")
+    t, position, lunch_taken = day_start, 0, lunch_start >= day_end
+    while t < day_end:
+        if not lunch_taken and t >= lunch_start:
+            # Lunch is a fixed gap; the cycle restarts afterwards.
+            starts.append(t)
+            ends.append(lunch_end)
+            kinds.append(GAP)
+            t, position, lunch_taken = lunch_end, 0, True
+            continue
+
+        session_type = cycle[position]
+        end = t + durations[session_type]
+        if not lunch_taken:
+            end = min(end, lunch_start)  # Sessions never run into lunch
+        end = min(end, day_end)  # ...or past the daily stop time
+        starts.append(t)
+        ends.append(end)
+        kinds.append(session_type.value)
+        t, position = end, (position + 1) % len(cycle)
+
+    return DayPlan(cycle, durations, day_start, day_end, starts, ends, kinds)
+
+
+def get_day_plan(config: Dict[str, Any]) -> DayPlan:
+    """Returns the compiled plan for `config`, reusing a cached one when possible."""
+    return _compile(_config_key(config))
+
+
+# --- Main block for testing ---
+if __name__ == "__main__":
+    import timeit
+
+    from .config import APP_CONFIG
+
+    plan = get_day_plan(APP_CONFIG)
+    print(f"Compiled {len(plan)} slots, day ends at {format_clock(plan.end_of_day)}")
+    for i in range(len(plan)):
+        kind = "Lunch" if plan.kinds[i] == GAP else SessionType(plan.kinds[i]).name
+        print(f"  {format_clock(plan.starts[i])}-{format_clock(plan.ends[i])} {kind}")
+
+    probe = plan.day_start + 3 * 3600 + 17
+    n = 200_000
+    per_call = timeit.timeit(lambda: plan.session_at(probe), number=n) / n
+    print(f"session_at: {per_call * 1e6:.2f} µs/call")
+    per_call = timeit.timeit(lambda: get_day_plan(APP_CONFIG), number=n) / n
+    print(f"get_day_plan (cached): {per_call * 1e6:.2f} µs/call")
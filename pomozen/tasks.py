@@ -0,0 +1,318 @@
+# pomozen/tasks.py
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .history import (
+    SessionRecord,
+    count_records,
+    get_history_path,
+    history_generation,
+    history_lock,
+    rows_at,
+    scan_rows,
+)
+from .timer import SessionStatus, SessionType
+
+# --- Storage ---
+# Next to history.bin:
+#   history.tasks  task names, one per line; line N (from 1) is task id N
+#   history.tidx   inverted index: header + sorted u64 keys (task id << 32 | record
+#                  position), covering the first `covered` records of the history
+INDEX_MAGIC = b"PZTIDX01"
+INDEX_HEADER = struct.Struct("<8sQQ")  # magic, history generation, records covered
+INDEX_FLUSH_RECORDS = 4096  # Unindexed history records before rewriting the index
+_WORK = SessionType.WORK.value
+_COMPLETED = SessionStatus.COMPLETED.value
+
+
+def clean_task_name(name: str) -> str:
+    """Collapses whitespace (and newlines) so a name fits on one line."""
+    return " ".join(name.split())
+
+
+class TaskIndex:
+    """Task labels for one history file, with two indexes.
+
+    * a prefix index (a sorted array of case-folded names) answers
+      autocomplete with one binary search
+    * an inverted index maps each task to the positions of its sessions, so
+      per-task queries read only those records instead of the whole history
+
+    The inverted index is rebuilt lazily: records appended since it was
+    written are picked up from the (short) tail of the history, and the file
+    is rewritten once that tail grows or the history itself was replaced.
+    """
+
+    def __init__(self, history_path: Optional[Path] = None):
+        self.history_path = history_path or get_history_path()
+        self.names_path = self.history_path.with_suffix(".tasks")
+        self.index_path = self.history_path.with_suffix(".tidx")
+        self._names: List[str] = []  # Task id - 1 -> name
+        self._ids: Dict[str, int] = {}
+        self._names_size = 0  # Bytes of the names file already loaded
+        self._keys: List[str] = []  # Case-folded names, sorted
+        self._key_ids = array("I")  # Task id for each entry of _keys
+        self._postings: Optional[array] = None  # Sorted task << 32 | position
+        self._tail: Dict[int, List[int]] = {}  # Positions past the index file
+        self._load_names()
+
+    # --- Names and the prefix index ---
+    def _load_names(self):
+        """Loads names appended to the file since the last call."""
+        try:
+            with open(self.names_path, "rb") as f:
+                f.seek(self._names_size)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        end = data.rfind(b"\n") + 1  # Ignore a half-written last line
+        self._names_size += end
+        added = data[:end].decode("utf-8").splitlines()
+        first_id = len(self._names) + 1
+        self._names.extend(added)
+        for task_id, name in enumerate(added, start=first_id):
+            self._ids.setdefault(name, task_id)
+        if len(added) > 64:
+            # Bulk load: one sort beats many sorted inserts
+            keys = self._keys + [name.casefold() for name in added]
+            ids = list(self._key_ids) + list(range(first_id, first_id + len(added)))
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+            self._keys = [keys[i] for i in order]
+            self._key_ids = array("I", (ids[i] for i in order))
+        else:
+            for task_id, name in enumerate(added, start=first_id):
+                self._insert_key(name, task_id)
+
+    def _insert_key(self, name: str, task_id: int):
+        key = name.casefold()
+        position = bisect_left(self._keys, key)
+        self._keys.insert(position, key)
+        self._key_ids.insert(position, task_id)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def name(self, task_id: int) -> Optional[str]:
+        return self._names[task_id - 1] if 0 < task_id <= len(self._names) else None
+
+    def lookup(self, name: str) -> int:
+        """Task id for `name`, or 0 if it was never used."""
+        return self._ids.get(clean_task_name(name), 0)
+
+    def intern(self, name: str) -> int:
+        """Task id for `name`, adding it to the names file if it's new."""
+        name = clean_task_name(name)
+        if not name:
+            return 0
+        task_id = self._ids.get(name)
+        if task_id is not None:
+            return task_id
+        # Ids are line numbers, so read the tail and append under the lock the
+        # history appends use: otherwise two processes adding names at once
+        # would both claim the next id
+        with history_lock(self.history_path):
+            self._load_names()  # Another process may have added it meanwhile
+            task_id = self._ids.get(name)
+            if task_id is None:
+                line = (name + "\n").encode("utf-8")
+                with open(self.names_path, "ab") as f:
+                    f.write(line)
+                self._names_size += len(line)
+                self._names.append(name)
+                task_id = self._ids[name] = len(self._names)
+                self._insert_key(name, task_id)
+        return task_id
+
+    def complete(self, prefix: str, limit: int = 20) -> List[str]:
+        """Known task names starting with `prefix` (case-insensitive), sorted."""
+        key = prefix.casefold()
+        keys, ids = self._keys, self._key_ids
+        matches = []
+        position = bisect_left(keys, key)
+        while position < len(keys) and len(matches) < limit:
+            if not keys[position].startswith(key):
+                break
+            matches.append(self._names[ids[position] - 1])
+            position += 1
+        return matches
+
+    # --- Inverted index ---
+    def _read_index(self, generation: int, count: int) -> Tuple[array, int]:
+        """The stored postings and how many records they cover (0 if stale)."""
+        postings = array("Q")
+        try:
+            with open(self.index_path, "rb") as f:
+                magic, indexed_generation, covered = INDEX_HEADER.unpack(
+                    f.read(INDEX_HEADER.size)
+                )
+                if (
+                    magic != INDEX_MAGIC
+                    or indexed_generation != generation
+                    or covered > count
+                ):
+                    return postings, 0  # Replaced (import) or trimmed (retention)
+                postings.frombytes(f.read())
+        except (FileNotFoundError, struct.error, ValueError):
+            return array("Q"), 0
+        if sys.byteorder == "big":
+            postings.byteswap()  # Stored little-endian
+        return postings, covered
+
+    def _write_index(self, postings: array, generation: int, covered: int):
+        temp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        data = array("Q", postings)
+        if sys.byteorder == "big":
+            data.byteswap()
+        with open(temp_path, "wb") as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, generation, covered))
+            f.write(data.tobytes())
+        os.replace(temp_path, self.index_path)
+
+    def refresh(self):
+        """Brings the inverted index up to date with the history file."""
+        self._tail = {}
+        if not self.history_path.exists():
+            self._postings = array("Q")
+            return
+        generation = history_generation(self.history_path)
+        count = count_records(self.history_path)
+        postings, covered = self._read_index(generation, count)
+        if covered == 0 and count:
+            # Full (re)build: one sequential pass over the whole history
+            postings = array(
+                "Q",
+                sorted(
+                    row[5] << 32 | position
+                    for position, row in enumerate(scan_rows(self.history_path))
+                    if row[5]
+                ),
+            )
+            self._write_index(postings, generation, count)
+            covered = count
+        tail = rows_at(self.history_path, range(covered, count))
+        for position, row in enumerate(tail, start=covered):
+            if row[5]:
+                self._tail.setdefault(row[5], []).append(position)
+        if count - covered >= INDEX_FLUSH_RECORDS:
+            merged = list(postings)
+            for task_id, positions in self._tail.items():
+                merged.extend(task_id << 32 | position for position in positions)
+            postings = array("Q", sorted(merged))
+            self._write_index(postings, generation, count)
+            self._tail = {}
+        self._postings = postings
+
+    def positions(self, task_id: int) -> List[int]:
+        """History positions of every session labelled `task_id`, oldest first."""
+        if self._postings is None:
+            self.refresh()
+        postings = self._postings
+        start = bisect_left(postings, task_id << 32)
+        end = bisect_left(postings, (task_id + 1) << 32, start)
+        found = [key & 0xFFFFFFFF for key in postings[start:end]]
+        return found + self._tail.get(task_id, [])
+
+    def sessions(self, name: str) -> List[SessionRecord]:
+        """Every session labelled `name`, read straight from its positions."""
+        task_id = self.lookup(name)
+        if not task_id:
+            return []
+        types = {t.value: t for t in SessionType}
+        statuses = {s.value: s for s in SessionStatus}
+        return [
+            SessionRecord(
+                started_at, planned, actual, types[kind], statuses[status], task
+            )
+            for started_at, planned, actual, kind, status, task in rows_at(
+                self.history_path, self.positions(task_id)
+            )
+        ]
+
+    def summary(self, name: str) -> Tuple[int, int]:
+        """(completed work sessions, seconds of work) for one task."""
+        task_id = self.lookup(name)
+        completed = seconds = 0
+        if task_id:
+            for row in rows_at(self.history_path, self.positions(task_id)):
+                if row[3] == _WORK:
+                    seconds += row[2]
+                    completed += row[4] == _COMPLETED
+        return completed, seconds
+
+
+# --- Benchmark: autocomplete and per-task lookups with 100k tasks ---
+if __name__ == "__main__":
+    import random
+    import tempfile
+    import time
+
+    from .history import append_rows
+
+    task_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    record_count = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    rng = random.Random(42)
+    words = ["api", "billing", "docs", "design", "infra", "mobile", "review", "web"]
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        history = Path(data_dir) / "history.bin"
+        names = [
+            f"{rng.choice(words)}-{rng.choice(words)} #{i}" for i in range(task_count)
+        ]
+        history.with_suffix(".tasks").write_text("\n".join(names) + "\n", "utf-8")
+        append_rows(
+            (
+                (
+                    1_600_000_000 + i * 1800,
+                    1500,
+                    1500,
+                    1,
+                    1,
+                    rng.randrange(task_count) + 1,
+                )
+                for i in range(record_count)
+            ),
+            history,
+        )
+
+        def timed(function, *args):
+            start = time.perf_counter()
+            result = function(*args)
+            return result, time.perf_counter() - start
+
+        def percentiles(samples: List[float]) -> str:
+            samples.sort()
+            return (
+                f"p50 {samples[len(samples) // 2] * 1e6:7.1f} µs, "
+                f"p99 {samples[int(len(samples) * 0.99)] * 1e6:7.1f} µs"
+            )
+
+        index, load = timed(TaskIndex, history)
+        print(f"{task_count:,} tasks, {record_count:,} sessions")
+        print(f"  load names + build prefix index: {load * 1e3:7.1f} ms")
+        _, build = timed(index.refresh)
+        print(f"  build inverted index (first use): {build * 1e3:6.1f} ms")
+        _, reload = timed(TaskIndex(history).refresh)
+        print(f"  load inverted index afterwards:  {reload * 1e3:7.1f} ms")
+
+        prefixes = [rng.choice(names)[: rng.randint(1, 12)] for _ in range(10_000)]
+        samples = [timed(index.complete, prefix, 10)[1] for prefix in prefixes]
+        print(f"  autocomplete (10 matches):        {percentiles(samples)}")
+        linear = [
+            timed(lambda p: [n for n in names if n.startswith(p)][:10], prefix)[1]
+            for prefix in prefixes[:200]
+        ]
+        print(f"  autocomplete by linear scan:      {percentiles(linear)}")
+
+        picks = [rng.choice(names) for _ in range(2_000)]
+        samples = [timed(index.summary, name)[1] for name in picks]
+        print(f"  focus time for one task (index):  {percentiles(samples)}")
+        target = index.lookup(picks[0])
+        _, scan_time = timed(
+            lambda: sum(row[2] for row in scan_rows(history) if row[5] == target)
+        )
+        print(f"  focus time for one task (scan):   {scan_time * 1e3:7.1f} ms")
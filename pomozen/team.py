@@ -0,0 +1,413 @@
+# pomozen/team.py
+import collections
+import os
+import selectors
+import socket
+import struct
+import threading
+from typing import Deque, Dict, Iterator, Optional, Tuple
+
+from .events import Completed, Paused, Resumed, SessionStarted, Skipped, Tick
+from .timer import SessionType, Timer
+from .web import check_loopback
+
+# --- Wire Format ---
+# Every message is one fixed 16-byte frame:
+#   kind (u8), session type (u8), flags (u8), pad, sequence (u32),
+#   elapsed seconds (u32), session duration seconds (u32)
+FRAME = struct.Struct("<BBBxIII")
+
+KIND_CODES = {
+    "snapshot": 0,  # Full state, sent on connect and to resync slow subscribers
+    "session": 1,
+    "pause": 2,
+    "resume": 3,
+    "skip": 4,
+    "complete": 5,
+    "tick": 6,
+}
+KIND_NAMES = {code: kind for kind, code in KIND_CODES.items()}
+_EVENT_KINDS = {
+    SessionStarted: "session",
+    Paused: "pause",
+    Resumed: "resume",
+    Skipped: "skip",
+    Completed: "complete",
+    Tick: "tick",
+}
+FLAG_PAUSED = 0x01
+
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+MAX_BUFFERED = 64 * 1024  # Per-subscriber backlog before it gets resynced
+
+
+def parse_address(address: str) -> Tuple[int, object]:
+    """Turns 'host:port', '[ipv6]:port' or 'unix:/path' into a (socket family,
+    address) pair."""
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:") :]
+    host, _, port = address.rpartition(":")
+    if host.startswith("[") and host.endswith("]"):
+        return socket.AF_INET6, (host[1:-1], int(port))
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+def encode_frame(kind: str, sequence: int, timer: Timer) -> bytes:
+    session_type = timer.current_session_type or timer.plan.cycle[0]
+    return FRAME.pack(
+        KIND_CODES[kind],
+        session_type.value,
+        FLAG_PAUSED if timer.is_paused else 0,
+        sequence & 0xFFFFFFFF,
+        int(timer.elapsed),
+        timer.duration,
+    )
+
+
+def decode_frame(frame: bytes) -> Dict[str, object]:
+    kind, session_type, flags, sequence, elapsed, duration = FRAME.unpack(frame)
+    return {
+        "kind": KIND_NAMES.get(kind, "unknown"),
+        "session_type": SessionType(session_type),
+        "paused": bool(flags & FLAG_PAUSED),
+        "sequence": sequence,
+        "elapsed": elapsed,
+        "duration": duration,
+    }
+
+
+class _Subscriber:
+    __slots__ = ("sock", "backlog", "writing")
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.backlog = bytearray()  # Bytes the kernel would not take yet
+        self.writing = False  # Registered for EVENT_WRITE
+
+
+# --- Publisher ---
+class TeamPublisher:
+    """Broadcasts one authoritative Timer's state changes to many subscribers.
+
+    The timer thread only encodes a frame and queues it; a background thread
+    owns every socket and writes without blocking. A subscriber whose backlog
+    exceeds `max_buffered` has its stale deltas dropped and gets a single
+    snapshot frame instead, so a slow reader never delays the timer or peers.
+    """
+
+    def __init__(
+        self, address: str = DEFAULT_ADDRESS, max_buffered: int = MAX_BUFFERED
+    ):
+        self.address = address
+        self.max_buffered = max_buffered
+        self.sequence = 0
+        self.resyncs = 0  # How often a slow subscriber was collapsed to a snapshot
+        self._timer: Optional[Timer] = None
+        self._snapshot = b""
+        self._pending: Deque[bytes] = collections.deque()
+        self._subscribers: Dict[int, _Subscriber] = {}
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._listener: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def bound_address(self) -> object:
+        return self._listener.getsockname() if self._listener else None
+
+    # --- Lifecycle ---
+    def start(self):
+        family, bind_to = parse_address(self.address)
+        if family != socket.AF_UNIX:
+            check_loopback(bind_to[0])  # Frames are unauthenticated
+        listener = socket.socket(family, socket.SOCK_STREAM)
+        if family != socket.AF_UNIX:
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind(bind_to)
+        listener.listen(1024)
+        listener.setblocking(False)
+        self._listener = listener
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector.register(listener, selectors.EVENT_READ, "accept")
+        self._selector.register(self._wake_r, selectors.EVENT_READ, "wake")
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._serve, name="pomozen-team", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._wake()
+        if self._thread:
+            self._thread.join(timeout=2)
+        for subscriber in list(self._subscribers.values()):
+            subscriber.sock.close()
+        self._subscribers.clear()
+        if self._listener:
+            family, bound_to = parse_address(self.address)
+            self._listener.close()
+            if family == socket.AF_UNIX and os.path.exists(bound_to):
+                os.unlink(bound_to)  # Leave no stale socket file behind
+        self._selector.close()
+        self._wake_r.close()
+        self._wake_w.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    # --- Timer side ---
+    def attach(self, timer: Timer):
+        """Publishes every state change of `timer` from now on."""
+        self._timer = timer
+        timer.events.subscribe(self.on_event, *_EVENT_KINDS)
+
+    def on_event(self, event):
+        """Timer subscriber: publishes state changes and one tick per minute."""
+        if type(event) is Tick and not event.new_minute:
+            return
+        self.publish(_EVENT_KINDS[type(event)], event.timer)
+
+    def publish(self, kind: str, timer: Timer):
+        """Encodes the delta once and hands it to the I/O thread."""
+        self.sequence += 1
+        frame = encode_frame(kind, self.sequence, timer)
+        self._snapshot = encode_frame("snapshot", self.sequence, timer)
+        self._pending.append(frame)
+        self._wake()
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass  # A wakeup is already pending (or we're shutting down)
+
+    # --- I/O thread ---
+    def _serve(self):
+        while self._running:
+            for key, events in self._selector.select(timeout=1.0):
+                if key.data == "accept":
+                    self._accept()
+                elif key.data == "wake":
+                    try:
+                        while self._wake_r.recv(4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    self._broadcast()
+                elif events & selectors.EVENT_WRITE:
+                    self._flush(key.data)
+                else:  # Readable subscriber: only EOF/garbage is expected
+                    self._check_closed(key.data)
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self._listener.accept()
+            except (BlockingIOError, OSError):
+                return
+            sock.setblocking(False)
+            subscriber = _Subscriber(sock)
+            self._subscribers[sock.fileno()] = subscriber
+            self._selector.register(sock, selectors.EVENT_READ, subscriber)
+            if self._snapshot:
+                self._send(subscriber, self._snapshot)
+
+    def _broadcast(self):
+        # Coalesce everything queued since the last wakeup into one write each
+        frames = []
+        while self._pending:
+            frames.append(self._pending.popleft())
+        if not frames:
+            return
+        payload = b"".join(frames)
+        for subscriber in list(self._subscribers.values()):
+            self._send(subscriber, payload)
+
+    def _send(self, subscriber: _Subscriber, frame: bytes):
+        """Writes whole frames to one subscriber without ever blocking."""
+        if subscriber.backlog:
+            if len(subscriber.backlog) + len(frame) > self.max_buffered:
+                # Too far behind: drop queued deltas, resync with one snapshot.
+                # Keep the tail of a partially sent frame so framing stays intact.
+                partial = len(subscriber.backlog) % FRAME.size
+                subscriber.backlog = subscriber.backlog[:partial] + self._snapshot
+                self.resyncs += 1
+            else:
+                subscriber.backlog += frame
+            return
+        try:
+            sent = subscriber.sock.send(frame)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self._drop(subscriber)
+            return
+        if sent < len(frame):
+            subscriber.backlog += frame[sent:]
+            self._want_write(subscriber, True)
+
+    def _flush(self, subscriber: _Subscriber):
+        try:
+            sent = subscriber.sock.send(subscriber.backlog)
+        except BlockingIOError:
+            return
+        except OSError:
+            self._drop(subscriber)
+            return
+        del subscriber.backlog[:sent]
+        if not subscriber.backlog:
+            self._want_write(subscriber, False)
+
+    def _want_write(self, subscriber: _Subscriber, writing: bool):
+        if subscriber.writing != writing:
+            events = selectors.EVENT_READ | (selectors.EVENT_WRITE if writing else 0)
+            self._selector.modify(subscriber.sock, events, subscriber)
+            subscriber.writing = writing
+
+    def _check_closed(self, subscriber: _Subscriber):
+        try:
+            data = subscriber.sock.recv(1024)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._drop(subscriber)
+
+    def _drop(self, subscriber: _Subscriber):
+        self._subscribers.pop(subscriber.sock.fileno(), None)
+        try:
+            self._selector.unregister(subscriber.sock)
+        except (KeyError, ValueError):
+            pass
+        subscriber.sock.close()
+
+
+# --- Subscriber side ---
+def subscribe(address: str = DEFAULT_ADDRESS) -> Iterator[Dict[str, object]]:
+    """Connects to a publisher and yields decoded frames until it goes away."""
+    family, connect_to = parse_address(address)
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.connect(connect_to)
+        buffer = b""
+        while True:
+            chunk = sock.recv(4096)
+            if not chunk:
+                return
+            buffer += chunk
+            usable = len(buffer) - len(buffer) % FRAME.size
+            for offset in range(0, usable, FRAME.size):
+                yield decode_frame(buffer[offset : offset + FRAME.size])
+            buffer = buffer[usable:]
+
+
+# --- Benchmark: fan-out latency to 1k subscribers ---
+def _benchmark(subscriber_count: int = 1000, frames: int = 200, slow: int = 10):
+    import time
+
+    from .config import load_config
+
+    timer = Timer(load_config())
+    timer.start_session()
+    publisher = TeamPublisher("127.0.0.1:0")
+    publisher.start()
+    publisher.attach(timer)
+    host, port = publisher.bound_address
+
+    # Readers: one selector thread drains every fast subscriber socket
+    reader_selector = selectors.DefaultSelector()
+    clients = []
+    for index in range(subscriber_count + slow):
+        client = socket.create_connection((host, port))
+        client.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        clients.append(client)
+        if index < subscriber_count:  # The last `slow` clients never read
+            client.setblocking(False)
+            reader_selector.register(client, selectors.EVENT_READ, bytearray())
+    while publisher.subscriber_count < len(clients):
+        time.sleep(0.01)
+
+    sent_at: Dict[int, float] = {}
+    received = collections.Counter()
+    latencies = []
+    done = threading.Event()
+
+    def read_loop():
+        while not done.is_set():
+            for key, _ in reader_selector.select(timeout=0.1):
+                try:
+                    chunk = key.fileobj.recv(65536)
+                except BlockingIOError:
+                    continue
+                buffer = key.data
+                buffer += chunk
+                usable = len(buffer) - len(buffer) % FRAME.size
+                now = time.perf_counter()
+                for offset in range(0, usable, FRAME.size):
+                    sequence = FRAME.unpack_from(buffer, offset)[3]
+                    if sequence in sent_at:
+                        received[sequence] += 1
+                        if received[sequence] == subscriber_count:
+                            latencies.append(now - sent_at[sequence])
+                del buffer[:usable]
+
+    reader = threading.Thread(target=read_loop, daemon=True)
+    reader.start()
+
+    publish_costs = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        sent_at[publisher.sequence + 1] = start
+        publisher.publish("tick", timer)
+        publish_costs.append(time.perf_counter() - start)
+        time.sleep(0.005)
+    deadline = time.perf_counter() + 5
+    while len(latencies) < frames and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    done.set()
+    reader.join()
+
+    latencies.sort()
+    publish_costs.sort()
+
+    def pct(values, q):
+        return values[min(len(values) - 1, int(q * len(values)))] * 1e3
+
+    print(
+        f"{subscriber_count} subscribers (+{slow} never reading), {frames} frames, "
+        f"{len(latencies)} fully delivered"
+    )
+    if latencies:
+        print(
+            f"  fan-out latency: p50 {pct(latencies, 0.5):.2f} ms, "
+            f"p99 {pct(latencies, 0.99):.2f} ms, max {latencies[-1] * 1e3:.2f} ms"
+        )
+    print(
+        f"  publish() cost on timer thread: p50 {pct(publish_costs, 0.5) * 1e3:.1f} µs, "
+        f"max {publish_costs[-1] * 1e6:.1f} µs"
+    )
+    print(f"  slow-subscriber resyncs: {publisher.resyncs}")
+
+    for client in clients:
+        client.close()
+    publisher.stop()
+
+
+if __name__ == "__main__":
+    import resource
+
+    # 1k subscribers need ~2k descriptors (both socket ends live in this process)
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, 8192), hard))
+    _benchmark()
@@ -0,0 +1,153 @@
+# pomozen/ticks.py
+import os
+import subprocess
+import sys
+import time
+from typing import Callable, Optional
+
+# --- Wakeup intervals (seconds) ---
+FULL_RATE = 1.0  # Visible terminal: redraw every second
+COARSE_RATE = 60.0  # Hidden / detached / not a TTY: once a minute
+IDLE_WAIT = 3600.0  # Paused: nothing changes until input (or a signal) arrives
+VISIBILITY_TTL = 5.0  # How long a visibility check is trusted
+TMUX_TTL = 60.0  # Asking tmux starts a process: trust its answer for longer
+
+_tmux_visible = True
+_tmux_checked_at: Optional[float] = None
+
+
+# --- Visibility ---
+def _tmux_pane_visible() -> bool:
+    """True unless tmux says our pane is detached or in a background window.
+
+    Cached for TMUX_TTL: a pane that comes back into view is noticed up to a
+    minute late, which is no worse than the hidden (COARSE_RATE) redraw.
+    """
+    global _tmux_visible, _tmux_checked_at
+    now = time.monotonic()
+    if _tmux_checked_at is None or now - _tmux_checked_at >= TMUX_TTL:
+        _tmux_visible = _ask_tmux()
+        _tmux_checked_at = now
+    return _tmux_visible
+
+
+def _ask_tmux() -> bool:
+    """One uncached `tmux display-message` round trip."""
+    try:
+        output = subprocess.run(
+            [
+                "tmux",
+                "display-message",
+                "-p",
+                "-t",
+                os.environ.get("TMUX_PANE", ""),
+                "#{session_attached} #{window_active}",
+            ],
+            capture_output=True,
+            text=True,
+            timeout=1,
+        ).stdout.split()
+    except (OSError, subprocess.SubprocessError):
+        return True  # Can't tell: assume visible rather than lag the display
+    return len(output) != 2 or (output[0] != "0" and output[1] == "1")
+
+
+def output_is_visible(stream=None) -> bool:
+    """Best guess whether anyone can currently see our terminal output."""
+    stream = stream or sys.stdout
+    try:
+        if not stream.isatty():
+            return False
+        fd = stream.fileno()
+        # A backgrounded job (`pomozen start &`, Ctrl+Z then `bg`) can't be seen
+        if hasattr(os, "tcgetpgrp") and os.tcgetpgrp(fd) != os.getpgrp():
+            return False
+    except (OSError, ValueError, AttributeError):
+        return False
+    if os.environ.get("TMUX"):
+        return _tmux_pane_visible()
+    return True
+
+
+# --- Policy ---
+class TickPolicy:
+    """Decides how long the session loop may sleep before its next wakeup.
+
+    * visible and running: once per second, so the bar stays live
+    * hidden, detached or not a TTY: once per minute
+    * running with no input source and nobody watching: one sleep to the end
+    * paused: one long wait, cut short by a key press (or signal)
+
+    Every delay is capped at the time remaining, so sessions still end on
+    the exact second. Wakeups are counted for wakeups_per_hour().
+    """
+
+    def __init__(
+        self,
+        visible: Optional[Callable[[], bool]] = None,
+        has_input: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._visible_check = visible or output_is_visible
+        self.has_input = has_input
+        self.clock = clock
+        self.wakeups = 0
+        self._started_at = clock()
+        self._visible = True
+        self._visible_checked_at: Optional[float] = None
+
+    def visible(self) -> bool:
+        now = self.clock()
+        if (
+            self._visible_checked_at is None
+            or now - self._visible_checked_at >= VISIBILITY_TTL
+        ):
+            self._visible = self._visible_check()
+            self._visible_checked_at = now
+        return self._visible
+
+    def next_delay(self, elapsed: float, remaining: float, is_paused: bool) -> float:
+        """Seconds to wait before the next wakeup."""
+        self.wakeups += 1
+        if is_paused:
+            return IDLE_WAIT
+        if self.visible():
+            return min(FULL_RATE - elapsed % FULL_RATE, remaining)
+        if not self.has_input:
+            return remaining
+        return min(COARSE_RATE - elapsed % COARSE_RATE, remaining)
+
+    def wakeups_per_hour(self) -> float:
+        hours = max(self.clock() - self._started_at, 1e-9) / 3600
+        return self.wakeups / hours
+
+
+# --- Benchmark: wakeups per hour for each situation ---
+if __name__ == "__main__":
+    from .config import load_config
+    from .timer import Timer
+
+    def simulate(label: str, visible: bool, has_input: bool, paused: bool):
+        now = [0.0]
+        policy = TickPolicy(
+            visible=lambda: visible, has_input=has_input, clock=lambda: now[0]
+        )
+        timer = Timer(load_config(), clock=lambda: now[0])
+        timer.start_session()
+        timer.duration = 3600  # One hour of work
+        timer.is_paused = paused
+        while now[0] < 3600 and not timer.update():
+            delay = policy.next_delay(timer.elapsed, timer.remaining, timer.is_paused)
+            now[0] += delay
+        print(
+            f"{label:<34} {policy.wakeups_per_hour():8.0f} wakeups/hour "
+            f"(ended at t={timer.elapsed:.0f}s)"
+        )
+
+    print(f"{'Before (1 s running / 0.2 s paused)':<34} {3600:8.0f} / 18000")
+    simulate("Visible, running", visible=True, has_input=True, paused=False)
+    simulate(
+        "Hidden or not a TTY, running", visible=False, has_input=True, paused=False
+    )
+    simulate("Hidden, no input source", visible=False, has_input=False, paused=False)
+    simulate("Paused (waits on input)", visible=True, has_input=True, paused=True)
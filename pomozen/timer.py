@@ -1,12 +1,22 @@
 # pomozen/timer.py
 import time
+import struct
 import sys
 from enum import Enum, auto
-from typing import Callable, Optional
+from typing import Callable, List, Optional
 
 from .config import APP_CONFIG
-from .notifications import send_desktop_notification, play_sound_alert
-from .keyboard import get_key_if_available  # Import the keyboard function
+from .events import (
+    Completed,
+    EventBus,
+    Paused,
+    Resumed,
+    SessionStarted,
+    Skipped,
+    Tick,
+)
+from .keyboard import get_keys_if_available, wait_for_input
+from .ticks import TickPolicy
 
 
 # --- Enums for State and Status ---
@@ -22,130 +32,341 @@ class SessionStatus(Enum):
     QUIT = auto()  # Renamed from INTERRUPTED for clarity
 
 
+# --- Compact State Snapshot ---
+class TimerState:
+    """Immutable snapshot of a Timer's progress with a 20-byte binary form."""
+
+    __slots__ = (
+        "session_type",
+        "cycle_position",
+        "work_sessions_completed",
+        "elapsed",
+        "duration",
+        "is_paused",
+    )
+    # type (0 = not started), flags, cycle position, work count, elapsed, duration
+    _STRUCT = struct.Struct("<BBHIdI")
+    _FLAG_PAUSED = 0x01
+
+    def __init__(
+        self,
+        session_type: Optional[SessionType],
+        cycle_position: int,
+        work_sessions_completed: int,
+        elapsed: float,
+        duration: int,
+        is_paused: bool,
+    ):
+        set_slot = object.__setattr__  # Bypass our own read-only __setattr__
+        set_slot(self, "session_type", session_type)
+        set_slot(self, "cycle_position", cycle_position)
+        set_slot(self, "work_sessions_completed", work_sessions_completed)
+        set_slot(self, "elapsed", elapsed)
+        set_slot(self, "duration", duration)
+        set_slot(self, "is_paused", is_paused)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TimerState is immutable")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TimerState):
+            return NotImplemented
+        return all(getattr(self, n) == getattr(other, n) for n in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{n}={getattr(self, n)!r}" for n in self.__slots__)
+        return f"TimerState({fields})"
+
+    def to_bytes(self) -> bytes:
+        return self._STRUCT.pack(
+            self.session_type.value if self.session_type else 0,
+            self._FLAG_PAUSED if self.is_paused else 0,
+            self.cycle_position,
+            self.work_sessions_completed,
+            self.elapsed,
+            self.duration,
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TimerState":
+        kind, flags, position, work_count, elapsed, duration = cls._STRUCT.unpack(data)
+        return cls(
+            SessionType(kind) if kind else None,
+            position,
+            work_count,
+            elapsed,
+            duration,
+            bool(flags & cls._FLAG_PAUSED),
+        )
+
+
 class Timer:
-    def __init__(self, config: dict):
+    # Slotted: no per-instance __dict__, which matters with many timers
+    __slots__ = (
+        "config",
+        "name",
+        "durations",
+        "settings",
+        "plan",
+        "clock",
+        "sleep",
+        "task",
+        "work_sessions_completed",
+        "current_session_type",
+        "is_paused",
+        "elapsed",
+        "duration",
+        "_last_update",
+        "_cycle_position",
+        "events",
+        "_last_minute",
+        "_tick",
+    )
+
+    def __init__(
+        self,
+        config: dict,
+        name: str = "PomoZen",
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        events: Optional[EventBus] = None,
+    ):
+        # Local import: schedule.py depends on SessionType defined above
+        from .schedule import get_day_plan
+
         self.config = config
+        self.name = name  # Shown when several timers share one display
         self.durations = config["durations"]
         self.settings = config["settings"]
+        self.plan = get_day_plan(config)  # Cached, shared with the status command
+        self.clock = clock  # Injectable so many timers can share virtual time
+        self.sleep = sleep
+        self.task: Optional[str] = None  # Label for work sessions (see tasks.py)
         self.work_sessions_completed = 0
         self.current_session_type: Optional[SessionType] = None
         self.is_paused: bool = False  # NEW: Pause state flag
-        self._task_id = None
+        self.elapsed: float = 0.0  # Seconds counted in the current session
+        self.duration: int = 0  # Length of the current session in seconds
+        self._last_update: float = 0.0
+        self._cycle_position = 0  # Index into self.plan.cycle
+        # Subscribers for this timer's events; several timers may share a bus
+        self.events = events if events is not None else EventBus()
+        self._last_minute = 0  # Whole minutes elapsed, for Tick.new_minute
+        self._tick: Optional[Tick] = None  # Reused by every tick, made on demand
 
-    # --- _get_duration (Keep as before) ---
+    # --- Events ---
+    def _publish_end(self, event_type: type):
+        if self.events.handlers(event_type):
+            session_type = self.current_session_type or self.plan.cycle[0]
+            self.events.publish(
+                event_type(
+                    self,
+                    session_type,
+                    self.duration,
+                    self.elapsed,
+                    self.session_task,
+                )
+            )
+
+    # --- _get_duration (durations come from the compiled plan) ---
     def _get_duration(self, session_type: SessionType) -> int:
-        if session_type == SessionType.WORK:
-            minutes = self.durations["work"]
-        elif session_type == SessionType.SHORT_BREAK:
-            minutes = self.durations["short_break"]
-        elif session_type == SessionType.LONG_BREAK:
-            minutes = self.durations["long_break"]
-        else:
-            return 0
-        return minutes * 60
-
-    # --- _get_next_session_type (Keep as before) ---
+        return self.plan.durations.get(session_type, 0)
+
+    # --- _get_next_session_type (walks the plan's session cycle) ---
     def _get_next_session_type(self) -> SessionType:
         if self.current_session_type == SessionType.WORK:
             self.work_sessions_completed += 1
-            if self.work_sessions_completed % self.settings["long_break_interval"] == 0:
-                return SessionType.LONG_BREAK
-            else:
-                return SessionType.SHORT_BREAK
-        else:
-            return SessionType.WORK
+        self._cycle_position, next_type = self.plan.next_in_cycle(self._cycle_position)
+        return next_type
 
-    def run_session(
-        self, progress_updater: Callable
-    ) -> SessionStatus:  # Return SessionStatus
-        """Runs a single Pomodoro session with live display and keyboard controls."""
-        if self.current_session_type is None:
-            self.current_session_type = SessionType.WORK
+    # --- Snapshots ---
+    def snapshot(self) -> TimerState:
+        """Captures the current progress (see TimerState.to_bytes for storage)."""
+        self.update()
+        return TimerState(
+            self.current_session_type,
+            self._cycle_position,
+            self.work_sessions_completed,
+            self.elapsed,
+            self.duration,
+            self.is_paused,
+        )
+
+    def restore(self, state: TimerState):
+        """Continues from a snapshot, e.g. one saved by another process."""
+        self.current_session_type = state.session_type
+        self._cycle_position = state.cycle_position
+        self.work_sessions_completed = state.work_sessions_completed
+        self.elapsed = state.elapsed
+        self.duration = state.duration
+        self.is_paused = state.is_paused
+        self._last_update = self.clock()
+        self._last_minute = int(state.elapsed) // 60
+
+    # --- Steppable core (used by run_session and by shared loops) ---
+    @property
+    def session_name(self) -> str:
+        session_type = self.current_session_type or self.plan.cycle[0]
+        return session_type.name.replace("_", " ").capitalize()
+
+    @property
+    def session_task(self) -> Optional[str]:
+        """The task label, for work sessions only (breaks aren't task time)."""
+        session_type = self.current_session_type or self.plan.cycle[0]
+        return self.task if session_type == SessionType.WORK else None
+
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self.duration - self.elapsed)
 
-        session_name = self.current_session_type.name.replace("_", " ").capitalize()
-        duration_sec = self._get_duration(self.current_session_type)
-        elapsed_sec = 0
+    def start_session(self, duration: Optional[int] = None):
+        """Resets the clock for the current (or first) session type.
+
+        `duration` (seconds) overrides the plan's length for this session.
+        """
+        if self.current_session_type is None:
+            self.current_session_type = self.plan.cycle[self._cycle_position]
+        if duration is None:
+            duration = self._get_duration(self.current_session_type)
+        self.duration = duration
+        self.elapsed = 0.0
         self.is_paused = False  # Ensure not paused at start of session
+        self._last_update = self.clock()
+        self._last_minute = 0
+        if self.events.handlers(SessionStarted):
+            self.events.publish(
+                SessionStarted(
+                    self,
+                    self.current_session_type,
+                    self.duration,
+                    self.session_task,
+                )
+            )
 
-        # Determine colors/styles
-        if self.current_session_type == SessionType.WORK:
-            progress_color = "[bold red]"
-            finished_color = "[bold bright_red]"
-        else:  # Breaks
-            progress_color = "[bold blue]"
-            finished_color = "[bold bright_blue]"
-
-        desc_base = f"{progress_color}{session_name}"
-
-        # Add task to Rich Progress
-        self._task_id = progress_updater(
-            "add_task",
-            description=desc_base,
-            total=duration_sec,
-            completed=elapsed_sec,  # Start at 0
-            remaining_text=f"{duration_sec // 60:02d}:00",
-        )
+    def update(self) -> bool:
+        """Accounts for time passed since the last update. Returns True when finished."""
+        now = self.clock()
+        if not self.is_paused and now != self._last_update:
+            self.elapsed = min(self.duration, self.elapsed + (now - self._last_update))
+            minute = int(self.elapsed) // 60
+            handlers = self.events.handlers(Tick)
+            if handlers:
+                # No allocation per tick: refill the timer's one Tick event
+                tick = self._tick or Tick(self)
+                self._tick = tick
+                tick.elapsed = self.elapsed
+                tick.remaining = self.duration - self.elapsed
+                tick.new_minute = minute != self._last_minute
+                for handler in handlers:
+                    handler(tick)
+            self._last_minute = minute
+        self._last_update = now
+        return self.elapsed >= self.duration
+
+    def toggle_pause(self):
+        self.update()  # Bank the time run so far before switching state
+        self.is_paused = not self.is_paused
+        event_type = Paused if self.is_paused else Resumed
+        if self.events.handlers(event_type):
+            self.events.publish(event_type(self, self.elapsed))
+
+    def complete_session(self) -> SessionStatus:
+        """Publishes Completed and advances to the next session type."""
+        self._publish_end(Completed)
+
+        # Determine the type for the *next* session
+        self.current_session_type = self._get_next_session_type()
+        return SessionStatus.COMPLETED
+
+    def skip_session(self) -> SessionStatus:
+        """Publishes Skipped and moves straight on to the next session type."""
+        self._publish_end(Skipped)
+        self.current_session_type = self._get_next_session_type()
+        return SessionStatus.SKIPPED
+
+    def run_session(
+        self,
+        key_source: Optional[Callable[[], List[str]]] = get_keys_if_available,
+        policy: Optional[TickPolicy] = None,
+        wait: Optional[Callable[[float], object]] = None,
+    ) -> SessionStatus:  # Return SessionStatus
+        """Runs a single Pomodoro session with keyboard controls.
+
+        Progress is reported only through `self.events`, so displays,
+        history and notifications are all just subscribers. `policy` picks
+        how long to sleep between wakeups (see TickPolicy); `wait` does the
+        sleeping and defaults to waiting on keyboard input, so a key press
+        cuts any sleep short. With no `key_source` the timer just sleeps.
+        """
+        if policy is None:
+            policy = TickPolicy(has_input=key_source is not None, clock=self.clock)
+        if wait is None:
+            wait = wait_for_input if key_source is not None else self.sleep
+        self.start_session()
 
         # --- Main Timer Loop ---
         try:
-            while elapsed_sec < duration_sec:
-                # --- Check for Keyboard Input ---
-                key = get_key_if_available()
-                if key:
+            while True:
+                # --- Check for Keyboard Input (whole batch, in order) ---
+                for key in key_source() if key_source is not None else ():
                     if key == "p":
-                        self.is_paused = not self.is_paused
-                        # print(f"\rDEBUG: Paused state: {self.is_paused}   ") # Debug line
+                        self.toggle_pause()
                     elif key == "s":
-                        # print("\rDEBUG: Skip key pressed.") # Debug line
+                        self._publish_end(Skipped)
                         return SessionStatus.SKIPPED  # Exit loop and signal skip
                     elif key == "q":
-                        # print("\rDEBUG: Quit key pressed.") # Debug line
                         # Raise KeyboardInterrupt to be caught by the outer handler in cli.py
                         raise KeyboardInterrupt("Quit requested by user")
 
-                # --- Handle Pause State ---
-                if self.is_paused:
-                    progress_updater(
-                        "update",
-                        self._task_id,
-                        description=f"{desc_base} [yellow](Paused)",  # Show paused status
-                        # Do not advance time
-                    )
-                    time.sleep(0.2)  # Sleep briefly to avoid busy-waiting while paused
-                    continue  # Skip the rest of the loop iteration
-
-                # --- Update Progress (if not paused) ---
-                elapsed_sec += 1
-                progress_updater(
-                    "update",
-                    self._task_id,
-                    advance=1,
-                    description=desc_base,  # Reset description if resuming
-                )
-                time.sleep(1)
+                if self.update():  # Publishes a Tick when time advanced
+                    break
+                # Next wakeup (1 s visible, 60 s hidden, long waits while
+                # paused), never past the deadline
+                wait(policy.next_delay(self.elapsed, self.remaining, self.is_paused))
 
             # --- Session Finished Normally ---
-            progress_updater(
-                "update",
-                self._task_id,
-                description=f"{finished_color}{session_name} Complete!",
-                remaining_text="Done!",
-            )
-            time.sleep(0.5)  # Keep final state visible briefly
-
-            # Send Notifications (only on normal completion)
-            send_desktop_notification(
-                f"PomoZen: {session_name} Finished!", "Time for the next session!"
-            )
-            play_sound_alert(session_name)
-
-            # Determine the type for the *next* session
-            self.current_session_type = self._get_next_session_type()
-            return SessionStatus.COMPLETED
+            status = self.complete_session()
+            if policy.visible():
+                self.sleep(0.5)  # Keep final state visible briefly
+            return status
 
         except KeyboardInterrupt:
             # This is now primarily caught by the cli.py handler
             # We just need to ensure the timer loop exits
             return SessionStatus.QUIT  # Signal that quit was initiated
 
-        # Note: `finally` block removed as cleanup (like title reset) is removed or handled elsewhere
+
+# --- Benchmark: memory per timer, slotted vs. per-instance __dict__ ---
+if __name__ == "__main__":
+    import tracemalloc
+
+    from .config import load_config
+
+    # Same methods without __slots__, i.e. the previous per-instance __dict__ layout
+    DictTimer = type(
+        "DictTimer",
+        (),
+        {
+            key: value
+            for key, value in vars(Timer).items()
+            if key not in Timer.__slots__ and key != "__slots__"
+        },
+    )
+
+    def measure(factory, count: int = 10_000) -> float:
+        config = load_config()
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        timers = [factory(config) for _ in range(count)]
+        for timer in timers:
+            timer.start_session()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+        del timers
+        return size / count
+
+    print(f"Timer with __dict__: {measure(DictTimer):7.1f} bytes/timer")
+    print(f"Slotted Timer:       {measure(Timer):7.1f} bytes/timer")
+    state = Timer(load_config()).snapshot()
+    print(f"TimerState binary:   {len(state.to_bytes()):7d} bytes/timer")
@@ -0,0 +1,390 @@
+# pomozen/web.py
+import asyncio
+import ipaddress
+import json
+import sys
+from typing import Dict, Optional, Set
+
+from .events import EVENT_NAMES, EVENT_TYPES, Event
+from .ticks import COARSE_RATE, FULL_RATE, IDLE_WAIT
+from .timer import Timer
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8766
+MAX_BUFFERED = 64 * 1024  # Unsent bytes per client before it skips updates
+MAX_HEADER = 8 * 1024
+_LOOPBACK_NAMES = ("localhost", "127.0.0.1", "[::1]")
+
+# --- Page ---
+PAGE = """<!doctype html>
+<html lang="en"><head><meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>PomoZen</title>
+<style>
+body { font: 18px system-ui, sans-serif; background: #111; color: #eee;
+       display: grid; place-items: center; height: 100vh; margin: 0; }
+main { width: min(90vw, 32rem); text-align: center; }
+#time { font-size: 5rem; font-variant-numeric: tabular-nums; margin: .2em 0; }
+#bar { height: .6rem; background: #333; border-radius: .3rem; overflow: hidden; }
+#fill { height: 100%; width: 0; background: #e5484d; transition: width 1s linear; }
+.break #fill { background: #3e63dd; }
+.paused #time { opacity: .5; }
+button { font: inherit; margin: 1.2rem .4rem 0; padding: .4rem 1.2rem; }
+#task, #link { color: #999; min-height: 1.4em; }
+</style></head>
+<body><main>
+<div id="name">Connecting...</div><div id="time">--:--</div>
+<div id="bar"><div id="fill"></div></div><div id="task"></div>
+<button onclick="send('pause')">Pause (p)</button>
+<button onclick="send('skip')">Skip (s)</button><div id="link"></div>
+</main><script>
+const $ = (id) => document.getElementById(id);
+function send(command) { fetch("/" + command, { method: "POST" }); }
+document.addEventListener("keydown", (e) => {
+  if (e.key === "p") send("pause");
+  if (e.key === "s") send("skip");
+});
+const events = new EventSource("/events");
+events.onopen = () => { $("link").textContent = ""; };
+events.onerror = () => { $("link").textContent = "Reconnecting..."; };
+events.onmessage = (message) => {
+  const s = JSON.parse(message.data);
+  const left = Math.ceil(s.remaining);
+  const clock = `${String(Math.floor(left / 60)).padStart(2, "0")}:` +
+                `${String(left % 60).padStart(2, "0")}`;
+  $("name").textContent = s.name + (s.paused ? " (paused)" : "");
+  $("time").textContent = clock;
+  $("task").textContent = s.task || "";
+  $("fill").style.width = `${(100 * s.elapsed) / s.duration}%`;
+  document.body.className = (s.session === "work" ? "" : "break") +
+                            (s.paused ? " paused" : "");
+  document.title = `${clock} ${s.name} - PomoZen`;
+};
+</script></body></html>
+""".encode("utf-8")
+
+
+def check_loopback(host: str):
+    """Raises ValueError unless `host` is a loopback address (or 'localhost')."""
+    if host == "localhost":
+        return
+    try:
+        if ipaddress.ip_address(host).is_loopback:
+            return
+    except ValueError:
+        pass
+    raise ValueError(f"'{host}' is not a loopback address (use 127.0.0.1 or ::1)")
+
+
+def _response(
+    status: str, body: Optional[bytes] = None, content_type: str = "text/plain"
+) -> bytes:
+    if body is None:
+        body = f"{status}\n".encode("latin-1")
+    return (
+        f"HTTP/1.1 {status}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Cache-Control: no-store\r\n"
+        "Connection: close\r\n\r\n"
+    ).encode("latin-1") + body
+
+
+_SSE_HEADERS = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: text/event-stream\r\n"
+    b"Cache-Control: no-store\r\n"
+    b"Connection: keep-alive\r\n\r\n"
+    b"retry: 1000\n\n"  # Reconnect quickly after a restart
+)
+
+
+# --- Server ---
+class WebServer:
+    """Runs one Timer and shows it in browser tabs over Server-Sent Events.
+
+    Each state change is serialised once into a complete SSE message and
+    the same bytes object goes to every connected tab. Messages carry the
+    whole state, so a tab whose socket backs up past `max_buffered` just
+    skips updates until it drains; it never delays the timer or the others.
+    """
+
+    def __init__(
+        self,
+        timer: Timer,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        max_buffered: int = MAX_BUFFERED,
+    ):
+        check_loopback(host)
+        self.timer = timer
+        self.host = host
+        self.port = port
+        self.max_buffered = max_buffered
+        self.skipped = 0  # Updates not sent to a backed-up client
+        self.encodes = 0  # Payloads serialised (one per state change)
+        self._clients: Set[asyncio.StreamWriter] = set()
+        self._payload = b""  # Latest SSE message, also sent on connect
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        timer.events.subscribe(self.on_event, *EVENT_TYPES)
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    @property
+    def bound_port(self) -> Optional[int]:
+        return self._server.sockets[0].getsockname()[1] if self._server else None
+
+    @property
+    def url(self) -> str:
+        host = f"[{self.host}]" if ":" in self.host else self.host
+        return f"http://{host}:{self.bound_port or self.port}/"
+
+    # --- Timer side ---
+    def state(self, event: Optional[Event] = None) -> Dict[str, object]:
+        timer = self.timer
+        session_type = timer.current_session_type or timer.plan.cycle[0]
+        return {
+            "event": EVENT_NAMES.get(type(event), "snapshot"),
+            "session": session_type.name.lower(),
+            "name": session_type.name.replace("_", " ").title(),
+            "task": timer.session_task,
+            "elapsed": round(timer.elapsed, 1),
+            "duration": timer.duration,
+            "remaining": round(timer.remaining, 1),
+            "paused": timer.is_paused,
+        }
+
+    def on_event(self, event: Event):
+        """Timer subscriber: encodes the new state once and fans it out."""
+        data = json.dumps(self.state(event), separators=(",", ":"))
+        self._payload = f"data: {data}\n\n".encode("utf-8")
+        self.encodes += 1
+        self._broadcast(self._payload)
+
+    def _broadcast(self, payload: bytes):
+        for writer in self._clients:
+            if writer.transport.get_write_buffer_size() > self.max_buffered:
+                self.skipped += 1  # Still sending older states: skip this one
+            else:
+                writer.write(payload)
+
+    def _next_delay(self) -> float:
+        """Seconds until the next update: every second while a tab watches."""
+        timer = self.timer
+        if timer.is_paused:
+            return IDLE_WAIT  # Commands wake us early
+        rate = FULL_RATE if self._clients else COARSE_RATE
+        return min(rate - timer.elapsed % rate, timer.remaining)
+
+    async def _drive(self):
+        """Runs sessions back to back, like the dashboard."""
+        timer = self.timer
+        timer.start_session()
+        while True:
+            if timer.update() and not timer.is_paused:
+                timer.complete_session()
+                timer.start_session()
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._next_delay())
+            except asyncio.TimeoutError:
+                pass
+
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    # --- Commands ---
+    def pause(self):
+        self.timer.toggle_pause()
+        self._wake()
+
+    def skip(self):
+        self.timer.skip_session()
+        self.timer.start_session()
+        self._wake()
+
+    # --- HTTP ---
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 10)
+            request_line, *lines = head.decode("latin-1").split("\r\n")
+            method, path, _ = request_line.split(" ", 2)
+        except (
+            asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError,
+            asyncio.TimeoutError,
+            ConnectionError,
+            ValueError,
+        ):
+            writer.close()
+            return
+        headers = {}
+        for line in lines:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        path = path.split("?", 1)[0]
+
+        # Only answer requests addressed to loopback (DNS rebinding), and only
+        # take commands from our own page or non-browser clients (CSRF)
+        host = headers.get("host", "").rsplit(":", 1)[0]
+        origin = headers.get("origin")
+        if host not in _LOOPBACK_NAMES or (
+            origin is not None
+            and origin.split("://", 1)[-1].rsplit(":", 1)[0] not in _LOOPBACK_NAMES
+        ):
+            writer.write(_response("403 Forbidden", b"Loopback only\n"))
+        elif method == "GET" and path == "/events":
+            await self._stream(reader, writer)
+            return
+        elif method == "GET" and path == "/":
+            writer.write(_response("200 OK", PAGE, "text/html; charset=utf-8"))
+        elif method == "GET" and path == "/state":
+            body = json.dumps(self.state()).encode("utf-8")
+            writer.write(_response("200 OK", body, "application/json"))
+        elif method == "POST" and path in ("/pause", "/skip"):
+            if path == "/pause":
+                self.pause()
+            else:
+                self.skip()
+            body = json.dumps(self.state()).encode("utf-8")
+            writer.write(_response("200 OK", body, "application/json"))
+        elif path in ("/", "/state", "/events", "/pause", "/skip"):
+            writer.write(_response("405 Method Not Allowed"))
+        else:
+            writer.write(_response("404 Not Found"))
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+    async def _stream(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Keeps an EventSource connection open until the tab goes away."""
+        writer.write(_SSE_HEADERS + (self._payload or b""))
+        self._clients.add(writer)
+        self._wake()  # First watcher: switch to once-a-second updates
+        try:
+            while await reader.read(1024):
+                pass  # Clients don't send anything after the request
+        except (ConnectionError, asyncio.CancelledError):
+            pass  # Tab closed, or the server is shutting down
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    # --- Lifecycle ---
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port, limit=MAX_HEADER, backlog=1024
+        )
+
+    async def serve(self):
+        """Serves until cancelled (Ctrl+C)."""
+        if self._server is None:
+            await self.start()
+        try:
+            await self._drive()
+        finally:
+            self.close()
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+        for writer in list(self._clients):
+            writer.close()
+        self._clients.clear()
+
+
+# --- Benchmark: concurrent tabs and fan-out cost per update ---
+async def _benchmark(client_count: int, updates: int):
+    import time
+
+    from .config import load_config
+
+    now = [0.0]
+    timer = Timer(load_config(), clock=lambda: now[0])
+    server = WebServer(timer, port=0)
+    await server.start()
+    timer.start_session()
+    port = server.bound_port
+
+    # Clients: plain sockets speaking just enough HTTP for /events
+    start = time.perf_counter()
+    streams = []
+    for offset in range(0, client_count, 200):  # Stay under the listen backlog
+        batch = [
+            asyncio.open_connection("127.0.0.1", port)
+            for _ in range(min(200, client_count - offset))
+        ]
+        for reader, writer in await asyncio.gather(*batch):
+            writer.write(b"GET /events HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n")
+            streams.append((reader, writer))
+
+    async def read_snapshot(reader: asyncio.StreamReader):
+        await reader.readuntil(b"\r\n\r\n")  # Response headers
+        await reader.readuntil(b"\n\n")  # retry: field
+        await reader.readuntil(b"\n\n")  # Current state
+
+    await asyncio.gather(*(read_snapshot(reader) for reader, _ in streams))
+    while server.client_count < client_count:
+        await asyncio.sleep(0.01)
+    connect_time = time.perf_counter() - start
+
+    received = [0]
+
+    async def read_update(reader: asyncio.StreamReader):
+        await reader.readuntil(b"\n\n")
+        received[0] += 1
+
+    fan_out, publish = [], []
+    for _ in range(updates):
+        readers = [asyncio.ensure_future(read_update(r)) for r, _ in streams]
+        received[0] = 0
+        now[0] += 1.0
+        start = time.perf_counter()
+        timer.update()  # Publishes a Tick: one encode, client_count writes
+        publish.append(time.perf_counter() - start)
+        await asyncio.gather(*readers)
+        fan_out.append(time.perf_counter() - start)
+
+    state = server.state()
+    start = time.perf_counter()
+    for _ in range(client_count):  # What a per-client encoding would add
+        f"data: {json.dumps(state, separators=(',', ':'))}\n\n".encode("utf-8")
+    per_client_encode = time.perf_counter() - start
+
+    def pct(values, q):
+        values = sorted(values)
+        return values[min(len(values) - 1, int(q * len(values)))] * 1e3
+
+    print(f"{client_count} SSE clients connected in {connect_time:.2f}s")
+    print(
+        f"  update reaches every client: p50 {pct(fan_out, 0.5):.2f} ms, "
+        f"p99 {pct(fan_out, 0.99):.2f} ms"
+    )
+    print(
+        f"  publish on the timer's loop: p50 {pct(publish, 0.5):.2f} ms "
+        f"({server.encodes - 1} encodes for {updates} updates)"
+    )
+    print(f"  encoding per client instead would add {per_client_encode * 1e3:.2f} ms")
+    print(f"  skipped (backed-up) writes: {server.skipped}")
+    for _, writer in streams:
+        writer.close()
+    server.close()
+
+
+if __name__ == "__main__":
+    import resource
+
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    updates = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    # Both ends of every connection live in this process
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, 2 * clients + 256), hard))
+    asyncio.run(_benchmark(clients, updates))